@@ -0,0 +1,88 @@
+"""
+Benchmark of estimator predict vs exported inference fast path
+
+Usage: python -m benchmarks.bench_inference --batch-sizes 1 10 100 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import report
+from models.ml_models.ml_models import CatBoostRegModel, LinRegModel
+
+
+def measure(func, *args, min_seconds: float = 0.2) -> float:
+    """
+    Mean wall time of one call in seconds
+    """
+    calls, start = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_seconds:
+        func(*args)
+        calls += 1
+    return elapsed / calls
+
+
+# pylint: disable-next=too-many-locals
+def run(batch_sizes: list[int], n_features: int, iterations: int) -> list[dict]:
+    """
+    Fit both model types and time both predict paths for every batch size
+    """
+    rng = np.random.default_rng(0)
+    columns = [f"f{i}" for i in range(n_features)]
+    X_train = pd.DataFrame(rng.normal(size=(10_000, n_features)), columns=columns)
+    y_train = X_train.sum(axis=1) + rng.normal(size=len(X_train))
+
+    models = {
+        "LinRegModel": LinRegModel(),
+        "CatBoostRegModel": CatBoostRegModel(
+            hyperparams={"iterations": iterations, "depth": 6}
+        ),
+    }
+    models["CatBoostRegModel"].model.set_params(verbose=False)
+
+    results = []
+    for name, model in models.items():
+        model.fit(X_train, y_train)
+        inference = model.get_inference()
+        for batch_size in batch_sizes:
+            X = pd.DataFrame(rng.normal(size=(batch_size, n_features)), columns=columns)
+            assert inference.accepts(X)
+            np.testing.assert_allclose(
+                inference.predict(X), model.predict(X), rtol=1e-6
+            )
+            estimator_s = measure(model.predict, X)
+            fast_s = measure(inference.predict, X)
+            results.append(
+                {
+                    "model": name,
+                    "batch_size": batch_size,
+                    "estimator_us": round(estimator_s * 1e6, 1),
+                    "fast_path_us": round(fast_s * 1e6, 1),
+                    "speedup": round(estimator_s / fast_s, 1),
+                }
+            )
+    return results
+
+
+def main():
+    """
+    Run benchmark from command line
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 10_000]
+    )
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--output", help="Path to save results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.batch_sizes, args.features, args.iterations)
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
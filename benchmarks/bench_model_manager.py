@@ -0,0 +1,109 @@
+"""
+In-process benchmark of ModelManager train, load and predict
+
+Usage: python -m benchmarks.bench_model_manager --rows 10000 100000 --batch-sizes 1 100 10000
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+from benchmarks.common import latency_summary, report, synthetic_dataset
+from models.model_manager import ModelManager
+
+MODEL_PARAMS = {
+    "LinRegModel": {},
+    "CatBoostRegModel": {"iterations": 200, "depth": 6},
+}
+
+
+def timed(func, *args) -> float:
+    """
+    Wall time of one call in seconds
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+# pylint: disable-next=too-many-locals
+def run(
+    rows: list[int],
+    n_features: int,
+    batch_sizes: list[int],
+    repeats: int,
+    model_types: list[str],
+) -> list[dict]:
+    """
+    Train every model type on every dataset size, then time cold loads and
+    warm predictions for every batch size
+    """
+    results = []
+    for n_rows in rows:
+        X, y = synthetic_dataset(n_rows, n_features)
+        with tempfile.TemporaryDirectory() as storage_dir:
+            manager = ModelManager(storage_dir)
+            for model_type in model_types:
+                params = MODEL_PARAMS[model_type]
+                common = {"rows": n_rows, "model": model_type}
+
+                # CatBoost печатает прогресс обучения в stdout
+                with contextlib.redirect_stdout(io.StringIO()):
+                    train_s = timed(
+                        manager.train_and_save_model, model_type, X, y, params
+                    )
+                model_id = manager.get_model_id(model_type, X, y, params)
+                results.append(
+                    {**common, "operation": "train", "batch_size": n_rows}
+                    | latency_summary([train_s])
+                )
+
+                load_latencies = []
+                for _ in range(repeats):
+                    manager.cache.clear()
+                    load_latencies.append(timed(manager.load_model, model_id))
+                results.append(
+                    {**common, "operation": "load_cold", "batch_size": None}
+                    | latency_summary(load_latencies)
+                )
+
+                for batch_size in batch_sizes:
+                    batch = X.iloc[:batch_size]
+                    manager.predict(model_id, batch)
+                    latencies = [
+                        timed(manager.predict, model_id, batch) for _ in range(repeats)
+                    ]
+                    summary = latency_summary(latencies)
+                    summary["rows_per_s"] = round(
+                        len(batch) * summary["throughput_rps"]
+                    )
+                    results.append(
+                        {**common, "operation": "predict", "batch_size": len(batch)}
+                        | summary
+                    )
+    return results
+
+
+def main():
+    """
+    Run benchmark from command line
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument(
+        "--models", nargs="+", default=list(MODEL_PARAMS), choices=list(MODEL_PARAMS)
+    )
+    parser.add_argument("--output", help="Path to save results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.features, args.batch_sizes, args.repeats, args.models)
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
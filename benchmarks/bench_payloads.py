@@ -0,0 +1,129 @@
+"""
+Benchmark of /predict payload decoding formats
+
+Usage: python -m benchmarks.bench_payloads --rows 10000 100000 1000000
+"""
+
+import argparse
+import json
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import report
+from server.rest.payloads import (
+    ARROW_CONTENT_TYPE,
+    BINARY_CONTENT_TYPE,
+    JSON_CONTENT_TYPE,
+    parse_predict_payload,
+)
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+def encode_payloads(frame: pd.DataFrame) -> dict[str, tuple[str, bytes, dict]]:
+    """
+    Encode frame in every supported request format
+    """
+    columns = list(frame.columns)
+    payloads = {
+        "json_rows": (
+            JSON_CONTENT_TYPE,
+            json.dumps(
+                {"model_id": "bench", "features": frame.to_dict(orient="records")}
+            ).encode(),
+            {},
+        ),
+        "json_columnar": (
+            JSON_CONTENT_TYPE,
+            json.dumps(
+                {"model_id": "bench", "columns": columns, "data": frame.values.tolist()}
+            ).encode(),
+            {},
+        ),
+        "binary_f64": (
+            BINARY_CONTENT_TYPE,
+            np.ascontiguousarray(frame.to_numpy(dtype="<f8")).tobytes(),
+            {"model_id": "bench", "columns": ",".join(columns)},
+        ),
+    }
+    if pa is not None:
+        sink = pa.BufferOutputStream()
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        payloads["arrow_ipc"] = (
+            ARROW_CONTENT_TYPE,
+            sink.getvalue().to_pybytes(),
+            {"model_id": "bench"},
+        )
+    return payloads
+
+
+def measure(func: Callable[[], object], repeats: int) -> float:
+    """
+    Best wall time of several runs in seconds
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows: list[int], n_features: int, repeats: int) -> list[dict]:
+    """
+    Decode every format for every size and collect timings
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for n_rows in rows:
+        frame = pd.DataFrame(
+            rng.normal(size=(n_rows, n_features)),
+            columns=[f"f{i}" for i in range(n_features)],
+        )
+        payloads = encode_payloads(frame)
+        baseline = None
+        for name, (content_type, body, query) in payloads.items():
+            seconds = measure(
+                lambda ct=content_type, b=body, q=query: parse_predict_payload(
+                    ct, b, q
+                ),
+                repeats,
+            )
+            baseline = baseline or seconds
+            results.append(
+                {
+                    "rows": n_rows,
+                    "format": name,
+                    "body_mb": round(len(body) / 1024**2, 2),
+                    "decode_s": round(seconds, 4),
+                    "speedup": round(baseline / seconds, 1),
+                }
+            )
+    return results
+
+
+def main():
+    """
+    Run benchmark from command line
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Path to save results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.features, args.repeats)
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
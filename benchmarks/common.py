@@ -0,0 +1,93 @@
+"""
+Shared helpers of benchmark scripts
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_dataset(
+    rows: int, n_features: int, seed: int = 0
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Regression dataset with linear signal, one nonlinear term and noise
+    """
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        rng.normal(size=(rows, n_features)),
+        columns=[f"f{i}" for i in range(n_features)],
+    )
+    weights = rng.normal(size=n_features)
+    y = (
+        X.to_numpy() @ weights
+        + np.sin(X["f0"].to_numpy())
+        + rng.normal(scale=0.1, size=rows)
+    )
+    return X, y
+
+
+def latency_summary(latencies_s: list[float], wall_s: float | None = None) -> dict:
+    """
+    Count, throughput and p50/p95/p99 latency in milliseconds
+    """
+    values = np.asarray(latencies_s) * 1000
+    wall_s = wall_s if wall_s is not None else float(values.sum() / 1000)
+    return {
+        "count": len(values),
+        "throughput_rps": round(len(values) / wall_s, 1) if wall_s else 0.0,
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def run_metadata() -> dict:
+    """
+    Commit and environment of benchmark run for comparing results
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def save_results(path: str, args: dict, results: list[dict]):
+    """
+    Save results with run metadata and arguments as JSON
+    """
+    Path(path).write_text(
+        json.dumps(
+            {"metadata": run_metadata(), "args": args, "results": results}, indent=2
+        ),
+        encoding="utf-8",
+    )
+
+
+def report(results: list[dict], args: argparse.Namespace):
+    """
+    Print results table and save it to args.output if given
+    """
+    print(pd.DataFrame(results).to_string(index=False))
+    if args.output:
+        save_results(args.output, vars(args), results)
@@ -0,0 +1,72 @@
+"""
+Compare two benchmark result files, e.g. from different commits
+
+Usage: python -m benchmarks.compare baseline.json candidate.json
+"""
+
+import argparse
+import json
+
+import pandas as pd
+
+METRIC_COLUMNS = {
+    "count",
+    "errors",
+    "throughput_rps",
+    "rows_per_s",
+    "mean_ms",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "max_ms",
+}
+COMPARED = ["throughput_rps", "p50_ms", "p95_ms", "p99_ms"]
+
+
+def load(path: str) -> tuple[dict, pd.DataFrame]:
+    """
+    Read metadata and results table of saved run
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("metadata", {}), pd.DataFrame(data["results"])
+
+
+def compare(baseline: pd.DataFrame, candidate: pd.DataFrame) -> pd.DataFrame:
+    """
+    Join runs on benchmark parameters and compute candidate/baseline ratios
+    """
+    keys = [column for column in baseline.columns if column not in METRIC_COLUMNS]
+    merged = baseline.merge(
+        candidate, on=keys, suffixes=("_base", "_new"), how="inner"
+    ).fillna({key: "-" for key in keys})
+    table = merged[keys].copy()
+    for metric in COMPARED:
+        if f"{metric}_base" not in merged:
+            continue
+        table[f"{metric}_base"] = merged[f"{metric}_base"]
+        table[f"{metric}_new"] = merged[f"{metric}_new"]
+        table[f"{metric}_ratio"] = (
+            merged[f"{metric}_new"] / merged[f"{metric}_base"]
+        ).round(2)
+    return table
+
+
+def main():
+    """
+    Print comparison table
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    base_meta, baseline = load(args.baseline)
+    new_meta, candidate = load(args.candidate)
+    print(f"baseline:  {base_meta.get('commit')} {base_meta.get('timestamp')}")
+    print(f"candidate: {new_meta.get('commit')} {new_meta.get('timestamp')}")
+    print(compare(baseline, candidate).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
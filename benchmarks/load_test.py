@@ -0,0 +1,334 @@
+"""
+Concurrent load generator for REST and gRPC prediction servers
+
+Trains a model on the target server, then sends predict requests from
+several client threads and reports throughput and latency percentiles.
+With --launch the server is started in a temporary storage directory.
+
+Usage:
+    python -m benchmarks.load_test --target rest --launch --concurrency 1 8 32
+    python -m benchmarks.load_test --target grpc --url localhost:50051 --batch-size 100
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import pandas as pd
+import requests
+
+from benchmarks.common import latency_summary, report, synthetic_dataset
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+GRPC_DIR = REPO_ROOT / "server" / "grpc"
+
+MODEL_PARAMS = {
+    "LinRegModel": {},
+    "CatBoostRegModel": {"iterations": 200, "depth": 6},
+}
+
+
+def _grpc_modules():
+    # Сгенерированные модули импортируют друг друга как модули верхнего уровня
+    if str(GRPC_DIR) not in sys.path:
+        sys.path.insert(0, str(GRPC_DIR))
+    import grpc  # pylint: disable=import-outside-toplevel
+    import model_service_pb2  # pylint: disable=import-outside-toplevel,import-error
+    import model_service_pb2_grpc  # pylint: disable=import-outside-toplevel,import-error
+
+    return grpc, model_service_pb2, model_service_pb2_grpc
+
+
+class RestClient:
+    """
+    Client of FastAPI server with one HTTP session per thread
+    """
+
+    def __init__(self, url: str, payload_format: str):
+        self._url = url.rstrip("/")
+        self._format = payload_format
+        self._local = threading.local()
+
+    @property
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def ready(self) -> bool:
+        """
+        Check that server responds
+        """
+        try:
+            return self._session.get(f"{self._url}/status", timeout=1).ok
+        except requests.RequestException:
+            return False
+
+    def train(
+        self, model_type: str, params: dict, X: pd.DataFrame, y: np.ndarray
+    ) -> str:
+        """
+        Train model through /train and wait for job result
+        """
+        response = self._session.post(
+            f"{self._url}/train",
+            json={
+                "model_spec": {"type": model_type, "parameters": params},
+                "columns": list(X.columns),
+                "data": X.to_numpy().tolist(),
+                "targets": y.tolist(),
+            },
+        )
+        response.raise_for_status()
+        job_id = response.json()["job_id"]
+        while True:
+            job = self._session.get(f"{self._url}/jobs/{job_id}").json()
+            if job["status"] == "succeeded":
+                return job["model_id"]
+            if job["status"] in ("failed", "cancelled"):
+                raise RuntimeError(f"Training job {job['status']}: {job['error']}")
+            time.sleep(0.2)
+
+    def make_request(self, model_id: str, X: pd.DataFrame) -> Callable[[], None]:
+        """
+        Pre-encode predict request, return function sending it once
+        """
+        url = f"{self._url}/predict"
+        if self._format == "binary":
+            body = np.ascontiguousarray(X.to_numpy(dtype="<f8")).tobytes()
+            headers = {"Content-Type": "application/octet-stream"}
+            params = {"model_id": model_id, "columns": ",".join(X.columns)}
+        else:
+            body = json.dumps(
+                {
+                    "model_id": model_id,
+                    "columns": list(X.columns),
+                    "data": X.to_numpy().tolist(),
+                }
+            ).encode()
+            headers = {"Content-Type": "application/json"}
+            params = None
+
+        def send():
+            response = self._session.post(
+                url, data=body, headers=headers, params=params
+            )
+            response.raise_for_status()
+
+        return send
+
+
+class GrpcClient:
+    """
+    Client of gRPC server sharing one channel between threads
+    """
+
+    def __init__(self, url: str):
+        grpc, self._pb2, pb2_grpc = _grpc_modules()
+        self._grpc = grpc
+        channel = grpc.insecure_channel(
+            url,
+            options=[
+                ("grpc.max_send_message_length", 256 * 1024**2),
+                ("grpc.max_receive_message_length", 256 * 1024**2),
+            ],
+        )
+        self._stub = pb2_grpc.ModelServiceStub(channel)
+
+    def ready(self) -> bool:
+        """
+        Check that server responds
+        """
+        try:
+            self._stub.status(self._pb2.Empty(), timeout=1)
+            return True
+        except self._grpc.RpcError:
+            return False
+
+    def _packed(self, X: pd.DataFrame):
+        return self._pb2.PackedFeatures(
+            columns=list(X.columns), values=X.to_numpy(dtype=np.float64).ravel()
+        )
+
+    def train(
+        self, model_type: str, params: dict, X: pd.DataFrame, y: np.ndarray
+    ) -> str:
+        """
+        Train model through train_model RPC
+        """
+        response = self._stub.train_model(
+            self._pb2.TrainRequest(
+                type=model_type,
+                parameters={key: str(value) for key, value in params.items()},
+                packed_features=self._packed(X),
+                targets=y.tolist(),
+            )
+        )
+        if response.status != "success":
+            raise RuntimeError(f"Training failed: {response.status}")
+        return response.model_id
+
+    def make_request(self, model_id: str, X: pd.DataFrame) -> Callable[[], None]:
+        """
+        Pre-build predict request, return function sending it once
+        """
+        request = self._pb2.PredictRequest(
+            model_id=model_id, packed_features=self._packed(X)
+        )
+
+        def send():
+            self._stub.get_predictions(request)
+
+        return send
+
+
+@contextmanager
+def launch_server(target: str, port: int) -> Iterator[str]:
+    """
+    Start server process in temporary storage directory and stop it on exit
+    """
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT)}
+    if target == "rest":
+        command = [sys.executable, "-m", "server.rest.run"]
+        env["REST_PORT"] = str(port)
+        url = f"http://127.0.0.1:{port}"
+    else:
+        command = [sys.executable, str(GRPC_DIR / "server.py")]
+        env.update(GRPC_PORT=str(port), GRPC_METRICS_PORT="0")
+        url = f"localhost:{port}"
+    with tempfile.TemporaryDirectory() as work_dir:
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            command,
+            cwd=work_dir,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            yield url
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def wait_ready(client, timeout_s: float = 60.0):
+    """
+    Wait until server answers status requests
+    """
+    deadline = time.monotonic() + timeout_s
+    while not client.ready():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Server did not become ready")
+        time.sleep(0.2)
+
+
+def drive(send: Callable[[], None], concurrency: int, total_requests: int) -> dict:
+    """
+    Send total_requests requests from concurrency threads
+    """
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    remaining = iter(range(total_requests))
+
+    def worker():
+        nonlocal errors
+        own, own_errors = [], 0
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    break
+            start = time.perf_counter()
+            try:
+                send()
+            except Exception:  # pylint: disable=broad-exception-caught
+                own_errors += 1
+                continue
+            own.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(own)
+            errors += own_errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall_s = time.perf_counter() - start
+    summary = latency_summary(latencies, wall_s) if latencies else {"count": 0}
+    return {"errors": errors, **summary}
+
+
+def run(args: argparse.Namespace, url: str) -> list[dict]:
+    """
+    Train model on server and measure predict latency for every concurrency level
+    """
+    client = RestClient(url, args.format) if args.target == "rest" else GrpcClient(url)
+    wait_ready(client)
+
+    X, y = synthetic_dataset(args.train_rows, args.features)
+    model_id = client.train(args.model, MODEL_PARAMS[args.model], X, y)
+    send = client.make_request(model_id, X.iloc[: args.batch_size])
+    for _ in range(args.warmup):
+        send()
+
+    results = []
+    for concurrency in args.concurrency:
+        results.append(
+            {
+                "target": args.target,
+                "format": args.format if args.target == "rest" else "packed",
+                "model": args.model,
+                "batch_size": args.batch_size,
+                "concurrency": concurrency,
+                **drive(send, concurrency, args.requests),
+            }
+        )
+    return results
+
+
+def main():
+    """
+    Run load test from command line
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--target", choices=["rest", "grpc"], default="rest")
+    parser.add_argument("--url", help="Server address, default is local port 8080")
+    parser.add_argument("--launch", action="store_true", help="Start server locally")
+    parser.add_argument("--port", type=int, default=8099, help="Port for --launch")
+    parser.add_argument("--model", choices=list(MODEL_PARAMS), default="LinRegModel")
+    parser.add_argument("--format", choices=["json", "binary"], default="json")
+    parser.add_argument("--train-rows", type=int, default=10_000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--output", help="Path to save results as JSON")
+    args = parser.parse_args()
+
+    if args.launch:
+        with launch_server(args.target, args.port) as url:
+            results = run(args, url)
+    else:
+        default_url = (
+            "http://127.0.0.1:8080" if args.target == "rest" else "localhost:8080"
+        )
+        results = run(args, args.url or default_url)
+
+    report(results, args)
+
+
+if __name__ == "__main__":
+    main()
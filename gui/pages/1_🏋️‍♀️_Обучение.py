@@ -8,7 +8,7 @@ from time import sleep
 import requests
 import streamlit as st
 
-from gui.utils import init_page, API_URL, read_dataset
+from gui.utils import init_page, API_URL, upload_dataset
 
 init_page(title="Обучение модели", desc="Обучение модели с заданными гиперпараметрами")
 
@@ -42,8 +42,6 @@ dataset_name = st.selectbox(
     help="Выберите датасет для обучения модели",
 )
 
-X_train, y_train = read_dataset(dataset_name=dataset_name, data_type="train")
-
 if st.button(
     label="Обучить",
     help="Запуск процесса обучения и сохранения модели",
@@ -51,7 +49,7 @@ if st.button(
     use_container_width=True,
 ):
     with st.spinner("Обучение модели"):
-        sleep(5)
+        dataset_id = upload_dataset(dataset_name=dataset_name, data_type="train")
         response = requests.post(
             f"{API_URL}/train",
             json={
@@ -59,10 +57,18 @@ if st.button(
                     "type": model_to_train,
                     "parameters": cleaned_hyperparameters,
                 },
-                "features": X_train,
-                "targets": y_train,
+                "dataset_id": dataset_id,
+                "target_column": "target",
             },
         )
+        if response.ok:
+            job_id = response.json().get("job_id")
+            while requests.get(f"{API_URL}/jobs/{job_id}").json().get("status") in (
+                "pending",
+                "running",
+            ):
+                sleep(1)
+            response = requests.get(f"{API_URL}/jobs/{job_id}/result")
 
     if response.ok:
         st.success(f"ID обученной модели: {response.json().get("model_id")}", icon="✅")
@@ -9,7 +9,7 @@ import requests
 import streamlit as st
 from sklearn.metrics import mean_squared_error
 
-from gui.utils import init_page, API_URL, read_dataset
+from gui.utils import init_page, API_URL, read_targets, upload_dataset
 
 init_page(title="Предсказания", desc="Получение предсказаний выбранной модели")
 
@@ -33,8 +33,6 @@ dataset_name = col2.selectbox(
     help="Выберите датасет для получения предсказаний",
 )
 
-X_test, y_test = read_dataset(dataset_name=dataset_name, data_type="test")
-
 if st.button(
     label="Получить предсказания",
     help="Запуск процесса получения предсказаний",
@@ -43,11 +41,13 @@ if st.button(
 ):
     with st.spinner("Получение предсказаний"):
         sleep(2)
+        dataset_id = upload_dataset(dataset_name=dataset_name, data_type="test")
         response = requests.post(
             f"{API_URL}/predict",
             json={
                 "model_id": model_id,
-                "features": X_test,
+                "dataset_id": dataset_id,
+                "drop_columns": ["target"],
             },
         )
 
@@ -56,6 +56,7 @@ if st.button(
         st.info(
             f"Предсказания: {list(map(lambda x: round(x, 2), predictions))}", icon="ℹ️"
         )
+        y_test = read_targets(dataset_name=dataset_name, data_type="test")
         st.info(f"MSE: {mean_squared_error(y_test, predictions):.2f}", icon="📈")
     else:
         st.error(
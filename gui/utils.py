@@ -3,6 +3,7 @@ GUI utils
 """
 
 import uuid
+from pathlib import Path
 
 import pandas as pd
 import requests
@@ -83,14 +84,29 @@ def is_server_online() -> bool:
         return False
 
 
-def read_dataset(
-    dataset_name: str,
-    data_type: str,
-) -> tuple[list[dict[str, float]], list[float]]:
+def read_targets(dataset_name: str, data_type: str) -> list[float]:
     """
-    Read prepared dataset
+    Read target column of prepared dataset
     """
-    data = pd.read_csv(f"{DATASET_PATH}/{dataset_name}/{data_type}_data.csv")
-    y = data["target"].to_list()
-    X = data.drop(columns="target").to_dict(orient="records")
-    return X, y
+    data = pd.read_csv(
+        f"{DATASET_PATH}/{dataset_name}/{data_type}_data.csv", usecols=["target"]
+    )
+    return data["target"].to_list()
+
+
+def upload_dataset(dataset_name: str, data_type: str) -> str:
+    """
+    Upload prepared dataset to server registry once per file version, return dataset ID
+    """
+    path = Path(DATASET_PATH) / dataset_name / f"{data_type}_data.csv"
+    key = ("dataset_id", str(path), path.stat().st_mtime_ns)
+    if key not in st.session_state:
+        response = requests.post(
+            f"{API_URL}/datasets",
+            params={"name": f"{dataset_name}/{data_type}"},
+            data=path.read_bytes(),
+            headers={"Content-Type": "text/csv"},
+        )
+        response.raise_for_status()
+        st.session_state[key] = response.json()["dataset_id"]
+    return st.session_state[key]
@@ -0,0 +1,560 @@
+"""
+Offline batch scoring jobs: stream CSV or Parquet file through a stored model to disk
+
+Usage:
+    python -m models.batch_scoring --model-id <id> --input data.csv --output scores.csv
+    python -m models.batch_scoring --resume <job_id>
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from models.model_manager import ModelManager
+from models.out_of_core import PARQUET_SUFFIXES, count_rows, iter_chunks
+
+LOGGER = logging.getLogger(__name__)
+
+# Задачи в этих статусах можно продолжить с последнего записанного чанка
+RESUMABLE_STATUSES = {"failed", "cancelled", "interrupted"}
+
+
+@dataclass
+# pylint: disable-next=too-many-instance-attributes
+class ScoringJob:
+    """
+    State and progress of batch scoring job
+    """
+
+    job_id: str
+    model_id: str
+    input_path: str
+    output_path: str
+    chunk_rows: int = 100_000
+    feature_columns: list[str] | None = None
+    passthrough_columns: list[str] = field(default_factory=list)
+    status: str = "pending"
+    rows_done: int = 0
+    chunks_done: int = 0
+    output_bytes: int = 0
+    total_rows: int | None = None
+    rows_per_s: float | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    owner_pid: int | None = None
+
+
+class ScoringJobStore:
+    """
+    SQLite-backed scoring job states and checkpoints
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Инициализация хранилища задач скоринга.
+        :param db_path: Путь к файлу базы SQLite.
+        """
+        self._db_path = Path(db_path)
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS scoring_jobs (
+                        job_id TEXT PRIMARY KEY,
+                        state TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        owner_pid INTEGER,
+                        created_at REAL NOT NULL
+                    )
+                    """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def save(self, job: ScoringJob):
+        """
+        Сохраняет состояние задачи вместе с контрольной точкой.
+        :param job: Задача.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO scoring_jobs VALUES (?, ?, ?, ?, ?)",
+                    (
+                        job.job_id,
+                        json.dumps(job.__dict__),
+                        job.status,
+                        job.owner_pid,
+                        job.created_at,
+                    ),
+                )
+
+    def get(self, job_id: str) -> ScoringJob | None:
+        """
+        Возвращает сохраненное состояние задачи.
+        :param job_id: ID задачи.
+        :return: Задача или None, если её нет.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT state FROM scoring_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return ScoringJob(**json.loads(row["state"])) if row is not None else None
+
+    def list_jobs(self, statuses: set[str] | None = None) -> list[ScoringJob]:
+        """
+        Возвращает задачи, начиная с последних созданных.
+        :param statuses: Фильтр по статусам (None – все задачи).
+        :return: Список задач.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT state, status FROM scoring_jobs ORDER BY created_at DESC"
+            ).fetchall()
+        return [
+            ScoringJob(**json.loads(row["state"]))
+            for row in rows
+            if statuses is None or row["status"] in statuses
+        ]
+
+    def claim(self, job: ScoringJob, owner_pid: int) -> bool:
+        """
+        Атомарно передает задачу процессу, если её владелец не сменился с момента чтения.
+        :param job: Прочитанное состояние задачи.
+        :param owner_pid: PID нового владельца.
+        :return: True, если задача досталась этому процессу.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                cursor = conn.execute(
+                    "UPDATE scoring_jobs SET owner_pid = ? "
+                    "WHERE job_id = ? AND owner_pid IS ? AND status = ?",
+                    (owner_pid, job.job_id, job.owner_pid, job.status),
+                )
+        return cursor.rowcount == 1
+
+
+def _pid_alive(pid: int | None) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _CsvSink:
+    """
+    Appends scored chunks to one CSV file
+    """
+
+    def __init__(self, path: Path, offset: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # pylint: disable-next=consider-using-with
+        self._file = open(path, "r+b" if path.exists() else "wb")
+        # Хвост, записанный после последней контрольной точки, отбрасывается
+        self._file.truncate(offset)
+        self._file.seek(offset)
+
+    def write(self, index: int, frame: pd.DataFrame) -> int:
+        """
+        Дописывает чанк в файл и сбрасывает его на диск.
+        :param index: Номер чанка (CSV пишется последовательно, номер не нужен).
+        :param frame: Результат скоринга чанка.
+        :return: Смещение в файле после записи – контрольная точка.
+        """
+        del index
+        self._file.write(
+            frame.to_csv(index=False, header=self._file.tell() == 0).encode()
+        )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        """
+        Закрывает файл результата
+        """
+        self._file.close()
+
+
+class _ParquetSink:
+    """
+    Writes every scored chunk as separate part file of Parquet dataset directory
+    """
+
+    def __init__(self, path: Path, chunks_done: int):
+        self._path = path
+        self._path.mkdir(parents=True, exist_ok=True)
+        for part in self._path.glob("part-*.parquet"):
+            if int(part.stem.split("-")[1]) >= chunks_done:
+                part.unlink()
+
+    def write(self, index: int, frame: pd.DataFrame) -> int:
+        """
+        Записывает чанк отдельным файлом датасета через временный файл.
+        :param index: Номер чанка.
+        :param frame: Результат скоринга чанка.
+        :return: Контрольная точка (у Parquet – 0, чанки считаются по файлам).
+        """
+        part = self._path / f"part-{index:06d}.parquet"
+        tmp_part = part.with_suffix(".tmp")
+        frame.to_parquet(tmp_part, index=False)
+        tmp_part.replace(part)
+        return 0
+
+    def close(self):
+        """
+        Файлов, открытых между чанками, нет
+        """
+
+
+def _open_sink(job: ScoringJob) -> _CsvSink | _ParquetSink:
+    path = Path(job.output_path)
+    if path.suffix in PARQUET_SUFFIXES:
+        return _ParquetSink(path, job.chunks_done)
+    return _CsvSink(path, job.output_bytes)
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ScoringJobManager:
+    """
+    Runs batch scoring jobs in background threads, persisting progress after every chunk
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        job_store: ScoringJobStore,
+        max_jobs: int = 1,
+        workers: int = 2,
+        input_dirs: list[str] | None = None,
+        output_dir: str | None = None,
+    ):
+        """
+        Инициализация менеджера задач скоринга.
+        :param model_manager: Менеджер моделей.
+        :param job_store: Хранилище состояний задач.
+        :param max_jobs: Число одновременно выполняемых задач.
+        :param workers: Число потоков, параллельно считающих чанки одной задачи.
+        :param input_dirs: Директории, из которых можно читать входные файлы
+            (None – без ограничений).
+        :param output_dir: Директория, внутри которой создаются выходные файлы
+            (None – без ограничений).
+        """
+        self._model_manager = model_manager
+        self._job_store = job_store
+        self._workers = workers
+        self._input_dirs = (
+            [Path(path).resolve() for path in input_dirs]
+            if input_dirs is not None
+            else None
+        )
+        self._output_dir = (
+            Path(output_dir).resolve() if output_dir is not None else None
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_jobs, thread_name_prefix="scoring"
+        )
+        self._active: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def submit(
+        self,
+        model_id: str,
+        input_path: str,
+        output_path: str,
+        chunk_rows: int = 100_000,
+        feature_columns: list[str] | None = None,
+        passthrough_columns: list[str] | None = None,
+    ) -> ScoringJob:
+        """
+        Ставит задачу скоринга в очередь.
+        :param model_id: ID модели.
+        :param input_path: CSV или Parquet файл с признаками.
+        :param output_path: Выходной CSV файл или директория Parquet (суффикс .parquet).
+        :param chunk_rows: Число строк в чанке.
+        :param feature_columns: Колонки признаков (None – все, кроме passthrough_columns).
+        :param passthrough_columns: Колонки, копируемые в выходной файл рядом с предсказанием.
+        :return: Созданная задача.
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be positive")
+        if not self._model_manager.model_exists(model_id):
+            raise FileNotFoundError(f"Model {model_id} not found.")
+        source = Path(input_path).resolve()
+        if self._input_dirs is not None and not any(
+            source.is_relative_to(allowed) for allowed in self._input_dirs
+        ):
+            raise PermissionError(
+                f"Path {input_path} is outside of allowed input directories"
+            )
+        if not source.is_file():
+            raise FileNotFoundError(f"Input file {input_path} not found.")
+        target = Path(output_path)
+        if self._output_dir is not None:
+            target = (self._output_dir / output_path).resolve()
+            if not target.is_relative_to(self._output_dir):
+                raise PermissionError(
+                    f"Path {output_path} is outside of output directory"
+                )
+
+        job = ScoringJob(
+            job_id=uuid.uuid4().hex,
+            model_id=model_id,
+            input_path=str(source),
+            output_path=str(target.resolve()),
+            chunk_rows=chunk_rows,
+            feature_columns=feature_columns,
+            passthrough_columns=passthrough_columns or [],
+            total_rows=count_rows(source),
+            owner_pid=os.getpid(),
+        )
+        self._job_store.save(job)
+        self._start(job)
+        LOGGER.info(f"Scoring job {job.job_id} for {model_id} submitted")
+        return job
+
+    def resume(self, job_id: str) -> ScoringJob:
+        """
+        Продолжает прерванную, упавшую или отмененную задачу с последней контрольной точки.
+        :param job_id: ID задачи.
+        :return: Задача.
+        """
+        job = self.get(job_id)
+        with self._lock:
+            if job_id in self._active:
+                return job
+        orphaned = job.status in ("pending", "running") and not self._owner_alive(job)
+        if job.status not in RESUMABLE_STATUSES and not orphaned:
+            raise ValueError(f"Job is {job.status}")
+        if not self._job_store.claim(job, os.getpid()):
+            raise ValueError("Job was resumed by another process")
+        job.owner_pid = os.getpid()
+        job.status = "pending"
+        job.error = None
+        job.finished_at = None
+        self._job_store.save(job)
+        self._start(job)
+        LOGGER.info(f"Scoring job {job_id} resumed from row {job.rows_done}")
+        return job
+
+    def resume_interrupted(self) -> list[str]:
+        """
+        Продолжает задачи, выполнение которых оборвалось вместе с процессом-владельцем.
+        :return: ID продолженных задач.
+        """
+        resumed = []
+        for job in self._job_store.list_jobs({"pending", "running", "interrupted"}):
+            if self._owner_alive(job):
+                continue
+            try:
+                resumed.append(self.resume(job.job_id).job_id)
+            except ValueError:
+                continue
+        return resumed
+
+    def _owner_alive(self, job: ScoringJob) -> bool:
+        if job.owner_pid == os.getpid():
+            # PID мог достаться этому процессу после перезапуска контейнера
+            with self._lock:
+                return job.job_id in self._active
+        return _pid_alive(job.owner_pid)
+
+    def _start(self, job: ScoringJob):
+        cancel = threading.Event()
+        with self._lock:
+            self._active[job.job_id] = cancel
+        self._executor.submit(self._run, job, cancel)
+
+    def get(self, job_id: str) -> ScoringJob:
+        """
+        Возвращает задачу с текущим прогрессом.
+        :param job_id: ID задачи.
+        :return: Задача.
+        """
+        job = self._job_store.get(job_id)
+        if job is None:
+            raise KeyError(f"Scoring job {job_id} not found")
+        return job
+
+    def list_jobs(self) -> list[ScoringJob]:
+        """
+        Возвращает все задачи, начиная с последних созданных.
+        :return: Список задач.
+        """
+        return self._job_store.list_jobs()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Останавливает задачу после текущего чанка.
+        :param job_id: ID задачи.
+        :return: True, если задача выполняется в этом процессе и будет остановлена.
+        """
+        self.get(job_id)
+        with self._lock:
+            cancel = self._active.get(job_id)
+        if cancel is None:
+            return False
+        cancel.set()
+        return True
+
+    def _run(self, job: ScoringJob, cancel: threading.Event):
+        job.status = "running"
+        self._job_store.save(job)
+        sink = None
+        try:
+            sink = _open_sink(job)
+            self._score(job, cancel, sink)
+            if not cancel.is_set():
+                job.status = "succeeded"
+            else:
+                job.status = "interrupted" if self._stopping else "cancelled"
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            LOGGER.exception(f"Scoring job {job.job_id} failed")
+            job.status = "failed"
+            job.error = str(exc)
+        finally:
+            if sink is not None:
+                sink.close()
+            job.finished_at = time.time()
+            self._job_store.save(job)
+            with self._lock:
+                self._active.pop(job.job_id, None)
+        LOGGER.info(f"Scoring job {job.job_id} finished with status {job.status}")
+
+    def _score(self, job: ScoringJob, cancel: threading.Event, sink):
+        # Модель загружается один раз, дальше потоки берут её из кэша ModelManager
+        self._model_manager.load_model(job.model_id)
+        start = time.perf_counter()
+        rows_start = job.rows_done
+        in_flight: deque[tuple[pd.DataFrame, Future]] = deque()
+
+        def write_next():
+            chunk, future = in_flight.popleft()
+            scored = chunk[job.passthrough_columns].copy()
+            scored["prediction"] = np.asarray(future.result())
+            job.output_bytes = sink.write(job.chunks_done, scored)
+            job.chunks_done += 1
+            job.rows_done += len(chunk)
+            job.rows_per_s = (job.rows_done - rows_start) / (
+                time.perf_counter() - start
+            )
+            self._job_store.save(job)
+
+        # Чтение и запись идут по порядку в этом потоке, чанки считаются
+        # параллельно; в памяти не больше workers + 1 чанков
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            for chunk in iter_chunks(
+                Path(job.input_path), job.chunk_rows, job.rows_done
+            ):
+                if cancel.is_set():
+                    break
+                if job.feature_columns is not None:
+                    features = chunk[job.feature_columns]
+                else:
+                    features = chunk.drop(columns=job.passthrough_columns)
+                future = pool.submit(
+                    self._model_manager.predict, job.model_id, features, False
+                )
+                in_flight.append((chunk, future))
+                if len(in_flight) > self._workers:
+                    write_next()
+            while in_flight:
+                write_next()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Останавливает выполняемые задачи после текущего чанка, оставляя их продолжаемыми.
+        :param wait: Дождаться остановки задач.
+        """
+        self._stopping = True
+        with self._lock:
+            for cancel in self._active.values():
+                cancel.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def main():
+    """
+    Run scoring job in this process and print progress until it finishes
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--model-id")
+    parser.add_argument("--input", help="CSV or Parquet file with features")
+    parser.add_argument(
+        "--output", help="CSV file or Parquet directory (.parquet suffix)"
+    )
+    parser.add_argument("--resume", metavar="JOB_ID", help="Continue interrupted job")
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--feature-columns", nargs="+")
+    parser.add_argument("--passthrough-columns", nargs="+", default=[])
+    parser.add_argument("--storage-dir", default="./models_storage")
+    args = parser.parse_args()
+    if args.resume is None and not (args.model_id and args.input and args.output):
+        parser.error("--model-id, --input and --output are required without --resume")
+
+    logging.basicConfig(level=logging.WARNING)
+    model_manager = ModelManager(args.storage_dir)
+    jobs = ScoringJobManager(
+        model_manager,
+        ScoringJobStore(model_manager.storage_dir / "scoring_jobs.sqlite3"),
+        workers=args.workers,
+    )
+    if args.resume is not None:
+        job = jobs.resume(args.resume)
+    else:
+        job = jobs.submit(
+            args.model_id,
+            args.input,
+            args.output,
+            chunk_rows=args.chunk_rows,
+            feature_columns=args.feature_columns,
+            passthrough_columns=args.passthrough_columns,
+        )
+    print(f"Scoring job {job.job_id}")
+    try:
+        while (job := jobs.get(job.job_id)).status in ("pending", "running"):
+            total = f"/{job.total_rows}" if job.total_rows is not None else ""
+            print(
+                f"\r{job.rows_done}{total} rows, {job.rows_per_s or 0:.0f} rows/s",
+                end="",
+            )
+            time.sleep(1)
+    except KeyboardInterrupt:
+        jobs.shutdown()
+        job = jobs.get(job.job_id)
+        print(f"\nInterrupted, continue with: --resume {job.job_id}")
+        return
+    jobs.shutdown()
+    print(f"\n{job.status}: {job.rows_done} rows, {job.rows_per_s or 0:.0f} rows/s")
+    if job.error:
+        print(job.error)
+
+
+if __name__ == "__main__":
+    main()
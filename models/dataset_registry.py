@@ -0,0 +1,232 @@
+"""
+Server-side registry of datasets stored as Parquet
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from models.fingerprint import fingerprint_dataset
+from models.model_cache import ModelCache
+
+DATASET_SUFFIXES = {".csv", ".parquet", ".pq"}
+
+
+@dataclass
+class DatasetRecord:
+    """
+    Metadata of stored dataset
+    """
+
+    dataset_id: str
+    name: str
+    rows: int
+    columns: list[str]
+    size_bytes: int
+    created_at: float
+
+
+def read_table(path: Path) -> pd.DataFrame:
+    """
+    Читает CSV или Parquet файл.
+    :param path: Путь к файлу.
+    :return: Данные.
+    """
+    if path.suffix not in DATASET_SUFFIXES:
+        raise ValueError(f"Unsupported dataset file type '{path.suffix}'")
+    if path.suffix == ".csv":
+        return pd.read_csv(path)
+    return pd.read_parquet(path)
+
+
+class DatasetRegistry:
+    """
+    Stores uploaded or registered datasets as Parquet files with SQLite index
+    and keeps recently used ones in memory
+    """
+
+    def __init__(
+        self,
+        storage_dir: str,
+        cache_max_bytes: int = 1024**3,
+        allowed_dirs: list[str] | None = None,
+        hash_len: int = 16,
+    ):
+        """
+        Инициализация реестра датасетов.
+        :param storage_dir: Директория хранения датасетов.
+        :param cache_max_bytes: Бюджет памяти кэша загруженных датасетов в байтах.
+        :param allowed_dirs: Директории, файлы из которых можно регистрировать по пути.
+        :param hash_len: Длина хэша данных в ID датасета.
+        """
+        self._storage_dir = Path(storage_dir)
+        self._storage_dir.mkdir(parents=True, exist_ok=True)
+        self._allowed_dirs = [Path(path).resolve() for path in allowed_dirs or []]
+        self._hash_len = hash_len
+        self.cache = ModelCache(max_bytes=cache_max_bytes)
+        self._db_path = self._storage_dir / "datasets.sqlite3"
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS datasets (
+                        dataset_id TEXT PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        rows INTEGER NOT NULL,
+                        columns TEXT NOT NULL,
+                        size_bytes INTEGER NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                    """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _path(self, dataset_id: str) -> Path:
+        return self._storage_dir / f"{dataset_id}.parquet"
+
+    def add(self, frame: pd.DataFrame, name: str | None = None) -> DatasetRecord:
+        """
+        Сохраняет датасет. Одинаковые данные получают один и тот же ID.
+        :param frame: Данные.
+        :param name: Имя датасета для отображения.
+        :return: Запись о датасете.
+        """
+        if frame.empty:
+            raise ValueError("Dataset is empty")
+        frame.columns = [str(column) for column in frame.columns]
+        dataset_id = f"ds_{fingerprint_dataset(frame)[: self._hash_len]}"
+        record = self._get_record(dataset_id)
+        if record is not None:
+            return record
+
+        path = self._path(dataset_id)
+        # Запись во временный файл и переименование: читатели не видят недописанный файл
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        frame.to_parquet(tmp_path, index=False)
+        tmp_path.replace(path)
+        record = DatasetRecord(
+            dataset_id=dataset_id,
+            name=name or dataset_id,
+            rows=len(frame),
+            columns=list(frame.columns),
+            size_bytes=path.stat().st_size,
+            created_at=time.time(),
+        )
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO datasets VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        record.dataset_id,
+                        record.name,
+                        record.rows,
+                        "\x1f".join(record.columns),
+                        record.size_bytes,
+                        record.created_at,
+                    ),
+                )
+        self.cache.put(dataset_id, frame, _frame_size(frame))
+        return record
+
+    def register_path(self, path: str, name: str | None = None) -> DatasetRecord:
+        """
+        Регистрирует CSV или Parquet файл на сервере.
+        :param path: Путь к файлу внутри разрешенных директорий.
+        :param name: Имя датасета (по умолчанию путь к файлу).
+        :return: Запись о датасете.
+        """
+        resolved = Path(path).resolve()
+        if not any(resolved.is_relative_to(allowed) for allowed in self._allowed_dirs):
+            raise PermissionError(
+                f"Path {path} is outside of allowed dataset directories"
+            )
+        if not resolved.is_file():
+            raise FileNotFoundError(f"Dataset file {path} not found.")
+        return self.add(read_table(resolved), name or str(path))
+
+    def get(self, dataset_id: str) -> DatasetRecord:
+        """
+        Возвращает метаданные датасета.
+        :param dataset_id: ID датасета.
+        :return: Запись о датасете.
+        """
+        record = self._get_record(dataset_id)
+        if record is None:
+            raise FileNotFoundError(f"Dataset {dataset_id} not found.")
+        return record
+
+    def load(self, dataset_id: str) -> pd.DataFrame:
+        """
+        Загружает датасет, используя кэш в памяти.
+        Возвращаемый DataFrame общий для всех запросов и не должен изменяться.
+        :param dataset_id: ID датасета.
+        :return: Данные.
+        """
+        frame = self.cache.get(dataset_id)
+        if frame is not None:
+            return frame
+        path = self._path(dataset_id)
+        if self._get_record(dataset_id) is None or not path.exists():
+            raise FileNotFoundError(f"Dataset {dataset_id} not found.")
+        frame = pd.read_parquet(path)
+        self.cache.put(dataset_id, frame, _frame_size(frame))
+        return frame
+
+    def list_records(self) -> list[DatasetRecord]:
+        """
+        Возвращает все датасеты, начиная с последних добавленных.
+        :return: Список записей.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM datasets ORDER BY created_at DESC"
+            ).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def delete(self, dataset_id: str):
+        """
+        Удаляет датасет.
+        :param dataset_id: ID датасета.
+        """
+        self.get(dataset_id)
+        self.cache.invalidate(dataset_id)
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM datasets WHERE dataset_id = ?", (dataset_id,))
+        self._path(dataset_id).unlink(missing_ok=True)
+
+    def _get_record(self, dataset_id: str) -> DatasetRecord | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM datasets WHERE dataset_id = ?", (dataset_id,)
+            ).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> DatasetRecord:
+        return DatasetRecord(
+            dataset_id=row["dataset_id"],
+            name=row["name"],
+            rows=row["rows"],
+            columns=row["columns"].split("\x1f"),
+            size_bytes=row["size_bytes"],
+            created_at=row["created_at"],
+        )
+
+
+def _frame_size(frame: pd.DataFrame) -> int:
+    return int(frame.memory_usage(index=True, deep=True).sum())
+
+
+DATASET_REGISTRY = DatasetRegistry(
+    os.getenv("DATASET_STORAGE_DIR", "./datasets_storage"),
+    cache_max_bytes=int(os.getenv("DATASET_CACHE_MAX_BYTES", str(1024**3))),
+    allowed_dirs=os.getenv("DATASET_ALLOWED_DIRS", "./datasets").split(","),
+)
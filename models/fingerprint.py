@@ -0,0 +1,94 @@
+"""
+Dataset fingerprinting
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional dependency
+    xxhash = None
+
+from models.ml_models.base_model import DataType, TargetType
+
+HASH_ALGORITHMS = ["blake2b", "sha256"] + (["xxh3"] if xxhash is not None else [])
+
+
+def _new_hasher(algorithm: str):
+    if algorithm == "xxh3":
+        if xxhash is None:
+            raise ValueError("Hash algorithm 'xxh3' requires the xxhash package")
+        return xxhash.xxh3_128()
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm '{algorithm}'")
+    return hashlib.new(algorithm)
+
+
+def _update_with_column(hasher, name: str, column: pd.Series, chunk_rows: int):
+    """
+    Добавляет в хэш имя, тип и содержимое колонки.
+    Числовые колонки хэшируются по байтам буфера NumPy без преобразования в текст,
+    остальные – через детерминированный pandas.util.hash_pandas_object.
+    """
+    hasher.update(f"{name}\x00{column.dtype}\x00".encode())
+    dtype = column.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        values = column.to_numpy(copy=False)
+        for start in range(0, len(values), chunk_rows):
+            # Копируется только срез, если колонка не непрерывна в памяти
+            chunk = np.ascontiguousarray(values[start : start + chunk_rows])
+            hasher.update(memoryview(chunk).cast("B"))
+    else:
+        for start in range(0, len(column), chunk_rows):
+            chunk = column.iloc[start : start + chunk_rows]
+            hashed = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+            hasher.update(memoryview(np.ascontiguousarray(hashed)).cast("B"))
+
+
+def fingerprint_dataset(
+    X: DataType,
+    y: TargetType | None = None,
+    algorithm: str = "blake2b",
+    chunk_rows: int = 1 << 20,
+) -> str:
+    """
+    Вычисляет отпечаток датасета, стабильный между процессами и запусками.
+    :param X: Признаки.
+    :param y: Целевые значения (добавляются как колонка target).
+    :param algorithm: Алгоритм хэширования: blake2b, sha256 или xxh3 (если установлен xxhash).
+    :param chunk_rows: Размер блока строк для хэширования.
+    :return: Hex-строка отпечатка.
+    """
+    hasher = _new_hasher(algorithm)
+    data = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+    hasher.update(f"{data.shape[0]}\x00{data.shape[1]}\x00".encode())
+    for name, column in data.items():
+        _update_with_column(hasher, str(name), column, chunk_rows)
+    if y is not None:
+        _update_with_column(hasher, "target", pd.Series(np.asarray(y)), chunk_rows)
+    return hasher.hexdigest()
+
+
+def fingerprint_file(
+    path: str,
+    extra: str = "",
+    algorithm: str = "blake2b",
+    block_bytes: int = 1 << 24,
+) -> str:
+    """
+    Вычисляет отпечаток файла по его байтам, читая файл блоками.
+    :param path: Путь к файлу.
+    :param extra: Строка, добавляемая в хэш перед содержимым (например, целевая колонка).
+    :param algorithm: Алгоритм хэширования: blake2b, sha256 или xxh3 (если установлен xxhash).
+    :param block_bytes: Размер блока чтения в байтах.
+    :return: Hex-строка отпечатка.
+    """
+    hasher = _new_hasher(algorithm)
+    hasher.update(f"{extra}\x00".encode())
+    with open(path, "rb") as file:
+        while block := file.read(block_bytes):
+            hasher.update(block)
+    return hasher.hexdigest()
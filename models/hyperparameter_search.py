@@ -0,0 +1,589 @@
+"""
+Parallel hyperparameter search: grid, random and successive halving
+"""
+
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import closing
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from models.ml_models.base_model import DataType, TargetType
+from models.model_manager import ModelManager
+from models.pool_cache import QuantizedPoolCache
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover - optional dependency
+    threadpool_limits = None
+
+LOGGER = logging.getLogger(__name__)
+
+STRATEGIES = {"grid", "random", "halving"}
+# Метрика: функция и знак, с которым она минимизируется
+METRICS = {
+    "mse": (mean_squared_error, 1.0),
+    "mae": (mean_absolute_error, 1.0),
+    "r2": (r2_score, -1.0),
+}
+# Бюджет successive halving по умолчанию: число итераций бустинга или строк обучения
+DEFAULT_RESOURCES = {"CatBoostRegModel": "iterations"}
+
+
+@dataclass
+# pylint: disable-next=too-many-instance-attributes
+class SearchSpec:
+    """
+    Search space and settings of hyperparameter search
+    """
+
+    model_type: str
+    space: dict[str, Any]
+    strategy: str = "grid"
+    n_trials: int = 20
+    metric: str = "mse"
+    validation_fraction: float = 0.2
+    seed: int = 0
+    workers: int | None = None
+    threads_per_trial: int = 1
+    resource: str | None = None
+    min_resource: int | None = None
+    max_resource: int | None = None
+    eta: int = 3
+
+
+@dataclass
+# pylint: disable-next=too-many-instance-attributes
+class SearchJob:
+    """
+    State of hyperparameter search with trial leaderboard
+    """
+
+    search_id: str
+    model_type: str
+    strategy: str
+    metric: str
+    status: str = "pending"
+    trials: list[dict] = field(default_factory=list)
+    best_params: dict | None = None
+    best_score: float | None = None
+    best_model_id: str | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    def leaderboard(self) -> list[dict]:
+        """
+        Успешные испытания от лучшего к худшему; при successive halving
+        выше идут испытания с большим бюджетом.
+        :return: Список испытаний.
+        """
+        sign = METRICS[self.metric][1]
+        done = [trial for trial in self.trials if trial["status"] == "succeeded"]
+        return sorted(done, key=lambda trial: (-trial["rung"], sign * trial["score"]))
+
+
+class SearchStore:
+    """
+    SQLite-backed search states shared by server worker processes
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Инициализация хранилища поисков.
+        :param db_path: Путь к файлу базы SQLite.
+        """
+        self._db_path = Path(db_path)
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS searches (
+                        search_id TEXT PRIMARY KEY,
+                        state TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                    """)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=30)
+
+    def save(self, job: SearchJob):
+        """
+        Сохраняет состояние поиска.
+        :param job: Поиск.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO searches VALUES (?, ?, ?)",
+                    (
+                        job.search_id,
+                        json.dumps(asdict(job), default=str),
+                        job.created_at,
+                    ),
+                )
+
+    def get(self, search_id: str) -> SearchJob | None:
+        """
+        Возвращает сохраненное состояние поиска.
+        :param search_id: ID поиска.
+        :return: Поиск или None, если его нет.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT state FROM searches WHERE search_id = ?", (search_id,)
+            ).fetchone()
+        return SearchJob(**json.loads(row[0])) if row is not None else None
+
+
+def _resource(spec: SearchSpec) -> str:
+    """
+    Ресурс successive halving: гиперпараметр из настроек, по умолчанию для типа модели или rows
+    """
+    return spec.resource or DEFAULT_RESOURCES.get(spec.model_type, "rows")
+
+
+def _check_domain(name: str, domain: Any):
+    if isinstance(domain, list):
+        if not domain:
+            raise ValueError(f"No values for hyperparameter '{name}'")
+        return
+    if not isinstance(domain, dict) or not {"low", "high"} <= set(domain):
+        raise ValueError(
+            f"Hyperparameter '{name}' must be list of values or range {{low, high}}"
+        )
+    if not all(isinstance(domain[key], (int, float)) for key in ("low", "high")):
+        raise ValueError(f"Range of hyperparameter '{name}' must be numeric")
+    if domain["low"] > domain["high"] or (
+        domain.get("log", False) and domain["low"] <= 0
+    ):
+        raise ValueError(f"Invalid range of hyperparameter '{name}'")
+
+
+def _sample_value(rng: np.random.Generator, domain: Any) -> Any:
+    if isinstance(domain, list):
+        return domain[rng.integers(len(domain))]
+    low, high = domain["low"], domain["high"]
+    if domain.get("log", False):
+        value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+    else:
+        value = float(rng.uniform(low, high))
+    return int(round(value)) if domain.get("type") == "int" else value
+
+
+def generate_candidates(spec: SearchSpec) -> list[dict]:
+    """
+    Строит наборы гиперпараметров для испытаний.
+    Значение в space – список вариантов или диапазон {"low", "high", "log", "type"}
+    (только для random и halving).
+    :param spec: Настройки поиска.
+    :return: Список наборов гиперпараметров.
+    """
+    names = list(spec.space)
+    for name in names:
+        _check_domain(name, spec.space[name])
+    if spec.strategy == "grid":
+        if not all(isinstance(spec.space[name], list) for name in names):
+            raise ValueError("Grid search requires lists of values")
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*(spec.space[name] for name in names))
+        ]
+    rng = np.random.default_rng(spec.seed)
+    candidates = []
+    for _ in range(spec.n_trials):
+        candidate = {name: _sample_value(rng, spec.space[name]) for name in names}
+        if candidate not in candidates:
+            candidates.append(candidate)
+    return candidates
+
+
+# Данные поиска в дочернем процессе: загружаются один раз через mmap
+_WORKER: dict[str, Any] = {}
+
+
+def _init_worker(data_dir: str, threads: int, pool_cache_bytes: int):
+    _WORKER.clear()
+    _WORKER["data_dir"] = Path(data_dir)
+    _WORKER["threads"] = threads
+    # Обучающая часть данных нужна только этому поиску, пулы держатся лишь в памяти
+    _WORKER["pool_cache"] = (
+        QuantizedPoolCache(max_bytes=pool_cache_bytes) if pool_cache_bytes > 0 else None
+    )
+    if threadpool_limits is not None:
+        # Ссылка хранится, чтобы ограничение потоков BLAS/OpenMP действовало всё время
+        _WORKER["limits"] = threadpool_limits(limits=threads)
+
+
+def _shared_data() -> dict[str, Any]:
+    if "X" not in _WORKER:
+        data_dir = _WORKER["data_dir"]
+        # Страницы файлов общие для всех процессов пула, копии данных не создаются
+        _WORKER["X"] = np.load(data_dir / "X.npy", mmap_mode="r")
+        _WORKER["y"] = np.load(data_dir / "y.npy", mmap_mode="r")
+        _WORKER["order"] = np.load(data_dir / "order.npy")
+        meta = json.loads((data_dir / "meta.json").read_text())
+        _WORKER["columns"] = meta["columns"]
+        _WORKER["n_train"] = meta["n_train"]
+    return _WORKER
+
+
+def _frame(values: np.ndarray, columns: list[str]) -> pd.DataFrame:
+    return pd.DataFrame(values, columns=columns, copy=False)
+
+
+def _train_data(model_class, n_rows: int, params: dict) -> tuple:
+    data = _shared_data()
+    return model_class.prepare_train_data(
+        _frame(data["X"][:n_rows], data["columns"]),
+        data["y"][:n_rows],
+        params,
+        cache=data["pool_cache"],
+        data_key=f"{data['data_dir'].name}-{n_rows}",
+    )
+
+
+# pylint: disable-next=too-many-arguments,too-many-locals,too-many-positional-arguments
+def _run_trial(
+    model_classes: dict[str, type],
+    model_type: str,
+    params: dict,
+    resource: str | None,
+    budget: int | None,
+    metric: str,
+) -> tuple[float, float]:
+    """
+    Обучает модель на обучающей части данных и оценивает на валидационной.
+    :return: Значение метрики и время обучения в секундах.
+    """
+    data = _shared_data()
+    n_train = data["n_train"]
+    params = dict(params)
+    n_rows = n_train
+    if resource == "rows":
+        n_rows = min(n_train, int(budget))
+    elif resource is not None:
+        params[resource] = int(budget)
+
+    model_class = model_classes[model_type]
+    trainer = model_class(hyperparams=params)
+    trainer.set_thread_limit(data["threads"])
+    X_fit, y_fit = _train_data(model_class, n_rows, params)
+    start = time.perf_counter()
+    trainer.fit(X_fit, y_fit)
+    fit_seconds = time.perf_counter() - start
+
+    X_val = _frame(data["X"][n_train:], data["columns"])
+    score_func, _ = METRICS[metric]
+    return float(score_func(data["y"][n_train:], trainer.predict(X_val))), fit_seconds
+
+
+def _train_best(
+    storage_dir: str, worker_options: dict, model_type: str, params: dict
+) -> str:
+    """
+    Обучает лучшую модель на всех данных в исходном порядке строк,
+    чтобы её ID совпал с ID модели, обученной через /train на этом датасете.
+    :return: ID модели
+    """
+    data = _shared_data()
+    inverse = np.argsort(data["order"])
+    manager = ModelManager(storage_dir, cache_max_bytes=0, **worker_options)
+    X = _frame(np.asarray(data["X"])[inverse], data["columns"])
+    y = np.asarray(data["y"])[inverse]
+    return manager.train_and_save_model(model_type, X, y, params)
+
+
+class HyperparameterSearchManager:
+    """
+    Runs hyperparameter searches, fanning trials out over process pool
+    """
+
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        search_store: SearchStore | None = None,
+        max_workers: int | None = None,
+        pool_cache_bytes: int = 512 * 1024**2,
+    ):
+        """
+        Инициализация менеджера поиска гиперпараметров.
+        :param model_manager: Менеджер моделей, в хранилище которого сохраняется лучшая модель.
+        :param search_store: Общее хранилище состояний поисков для других процессов сервера.
+        :param max_workers: Максимум процессов одного поиска (по умолчанию число CPU).
+        :param pool_cache_bytes: Бюджет памяти кэша квантизованных пулов в каждом процессе
+            поиска (0 – без кэша). Процессы живут только во время поиска.
+        """
+        self._model_manager = model_manager
+        self._search_store = search_store
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._pool_cache_bytes = pool_cache_bytes
+        self._jobs: dict[str, SearchJob] = {}
+        self._cancelled: set[str] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, spec: SearchSpec, X: DataType, y: TargetType) -> SearchJob:
+        """
+        Запускает поиск в фоновом потоке.
+        :param spec: Настройки поиска.
+        :param X: Признаки.
+        :param y: Целевые значения.
+        :return: Созданный поиск.
+        """
+        if spec.model_type not in self._model_manager.available_models:
+            raise ValueError(f"Unsupported model type '{spec.model_type}'")
+        if spec.strategy not in STRATEGIES:
+            raise ValueError(f"Unsupported search strategy '{spec.strategy}'")
+        if spec.metric not in METRICS:
+            raise ValueError(f"Unsupported metric '{spec.metric}'")
+        if not 0 < spec.validation_fraction < 1:
+            raise ValueError("validation_fraction must be between 0 and 1")
+        if spec.eta < 2:
+            raise ValueError("eta must be at least 2")
+        if spec.n_trials < 1 or spec.threads_per_trial < 1 or (spec.workers or 1) < 1:
+            raise ValueError("n_trials, threads_per_trial and workers must be positive")
+        param_names = set(
+            self._model_manager.available_models[spec.model_type].get_param_names()
+        )
+        unknown = set(spec.space) - param_names
+        if unknown:
+            raise ValueError(f"Unknown hyperparameters {sorted(unknown)}")
+        if spec.strategy == "halving":
+            resource = _resource(spec)
+            if resource != "rows" and resource not in param_names:
+                raise ValueError(f"Unknown resource '{resource}'")
+            if resource in spec.space:
+                raise ValueError(
+                    f"Resource '{resource}' can not be part of search space"
+                )
+        candidates = generate_candidates(spec)
+        if not candidates:
+            raise ValueError("Search space is empty")
+
+        job = SearchJob(
+            search_id=uuid.uuid4().hex,
+            model_type=spec.model_type,
+            strategy=spec.strategy,
+            metric=spec.metric,
+        )
+        with self._lock:
+            self._jobs[job.search_id] = job
+        self._persist(job)
+        threading.Thread(
+            target=self._run, args=(job, spec, candidates, X, y), daemon=True
+        ).start()
+        LOGGER.info(f"Search {job.search_id} for {spec.model_type} submitted")
+        return job
+
+    def get(self, search_id: str) -> SearchJob:
+        """
+        Возвращает поиск по ID.
+        :param search_id: ID поиска.
+        :return: Поиск.
+        """
+        with self._lock:
+            job = self._jobs.get(search_id)
+        if job is None and self._search_store is not None:
+            job = self._search_store.get(search_id)
+        if job is None:
+            raise KeyError(f"Search {search_id} not found")
+        return job
+
+    def cancel(self, search_id: str) -> bool:
+        """
+        Останавливает поиск: испытания в очереди отменяются, идущие дорабатывают.
+        :param search_id: ID поиска.
+        :return: True, если поиск выполнялся в этом процессе.
+        """
+        job = self.get(search_id)
+        with self._lock:
+            if search_id not in self._jobs or job.status not in ("pending", "running"):
+                return False
+            self._cancelled.add(search_id)
+        return True
+
+    def _persist(self, job: SearchJob):
+        if self._search_store is not None:
+            self._search_store.save(job)
+
+    def _write_shared_data(
+        self, data_dir: Path, spec: SearchSpec, X: DataType, y: TargetType
+    ) -> int:
+        """
+        Записывает перемешанные данные в .npy: обучающая часть идет первой,
+        чтобы испытания брали её срезом без копирования.
+        :return: Размер обучающей части.
+        """
+        frame = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        n_rows = len(frame)
+        n_val = max(1, int(round(n_rows * spec.validation_fraction)))
+        if n_rows - n_val < 1:
+            raise ValueError("Not enough rows for validation split")
+        order = np.random.default_rng(spec.seed).permutation(n_rows)
+        np.save(data_dir / "X.npy", frame.to_numpy(dtype=np.float64)[order])
+        np.save(data_dir / "y.npy", np.asarray(y, dtype=np.float64)[order])
+        np.save(data_dir / "order.npy", order)
+        (data_dir / "meta.json").write_text(
+            json.dumps(
+                {"columns": [str(c) for c in frame.columns], "n_train": n_rows - n_val}
+            )
+        )
+        return n_rows - n_val
+
+    def _rungs(self, spec: SearchSpec, candidates: list[dict], n_train: int) -> tuple:
+        """
+        Ресурс и бюджеты successive halving.
+        :return: Имя ресурса (гиперпараметр или rows) и бюджеты по раундам.
+        """
+        if spec.strategy != "halving":
+            return None, [None]
+        resource = _resource(spec)
+        max_resource = spec.max_resource or (n_train if resource == "rows" else 1000)
+        n_rungs = max(1, int(np.floor(np.log(len(candidates)) / np.log(spec.eta))) + 1)
+        min_resource = spec.min_resource or max(
+            1, max_resource // spec.eta ** (n_rungs - 1)
+        )
+        budgets = []
+        budget = min_resource
+        while budget < max_resource and len(budgets) < n_rungs - 1:
+            budgets.append(budget)
+            budget *= spec.eta
+        budgets.append(max_resource)
+        return resource, budgets
+
+    # pylint: disable-next=too-many-locals
+    def _run(self, job: SearchJob, spec: SearchSpec, candidates, X, y):
+        workers = min(
+            spec.workers or max(1, self._max_workers // spec.threads_per_trial),
+            self._max_workers,
+            len(candidates),
+        )
+        job.status = "running"
+        self._persist(job)
+        status, error = "failed", None
+        try:
+            with (
+                tempfile.TemporaryDirectory(
+                    prefix="search-", dir=self._model_manager.storage_dir
+                ) as data_dir,
+                ProcessPoolExecutor(
+                    max_workers=max(1, workers),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(data_dir, spec.threads_per_trial, self._pool_cache_bytes),
+                ) as pool,
+            ):
+                n_train = self._write_shared_data(Path(data_dir), spec, X, y)
+                resource, budgets = self._rungs(spec, candidates, n_train)
+                survivors = candidates
+                for rung, budget in enumerate(budgets):
+                    scored = self._run_rung(
+                        pool, job, spec, survivors, rung, resource, budget
+                    )
+                    if job.search_id in self._cancelled:
+                        break
+                    if not scored:
+                        raise RuntimeError("All trials failed")
+                    keep = max(1, len(scored) // spec.eta)
+                    survivors = [trial["params"] for trial in scored[:keep]]
+
+                leaderboard = job.leaderboard()
+                if job.search_id in self._cancelled:
+                    status = "cancelled"
+                elif leaderboard:
+                    best = leaderboard[0]
+                    best_params = dict(best["params"])
+                    if resource not in (None, "rows"):
+                        best_params[resource] = best["resource"]
+                    job.best_params = best_params
+                    job.best_score = best["score"]
+                    self._persist(job)
+                    job.best_model_id = pool.submit(
+                        _train_best,
+                        str(self._model_manager.storage_dir),
+                        self._model_manager.worker_options,
+                        spec.model_type,
+                        best_params,
+                    ).result()
+                    status = "succeeded"
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            LOGGER.exception(f"Search {job.search_id} failed")
+            error = str(exc)
+        finally:
+            # Завершенный статус выставляется последним: поиск с ним всегда имеет finished_at
+            with self._lock:
+                job.finished_at = time.time()
+                job.error = error
+                job.status = status
+                self._cancelled.discard(job.search_id)
+            self._persist(job)
+        LOGGER.info(f"Search {job.search_id} finished with status {job.status}")
+
+    # pylint: disable-next=too-many-arguments,too-many-locals,too-many-positional-arguments
+    def _run_rung(
+        self, pool, job, spec, candidates, rung, resource, budget
+    ) -> list[dict]:
+        """
+        Запускает испытания одного раунда и возвращает успешные от лучшего к худшему
+        """
+        futures = {}
+        for params in candidates:
+            trial = {
+                "trial_id": len(job.trials),
+                "params": params,
+                "rung": rung,
+                "resource": budget,
+                "score": None,
+                "fit_seconds": None,
+                "status": "running",
+                "error": None,
+            }
+            job.trials.append(trial)
+            future = pool.submit(
+                _run_trial,
+                self._model_manager.available_models,
+                spec.model_type,
+                params,
+                resource,
+                budget,
+                spec.metric,
+            )
+            futures[future] = trial
+        self._persist(job)
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            if job.search_id in self._cancelled:
+                for future in pending:
+                    future.cancel()
+            for future in done:
+                trial = futures[future]
+                if future.cancelled():
+                    trial["status"] = "cancelled"
+                elif future.exception() is not None:
+                    trial["status"] = "failed"
+                    trial["error"] = str(future.exception())
+                else:
+                    trial["score"], trial["fit_seconds"] = future.result()
+                    trial["status"] = "succeeded"
+            if done:
+                self._persist(job)
+
+        sign = METRICS[spec.metric][1]
+        scored = [trial for trial in futures.values() if trial["status"] == "succeeded"]
+        return sorted(scored, key=lambda trial: sign * trial["score"])
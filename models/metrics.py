@@ -0,0 +1,495 @@
+"""
+Prometheus-style metrics shared by REST and gRPC servers
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+    1800.0,
+)
+
+# Значение метрики, вычисляемое при выгрузке: (имя, тип, описание, метки, значение)
+Sample = tuple[str, str, str, dict[str, str], float]
+
+
+# pylint: disable-next=too-few-public-methods
+class _Metric:
+    """
+    Metric with label values mapped to state
+    """
+
+    kind = ""
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._registry = registry
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        self._registry.start_flushing()
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Serializable state of metric
+        """
+        with self._lock:
+            values = [
+                [list(key), copy.deepcopy(value)] for key, value in self._values.items()
+            ]
+        return {
+            "kind": self.kind,
+            "documentation": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": values,
+        }
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing value
+    """
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        """
+        Увеличивает счётчик.
+        :param amount: Приращение.
+        :param labels: Значения меток.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down
+    """
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any):
+        """
+        Устанавливает значение.
+        :param value: Значение.
+        :param labels: Значения меток.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        """
+        Изменяет значение на amount.
+        :param amount: Приращение, может быть отрицательным.
+        :param labels: Значения меток.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values over fixed buckets
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any):
+        """
+        Добавляет наблюдение.
+        :param value: Наблюдаемое значение.
+        :param labels: Значения меток.
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Счётчики по корзинам без накопления, последняя корзина – +Inf
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """
+        Измеряет время выполнения блока в секундах.
+        :param labels: Значения меток.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict[str, Any]:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered in Prometheus text format.
+
+    With multiprocess_dir every process periodically writes its snapshot to
+    the directory and rendering merges snapshots of all live processes, so
+    any worker of a multi-process server returns totals for the whole server.
+    """
+
+    def __init__(
+        self, multiprocess_dir: str | None = None, flush_interval_s: float = 5.0
+    ):
+        """
+        Инициализация реестра метрик.
+        :param multiprocess_dir: Директория для снапшотов процессов (None – один процесс).
+        :param flush_interval_s: Как часто процесс записывает свой снапшот.
+        """
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], list[Sample]]] = []
+        self._lock = threading.Lock()
+        self._dir = Path(multiprocess_dir) if multiprocess_dir else None
+        self._flush_interval_s = flush_interval_s
+        self._flusher: threading.Thread | None = None
+
+    def _register(self, metric_class: type, name: str, *args: Any) -> Any:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(self, name, *args)
+            return self._metrics[name]
+
+    def counter(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Counter:
+        """
+        Возвращает счётчик, создавая его при первом обращении
+        """
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = ()
+    ) -> Gauge:
+        """
+        Возвращает измеритель, создавая его при первом обращении
+        """
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Возвращает гистограмму, создавая её при первом обращении
+        """
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def add_collector(self, collector: Callable[[], list[Sample]]):
+        """
+        Добавляет функцию, значения которой вычисляются при каждой выгрузке метрик.
+        Такие значения не объединяются между процессами.
+        :param collector: Функция, возвращающая список значений.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def start_flushing(self):
+        """
+        Запускает запись снапшотов процесса, если задана директория
+        """
+        if self._dir is None or self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+            atexit.register(self._remove_snapshot)
+
+    def _snapshot_path(self, pid: int) -> Path:
+        return self._dir / f"{pid}.json"
+
+    def _flush_loop(self):
+        while True:
+            self.flush()
+            time.sleep(self._flush_interval_s)
+
+    def flush(self):
+        """
+        Записывает снапшот метрик процесса
+        """
+        if self._dir is None:
+            return
+        path = self._snapshot_path(os.getpid())
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._snapshots()))
+        tmp_path.replace(path)
+
+    def _remove_snapshot(self):
+        self._snapshot_path(os.getpid()).unlink(missing_ok=True)
+
+    def _snapshots(self) -> dict[str, dict]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def _merged_snapshots(self) -> dict[str, dict]:
+        local = self._snapshots()
+        if self._dir is None:
+            return local
+        self.flush()
+        merged: dict[str, dict] = {}
+        for path in self._dir.glob("*.json"):
+            pid = int(path.stem)
+            if pid != os.getpid() and not _process_alive(pid):
+                # Снапшот упавшего процесса: его счётчики сбрасываются
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                snapshots = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, snapshot in snapshots.items():
+                _merge(merged, name, snapshot)
+        return merged
+
+    # pylint: disable-next=too-many-locals
+    def render(self) -> str:
+        """
+        Формирует метрики в текстовом формате Prometheus.
+        :return: Текст для ответа /metrics.
+        """
+        lines = []
+        for name, snapshot in sorted(self._merged_snapshots().items()):
+            lines.append(f"# HELP {name} {snapshot['documentation']}")
+            lines.append(f"# TYPE {name} {snapshot['kind']}")
+            labelnames = snapshot["labelnames"]
+            for key, value in snapshot["values"]:
+                labels = dict(zip(labelnames, key))
+                if snapshot["kind"] != "histogram":
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    )
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip([*snapshot["buckets"], "+Inf"], counts):
+                    cumulative += bucket_count
+                    bucket_labels = {**labels, "le": _format_value(bound)}
+                    lines.append(
+                        f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+                    )
+                lines.append(
+                    f"{name}_sum{_format_labels(labels)} {_format_value(total)}"
+                )
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        with self._lock:
+            collectors = list(self._collectors)
+        # Значения одной метрики должны идти подряд после её описания
+        families: dict[str, list[Sample]] = {}
+        for collector in collectors:
+            try:
+                samples = collector()
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                LOGGER.warning(f"Metrics collector failed: {exc}")
+                continue
+            for sample in samples:
+                families.setdefault(sample[0], []).append(sample)
+        for name, samples in families.items():
+            _, kind, documentation, _, _ = samples[0]
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for _, _, _, labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(merged: dict[str, dict], name: str, snapshot: dict):
+    target = merged.setdefault(name, {**snapshot, "values": []})
+    values = {tuple(key): value for key, value in target["values"]}
+    for key, value in snapshot["values"]:
+        key = tuple(key)
+        if key not in values:
+            values[key] = value
+        elif snapshot["kind"] == "histogram":
+            counts, total, count = values[key]
+            values[key] = [
+                [a + b for a, b in zip(counts, value[0])],
+                total + value[1],
+                count + value[2],
+            ]
+        else:
+            # Счётчики и измерители процессов суммируются
+            values[key] = values[key] + value
+    target["values"] = [[list(key), value] for key, value in values.items()]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float | str) -> str:
+    if isinstance(value, str):
+        return value
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def start_metrics_server(registry: "MetricsRegistry", port: int) -> ThreadingHTTPServer:
+    """
+    Запускает HTTP-сервер метрик в фоновом потоке (для gRPC-сервера).
+    :param registry: Реестр метрик.
+    :param port: Порт.
+    :return: HTTP-сервер.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        """
+        Serves rendered metrics on GET /metrics
+        """
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """
+            GET handler
+            """
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            return
+
+    server = ThreadingHTTPServer(("", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+METRICS = MetricsRegistry(os.getenv("METRICS_MULTIPROC_DIR"))
+
+REQUEST_SECONDS = METRICS.histogram(
+    "mlops_request_duration_seconds",
+    "Request latency by server, endpoint and model type",
+    ("server", "endpoint", "model_type"),
+)
+REQUESTS_TOTAL = METRICS.counter(
+    "mlops_requests_total",
+    "Handled requests by server, endpoint and status",
+    ("server", "endpoint", "status"),
+)
+STAGE_SECONDS = METRICS.histogram(
+    "mlops_stage_duration_seconds",
+    "Time spent in request stages: decode, load, predict, encode",
+    ("stage", "model_type"),
+)
+ROWS_SCORED = METRICS.counter(
+    "mlops_rows_scored_total",
+    "Number of scored rows, rate() gives rows per second",
+    ("model_type",),
+)
+MODEL_CACHE_LOOKUPS = METRICS.counter(
+    "mlops_model_cache_lookups_total",
+    "Loaded model cache lookups by result (hit or miss)",
+    ("result",),
+)
+PREDICTION_CACHE_ROWS = METRICS.counter(
+    "mlops_prediction_cache_rows_total",
+    "Rows looked up in prediction cache by result (hit or miss)",
+    ("result",),
+)
+TRAINING_SECONDS = METRICS.histogram(
+    "mlops_training_duration_seconds",
+    "Training job duration by model type and final status",
+    ("model_type", "status"),
+)
+QUEUE_WAIT_SECONDS = METRICS.histogram(
+    "mlops_queue_wait_seconds",
+    "Time tasks wait for a free worker by pool",
+    ("pool",),
+)
@@ -0,0 +1,219 @@
+"""
+Micro-batching of concurrent predict requests
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from models.ml_models.base_model import DataType, TargetType
+from models.model_manager import ModelManager
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingBatch:
+    """
+    Requests for one model and column layout waiting to be scored
+    """
+
+    deadline: float
+    rows: int = 0
+    requests: list[tuple[pd.DataFrame, Future]] = field(default_factory=list)
+
+
+# pylint: disable-next=too-many-instance-attributes
+class PredictionBatcher:
+    """
+    Collects concurrent predict requests per model and scores them in one call
+    """
+
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        max_batch_rows: int = 1024,
+        max_wait_ms: float = 2.0,
+        workers: int = 4,
+    ):
+        """
+        Инициализация батчера предсказаний.
+        :param model_manager: Менеджер моделей для получения предсказаний.
+        :param max_batch_rows: Число строк, при котором батч отправляется без ожидания.
+        :param max_wait_ms: Сколько миллисекунд первый запрос батча ждет остальных.
+        :param workers: Число потоков, в которых считаются батчи.
+        """
+        self._model_manager = model_manager
+        self._max_batch_rows = max_batch_rows
+        self._max_wait = max_wait_ms / 1000
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="predict-batch"
+        )
+        self._pending: dict[tuple[str, tuple], _PendingBatch] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._batches = 0
+        self._requests = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, model_id: str, X: DataType) -> Future:
+        """
+        Ставит запрос в очередь на батчевое предсказание.
+        :param model_id: ID модели.
+        :param X: Данные для предсказания.
+        :return: Future с предсказаниями для X.
+        """
+        X = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+        future = Future()
+        # Батчи собираются только из запросов с одинаковым набором колонок
+        key = (model_id, tuple(X.columns))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Prediction batcher is closed")
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = self._pending[key] = _PendingBatch(
+                    deadline=time.monotonic() + self._max_wait
+                )
+            batch.requests.append((X, future))
+            batch.rows += len(X)
+            self._cond.notify()
+        return future
+
+    def predict(self, model_id: str, X: DataType) -> TargetType:
+        """
+        Синхронно получает предсказания через батчер.
+        :param model_id: ID модели.
+        :param X: Данные для предсказания.
+        :return: Предсказания
+        """
+        return self.submit(model_id, X).result()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    ready = [
+                        key
+                        for key, batch in self._pending.items()
+                        if self._closed
+                        or batch.rows >= self._max_batch_rows
+                        or batch.deadline <= now
+                    ]
+                    if ready or (self._closed and not self._pending):
+                        break
+                    timeout = (
+                        min(batch.deadline for batch in self._pending.values()) - now
+                        if self._pending
+                        else None
+                    )
+                    self._cond.wait(timeout)
+                if not ready:
+                    return
+                batches = [(key[0], self._pending.pop(key)) for key in ready]
+            for model_id, batch in batches:
+                self._executor.submit(self._score, model_id, batch.requests)
+
+    @staticmethod
+    def _resolve(future: Future, result=None, exc: BaseException | None = None):
+        """
+        Завершает future, не давая уже завершённому future прервать обработку батча
+        """
+        try:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            LOGGER.debug("Dropping result for a future that is already done")
+
+    def _score(self, model_id: str, requests: list[tuple[pd.DataFrame, Future]]):
+        # Отменённые вызывающей стороной запросы не считаются; остальные
+        # после этого уже нельзя отменить
+        requests = [
+            (X, future)
+            for X, future in requests
+            if future.set_running_or_notify_cancel()
+        ]
+        if not requests:
+            return
+        with self._cond:
+            self._batches += 1
+            self._requests += len(requests)
+
+        frames = [X for X, _ in requests]
+        try:
+            frame = (
+                frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            )
+            predictions = np.asarray(self._model_manager.predict(model_id, frame))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            if len(requests) == 1:
+                self._resolve(requests[0][1], exc=exc)
+                return
+            # Ошибка одного запроса не должна ронять весь батч
+            for X, future in requests:
+                try:
+                    result = self._model_manager.predict(model_id, X)
+                # pylint: disable-next=broad-exception-caught
+                except Exception as single_exc:
+                    self._resolve(future, exc=single_exc)
+                else:
+                    self._resolve(future, result)
+            return
+
+        offset = 0
+        for X, future in requests:
+            self._resolve(future, predictions[offset : offset + len(X)])
+            offset += len(X)
+
+    def stats(self) -> dict[str, float]:
+        """
+        Возвращает счётчики батчера.
+        :return: Число батчей, запросов и средний размер батча.
+        """
+        with self._cond:
+            return {
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_requests": (
+                    self._requests / self._batches if self._batches else 0.0
+                ),
+            }
+
+    def close(self):
+        """
+        Досчитывает накопленные запросы и останавливает батчер
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+
+def batcher_from_env(model_manager: ModelManager) -> PredictionBatcher | None:
+    """
+    Создаёт батчер по переменным окружения PREDICT_BATCH_*.
+    Батчинг выключен, если PREDICT_BATCH_WAIT_MS не задан или равен 0.
+    :param model_manager: Менеджер моделей.
+    :return: Батчер или None.
+    """
+    max_wait_ms = float(os.getenv("PREDICT_BATCH_WAIT_MS", "0"))
+    if max_wait_ms <= 0:
+        return None
+    LOGGER.info(f"Prediction micro-batching enabled with {max_wait_ms} ms window")
+    return PredictionBatcher(
+        model_manager,
+        max_batch_rows=int(os.getenv("PREDICT_BATCH_MAX_ROWS", "1024")),
+        max_wait_ms=max_wait_ms,
+        workers=int(os.getenv("PREDICT_BATCH_WORKERS", "4")),
+    )
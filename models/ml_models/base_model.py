@@ -3,6 +3,9 @@ Abstract model class
 """
 
 import abc
+import json
+import threading
+from pathlib import Path
 from typing import NewType
 
 import numpy as np
@@ -10,6 +13,8 @@ import pandas as pd
 
 DataType = NewType("DataType", pd.DataFrame | np.ndarray)
 TargetType = NewType("TargetType", pd.Series | np.ndarray)
+# Построение inference-объекта может быть дорогим, поэтому делается один раз на модель
+_INFERENCE_LOCK = threading.Lock()
 
 
 class MLModel(abc.ABC):
@@ -19,6 +24,10 @@ class MLModel(abc.ABC):
 
     model_class = None
     hyperparams: dict = {}
+    native_format_version = 1
+    # Модель, дообучением которой получена эта, и номер версии в цепочке дообучений
+    parent_id: str | None = None
+    version: int = 1
 
     def __init__(self, hyperparams: dict = None):
         hyperparams = hyperparams or {}
@@ -48,6 +57,132 @@ class MLModel(abc.ABC):
         :return: predictions
         """
 
+    def set_thread_limit(self, threads: int):
+        """
+        Limit number of CPU threads the estimator uses in fit and predict
+        :param threads: number of threads
+        :return: None
+        """
+
+    @classmethod
+    def prepare_train_data(
+        cls,
+        X: DataType,
+        y: TargetType,
+        hyperparams: dict = None,
+        cache=None,
+        data_key: str | None = None,
+    ) -> tuple:
+        """
+        Convert training data into form that several fit calls can reuse
+        :param X: train objects
+        :param y: targets
+        :param hyperparams: hyperparameters of model that will be fitted
+        :param cache: model-specific cache of prepared data
+        :param data_key: key of X and y in cache instead of dataset fingerprint
+        :return: arguments for fit
+        """
+        del hyperparams, cache, data_key
+        return X, y
+
+    def fit_file(self, data):
+        """
+        Fit the model on dataset stored in file without loading it in memory
+        :param data: models.out_of_core.TrainingFile
+        :return: None
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} can not be trained from file"
+        )
+
+    def update(self, X: DataType, y: TargetType, hyperparams: dict = None) -> "MLModel":
+        """
+        Get new model fitted on top of this one with new data only.
+        This model is not modified: it may be shared through model cache
+        :param X: new train objects
+        :param y: new targets
+        :param hyperparams: hyperparameters overriding ones of this model for update
+        :return: updated model
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support updates")
+
+    def save_native(self, path: Path):
+        """
+        Save model to directory in library-native format with JSON metadata.
+        meta.json is written last and marks the directory as complete
+        :param path: target directory
+        :return: None
+        """
+        path.mkdir(parents=True, exist_ok=True)
+        extra = self._save_native_state(path)
+        meta = {
+            "format_version": self.native_format_version,
+            "model_type": self.__class__.__name__,
+            "hyperparams": self.hyperparams,
+            "parent_id": self.parent_id,
+            "version": self.version,
+            **extra,
+        }
+        (path / "meta.json").write_text(json.dumps(meta, default=str))
+
+    @classmethod
+    def load_native(cls, path: Path, mmap: bool = True) -> "MLModel":
+        """
+        Load model saved with save_native
+        :param path: model directory
+        :param mmap: memory-map array files instead of reading them
+        :return: model
+        """
+        meta = read_native_meta(path)
+        model = cls(hyperparams=meta["hyperparams"])
+        model.parent_id = meta.get("parent_id")
+        model.version = meta.get("version", 1)
+        model._load_native_state(path, meta, mmap)  # pylint: disable=protected-access
+        return model
+
+    def _save_native_state(self, path: Path) -> dict:
+        """
+        Write fitted estimator state files into path
+        :param path: model directory
+        :return: extra fields for meta.json
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} has no native format")
+
+    def _load_native_state(self, path: Path, meta: dict, mmap: bool):
+        """
+        Restore fitted estimator state from path
+        :param path: model directory
+        :param meta: content of meta.json
+        :param mmap: memory-map array files
+        :return: None
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} has no native format")
+
+    def export_inference(self):
+        """
+        Export lean inference object for fitted model
+        :return: InferenceModel or None if model has no fast path
+        """
+        return None
+
+    def get_inference(self):
+        """
+        Get memoized inference object, see export_inference
+        :return: InferenceModel or None
+        """
+        if "_inference" not in self.__dict__:
+            with _INFERENCE_LOCK:
+                if "_inference" not in self.__dict__:
+                    # export_inference возвращает None только у моделей без быстрого пути
+                    # pylint: disable-next=assignment-from-none,attribute-defined-outside-init
+                    self._inference = self.export_inference()
+        return self._inference
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_inference", None)
+        return state
+
     @classmethod
     @abc.abstractmethod
     def get_param_names(cls) -> list[str]:
@@ -55,3 +190,12 @@ class MLModel(abc.ABC):
         Get whole list of hyperparameters
         :return: parameters list
         """
+
+
+def read_native_meta(path: Path) -> dict:
+    """
+    Read meta.json of natively saved model
+    :param path: model directory
+    :return: metadata
+    """
+    return json.loads((path / "meta.json").read_text())
@@ -0,0 +1,188 @@
+"""
+Lean inference objects exported from trained models
+"""
+
+import abc
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from models.ml_models.base_model import DataType, TargetType
+
+
+class InferenceModel(abc.ABC):
+    """
+    Minimal predictor without estimator-side input validation
+    """
+
+    def __init__(self, feature_names: list[str] | None, n_features: int):
+        self.feature_names = feature_names
+        self.n_features = n_features
+
+    def accepts(self, X: DataType) -> bool:
+        """
+        Check that X has exactly the training column order
+        :param X: test objects
+        :return: True if fast path can be used
+        """
+        if isinstance(X, pd.DataFrame):
+            return (
+                self.feature_names is not None and list(X.columns) == self.feature_names
+            )
+        return (
+            self.feature_names is None
+            and isinstance(X, np.ndarray)
+            and X.ndim == 2
+            and X.shape[1] == self.n_features
+        )
+
+    @abc.abstractmethod
+    def predict(self, X: DataType) -> TargetType:
+        """
+        Get predictions for X, columns must be in training order
+        :param X: test objects
+        :return: predictions
+        """
+
+
+class LinearInference(InferenceModel):
+    """
+    Linear model as coefficient vector and intercept
+    """
+
+    def __init__(
+        self,
+        coef: np.ndarray,
+        intercept: float | np.ndarray,
+        feature_names: list[str] | None,
+    ):
+        super().__init__(feature_names, coef.shape[-1])
+        self.coef = np.ascontiguousarray(coef.T, dtype=np.float64)
+        self.intercept = intercept
+
+    def predict(self, X: DataType) -> TargetType:
+        values = X.to_numpy(dtype=np.float64) if isinstance(X, pd.DataFrame) else X
+        return values @ self.coef + self.intercept
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ObliviousTreesInference(InferenceModel):
+    """
+    CatBoost symmetric trees evaluated with vectorized NumPy for small batches;
+    large batches go through estimator.predict.
+
+    The pip catboost package has no standalone model calcer: every predict,
+    including the private _base_predict, builds a Pool first, and for small
+    batches that costs as much as the whole call. Trees are therefore read from
+    the model's JSON dump and evaluated here. On construction the result is
+    compared with estimator.predict on rows built around every split border;
+    on mismatch ValueError is raised and the model keeps the estimator path
+    """
+
+    # pylint: disable-next=too-many-locals
+    def __init__(self, estimator, small_batch_rows: int = 64):
+        """
+        :param estimator: fitted CatBoost model with numeric features only
+        :param small_batch_rows: max batch size evaluated with NumPy
+        """
+        feature_names = list(estimator.feature_names_)
+        super().__init__(feature_names, len(feature_names))
+        self._estimator = estimator
+        self._small_batch_rows = small_batch_rows
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "model.json")
+            estimator.save_model(path, format="json")
+            with open(path, encoding="utf-8") as f:
+                dump = json.load(f)
+
+        trees = dump["oblivious_trees"]
+        depth = max(len(tree["splits"]) for tree in trees)
+        # Недостающие уровни мелких деревьев дополняются всегда ложным сплитом
+        self._split_features = np.zeros((len(trees), depth), dtype=np.int64)
+        self._borders = np.full((len(trees), depth), np.inf, dtype=np.float32)
+        self._leaf_values = np.zeros((len(trees), 2**depth), dtype=np.float64)
+        for i, tree in enumerate(trees):
+            if len(tree["leaf_values"]) != 2 ** len(tree["splits"]):
+                raise ValueError("Only one-dimensional tree leaves are supported")
+            for j, split in enumerate(tree["splits"]):
+                self._split_features[i, j] = split["float_feature_index"]
+                self._borders[i, j] = split["border"]
+            self._leaf_values[i, : len(tree["leaf_values"])] = tree["leaf_values"]
+        self._bit_weights = 1 << np.arange(depth, dtype=np.int64)
+        self._tree_index = np.arange(len(trees))
+
+        scale, bias = dump.get("scale_and_bias", [1.0, [0.0]])
+        self._scale = scale
+        self._bias = bias[0] if isinstance(bias, list) else bias
+        self._nan_as_true = np.array(
+            [
+                feature.get("nan_value_treatment") == "AsTrue"
+                for feature in dump["features_info"].get("float_features", [])
+            ],
+            dtype=bool,
+        )
+        self._check_parity(dump["features_info"].get("float_features", []))
+
+    def _check_parity(self, float_features: list[dict], n_rows: int = 256):
+        """
+        Compare NumPy evaluation with estimator.predict, raise ValueError on mismatch
+        :param float_features: features_info of JSON dump with split borders
+        :param n_rows: number of probe rows
+        """
+        rng = np.random.default_rng(0)
+        probe = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        for feature in float_features:
+            borders = np.asarray(feature.get("borders", []), dtype=np.float32)
+            # Значения на самих границах и по обе стороны от них, а также NaN
+            with np.errstate(over="ignore"):
+                candidates = np.concatenate(
+                    [
+                        borders,
+                        np.nextafter(borders, np.float32(-np.inf)),
+                        np.nextafter(borders, np.float32(np.inf)),
+                        np.array([-np.inf, np.inf, np.nan], dtype=np.float32),
+                    ]
+                )
+            probe[:, feature["flat_feature_index"]] = rng.choice(candidates, n_rows)
+        expected = self._estimator.predict(probe)
+        for start in range(0, n_rows, self._small_batch_rows):
+            batch = probe[start : start + self._small_batch_rows]
+            if not np.allclose(
+                self.predict(batch),
+                expected[start : start + len(batch)],
+                rtol=1e-6,
+                atol=1e-9,
+            ):
+                raise ValueError(
+                    "NumPy evaluation of trees does not match CatBoost predict"
+                )
+
+    @classmethod
+    def supports(cls, estimator) -> bool:
+        """
+        Check that model consists of symmetric trees over numeric features
+        """
+        return (
+            estimator.is_fitted()
+            and estimator.get_param("grow_policy") in (None, "SymmetricTree")
+            and not estimator.get_cat_feature_indices()
+            and not estimator.get_text_feature_indices()
+            and not estimator.get_embedding_feature_indices()
+        )
+
+    def predict(self, X: DataType) -> TargetType:
+        values = X.to_numpy(dtype=np.float32) if isinstance(X, pd.DataFrame) else X
+        if len(values) > self._small_batch_rows:
+            return self._estimator.predict(np.asarray(values))
+
+        values = np.asarray(values, dtype=np.float32)
+        if self._nan_as_true.any():
+            values = np.where(np.isnan(values) & self._nan_as_true, np.inf, values)
+        bits = values[:, self._split_features] > self._borders
+        leaf_index = bits.astype(np.int64) @ self._bit_weights
+        raw = self._leaf_values[self._tree_index, leaf_index].sum(axis=1)
+        return self._scale * raw + self._bias
@@ -2,10 +2,22 @@
 Linear regression model
 """
 
-from catboost import CatBoostRegressor
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostRegressor, Pool
+from catboost.utils import quantize
+from scipy.optimize import nnls
 from sklearn.linear_model import LinearRegression
 
-from models.ml_models.base_model import MLModel, DataType, TargetType
+from models.ml_models.base_model import DataType, MLModel, TargetType
+from models.ml_models.inference import (
+    InferenceModel,
+    LinearInference,
+    ObliviousTreesInference,
+)
 
 
 class LinRegModel(MLModel):
@@ -14,18 +26,134 @@ class LinRegModel(MLModel):
     """
 
     model_class = LinearRegression
+    # Число строк, средние и центрированные суммы произведений колонок [X, y]
+    # обучающих данных: по ним модель дообучается без исторических данных
+    moments: tuple[int, np.ndarray, np.ndarray] | None = None
 
     def fit(self, X: DataType, y: TargetType):
         self.model.fit(X, y)
+        self.moments = _merge_moments(0, None, None, _stack_xy(X, y))
 
     def predict(self, X: DataType) -> TargetType:
         return self.model.predict(X)
 
+    def fit_file(self, data):
+        # Один проход по файлу: моменты объединяются по чанкам,
+        # память не зависит от числа строк
+        feature_names = data.feature_columns()
+        n_rows, mean, comoment = 0, None, None
+        for X, y in data.iter_batches():
+            n_rows, mean, comoment = _merge_moments(
+                n_rows, mean, comoment, _stack_xy(X[feature_names], y)
+            )
+        if n_rows == 0:
+            raise ValueError("Dataset is empty")
+        self._solve(n_rows, mean, comoment, feature_names)
+
+    def update(
+        self, X: DataType, y: TargetType, hyperparams: dict = None
+    ) -> "LinRegModel":
+        if self.moments is None:
+            raise ValueError("Model has no stored statistics for update, retrain it")
+        feature_names = getattr(self.model, "feature_names_in_", None)
+        feature_names = list(feature_names) if feature_names is not None else None
+        X = _align_features(X, feature_names, self.model.n_features_in_)
+        model = LinRegModel({**self.hyperparams, **(hyperparams or {})})
+        # Стоимость пропорциональна числу новых строк: старые данные представлены моментами
+        model._solve(  # pylint: disable=protected-access
+            *_merge_moments(*self.moments, _stack_xy(X, y)), feature_names
+        )
+        return model
+
+    def _solve(
+        self,
+        n_rows: int,
+        mean: np.ndarray,
+        comoment: np.ndarray,
+        feature_names: list[str] | None,
+    ):
+        self.moments = (n_rows, mean, comoment)
+        n_features = len(mean) - 1
+        if not self.model.fit_intercept:
+            comoment = comoment + n_rows * np.outer(mean, mean)
+        gram, xty = (
+            comoment[:n_features, :n_features],
+            comoment[:n_features, n_features],
+        )
+        if self.model.positive:
+            coef = _nnls_normal(gram, xty)
+        else:
+            # Решение с минимальной нормой совпадает с lstsq по исходной матрице признаков
+            coef = np.linalg.lstsq(gram, xty, rcond=None)[0]
+        self.model.coef_ = coef
+        self.model.intercept_ = (
+            float(mean[n_features] - mean[:n_features] @ coef)
+            if self.model.fit_intercept
+            else 0.0
+        )
+        self.model.n_features_in_ = n_features
+        if feature_names is not None:
+            self.model.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    def _save_native_state(self, path: Path) -> dict:
+        np.save(path / "coef.npy", np.asarray(self.model.coef_, dtype=np.float64))
+        np.save(
+            path / "intercept.npy", np.asarray(self.model.intercept_, dtype=np.float64)
+        )
+        feature_names = getattr(self.model, "feature_names_in_", None)
+        if self.moments is not None:
+            np.save(path / "moments_mean.npy", self.moments[1])
+            np.save(path / "moments_comoment.npy", self.moments[2])
+        return {
+            "feature_names": list(feature_names) if feature_names is not None else None,
+            "moments_rows": self.moments[0] if self.moments is not None else None,
+        }
+
+    def _load_native_state(self, path: Path, meta: dict, mmap: bool):
+        mmap_mode = "r" if mmap else None
+        self.model.coef_ = np.load(path / "coef.npy", mmap_mode=mmap_mode)
+        intercept = np.load(path / "intercept.npy")
+        self.model.intercept_ = intercept.item() if intercept.ndim == 0 else intercept
+        self.model.n_features_in_ = self.model.coef_.shape[-1]
+        if meta.get("feature_names") is not None:
+            self.model.feature_names_in_ = np.asarray(
+                meta["feature_names"], dtype=object
+            )
+        if meta.get("moments_rows") is not None:
+            self.moments = (
+                meta["moments_rows"],
+                np.load(path / "moments_mean.npy"),
+                np.load(path / "moments_comoment.npy", mmap_mode=mmap_mode),
+            )
+
+    def export_inference(self) -> InferenceModel | None:
+        if not hasattr(self.model, "coef_"):
+            return None
+        feature_names = getattr(self.model, "feature_names_in_", None)
+        return LinearInference(
+            coef=self.model.coef_,
+            intercept=self.model.intercept_,
+            feature_names=list(feature_names) if feature_names is not None else None,
+        )
+
     @classmethod
     def get_param_names(cls) -> list[str]:
         return cls.model_class._get_param_names()  # pylint: disable=protected-access
 
 
+# Эффективные параметры родителя, которые сохраняются при дообучении CatBoost
+_CATBOOST_UPDATE_PINNED_PARAMS = (
+    "learning_rate",
+    "depth",
+    "l2_leaf_reg",
+    "border_count",
+    "feature_border_type",
+    "random_strength",
+    "boosting_type",
+    "leaf_estimation_iterations",
+)
+
+
 class CatBoostRegModel(MLModel):
     """
     Work with CatBoostRegressor estimator
@@ -39,6 +167,93 @@ class CatBoostRegModel(MLModel):
     def predict(self, X: DataType) -> TargetType:
         return self.model.predict(X)
 
+    def set_thread_limit(self, threads: int):
+        self.model.set_params(thread_count=threads)
+
+    def fit_file(self, data):
+        columns = data.columns()
+        if data.target_column not in columns:
+            raise ValueError(f"Target column '{data.target_column}' not found")
+        # quantize читает файл построчно и держит в памяти только квантизованные признаки
+        # (байт на значение вместо 8 байт float64)
+        with data.as_csv() as csv_path, tempfile.TemporaryDirectory() as tmp_dir:
+            column_description = Path(tmp_dir) / "columns.cd"
+            column_description.write_text(
+                f"{columns.index(data.target_column)}\tLabel\n"
+            )
+            pool = quantize(
+                str(csv_path),
+                column_description=str(column_description),
+                delimiter=",",
+                has_header=True,
+                border_count=self.hyperparams.get("border_count"),
+                feature_border_type=self.hyperparams.get("feature_border_type"),
+                thread_count=self.model.get_params().get("thread_count", -1),
+            )
+        self.model.fit(pool)
+
+    def update(
+        self, X: DataType, y: TargetType, hyperparams: dict = None
+    ) -> "CatBoostRegModel":
+        hyperparams = hyperparams or {}
+        model = CatBoostRegModel({**self.hyperparams, **hyperparams})
+        # Параметры, которые CatBoost выбрал сам по размеру данных родителя (прежде всего
+        # learning_rate), закрепляются, иначе они пересчитались бы по новым строкам
+        effective = self.model.get_all_params()
+        model.model.set_params(
+            **{
+                name: effective[name]
+                for name in _CATBOOST_UPDATE_PINNED_PARAMS
+                if name in effective and name not in hyperparams
+            }
+        )
+        X = _align_features(
+            X, self.model.feature_names_, len(self.model.feature_names_)
+        )
+        # Бустинг продолжается с деревьев этой модели, новые iterations деревьев
+        # обучаются только на новых строках
+        model.model.fit(X, y, init_model=self.model)
+        return model
+
+    @classmethod
+    def prepare_train_data(
+        cls,
+        X: DataType,
+        y: TargetType,
+        hyperparams: dict = None,
+        cache=None,
+        data_key: str | None = None,
+    ) -> tuple:
+        # Pool строится один раз и переиспользуется при обучении нескольких моделей;
+        # с кэшем он еще и квантизуется один раз на набор параметров квантизации
+        if cache is None:
+            return Pool(X, y), None
+        hyperparams = hyperparams or {}
+        pool = cache.get_pool(
+            X,
+            y,
+            border_count=hyperparams.get("border_count"),
+            feature_border_type=hyperparams.get("feature_border_type"),
+            data_key=data_key,
+        )
+        return pool, None
+
+    def _save_native_state(self, path: Path) -> dict:
+        self.model.save_model(str(path / "model.cbm"), format="cbm")
+        return {}
+
+    def _load_native_state(self, path: Path, meta: dict, mmap: bool):
+        # CatBoost читает .cbm целиком, memory mapping для него недоступен
+        self.model.load_model(str(path / "model.cbm"), format="cbm")
+
+    def export_inference(self) -> InferenceModel | None:
+        if not ObliviousTreesInference.supports(self.model):
+            return None
+        try:
+            return ObliviousTreesInference(self.model)
+        except ValueError:
+            return None
+
     @classmethod
     def get_param_names(cls) -> list[str]:
         return [
@@ -53,3 +268,68 @@ class CatBoostRegModel(MLModel):
             "feature_border_type",
             "task_type",
         ]
+
+
+def _merge_moments(
+    n_rows: int, mean: np.ndarray | None, comoment: np.ndarray | None, chunk: np.ndarray
+) -> tuple:
+    """
+    Добавляет чанк к средним и центрированным суммам произведений колонок
+    (попарное объединение Чана, устойчивое к большим средним).
+    :return: Число строк, средние и суммы произведений с учетом чанка.
+    """
+    if len(chunk) == 0:
+        return n_rows, mean, comoment
+    chunk_mean = chunk.mean(axis=0)
+    centered = chunk - chunk_mean
+    chunk_comoment = centered.T @ centered
+    if n_rows == 0:
+        return len(chunk), chunk_mean, chunk_comoment
+    total = n_rows + len(chunk)
+    delta = chunk_mean - mean
+    return (
+        total,
+        mean + delta * (len(chunk) / total),
+        comoment
+        + chunk_comoment
+        + np.outer(delta, delta) * (n_rows * len(chunk) / total),
+    )
+
+
+def _nnls_normal(gram: np.ndarray, xty: np.ndarray) -> np.ndarray:
+    """
+    Неотрицательные коэффициенты по матрице Грама: min ||Ab - c|| при AᵀA = gram, Aᵀc = xty.
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(gram)
+    eps = np.finfo(np.float64).eps  # pylint: disable=no-member
+    keep = eigenvalues > eigenvalues.max() * len(eigenvalues) * eps
+    scale = np.sqrt(eigenvalues[keep])
+    design = scale[:, None] * eigenvectors[:, keep].T
+    c = (eigenvectors[:, keep].T @ xty) / scale
+    return nnls(design, c)[0]
+
+
+def _stack_xy(X: DataType, y: TargetType) -> np.ndarray:
+    return np.column_stack(
+        [np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)]
+    )
+
+
+def _align_features(
+    X: DataType, feature_names: list[str] | None, n_features: int
+) -> DataType:
+    """
+    Приводит новые данные к колонкам обученной модели.
+    :return: Признаки в порядке колонок модели.
+    """
+    if feature_names is not None and isinstance(X, pd.DataFrame):
+        missing = set(feature_names) - {str(column) for column in X.columns}
+        if missing:
+            raise ValueError(f"Features {sorted(missing)} are missing in update data")
+        X = X.rename(columns=str)
+        return X[feature_names]
+    if np.shape(X)[1] != n_features:
+        raise ValueError(
+            f"Update data has {np.shape(X)[1]} features, model expects {n_features}"
+        )
+    return X
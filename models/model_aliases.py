@@ -0,0 +1,384 @@
+"""
+Named aliases of stored models with hot-swap in serving processes
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from models.model_manager import MODEL_MANAGER, ModelManager
+
+LOGGER = logging.getLogger(__name__)
+
+# ID моделей всегда содержат "_", поэтому алиас не совпадает ни с одним ID
+ALIAS_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9.-]{0,63}")
+
+
+class ModelInUseError(RuntimeError):
+    """
+    Raised when deleting model that aliases point to
+    """
+
+    def __init__(self, model_id: str, aliases: list[str]):
+        super().__init__(f"Model {model_id} is used by aliases {aliases}")
+        self.aliases = aliases
+
+
+@dataclass
+class ModelAlias:
+    """
+    Alias pointing to stored model
+    """
+
+    alias: str
+    model_id: str
+    previous_model_id: str | None
+    updated_at: float
+
+
+class AliasStore:
+    """
+    SQLite-backed aliases shared by server worker processes
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Инициализация хранилища алиасов.
+        :param db_path: Путь к файлу базы SQLite.
+        """
+        self._db_path = Path(db_path)
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS aliases (
+                        alias TEXT PRIMARY KEY,
+                        model_id TEXT NOT NULL,
+                        previous_model_id TEXT,
+                        updated_at REAL NOT NULL
+                    )
+                    """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def set(
+        self, alias: str, model_id: str, check: Callable[[], None] | None = None
+    ) -> ModelAlias:
+        """
+        Направляет алиас на модель, запоминая предыдущую.
+        :param alias: Алиас.
+        :param model_id: ID модели.
+        :param check: Проверка, выполняемая под блокировкой записи (например, что модель
+            существует); исключение из неё отменяет изменение.
+        :return: Запись алиаса.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                # Блокировка записи берется сразу, чтобы проверка и запись не разделялись
+                # удалением модели в другом процессе
+                conn.execute("BEGIN IMMEDIATE")
+                if check is not None:
+                    check()
+                row = conn.execute(
+                    "SELECT model_id FROM aliases WHERE alias = ?", (alias,)
+                ).fetchone()
+                previous = row["model_id"] if row is not None else None
+                record = ModelAlias(
+                    alias=alias,
+                    model_id=model_id,
+                    previous_model_id=previous if previous != model_id else None,
+                    updated_at=time.time(),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO aliases VALUES (?, ?, ?, ?)",
+                    (
+                        record.alias,
+                        record.model_id,
+                        record.previous_model_id,
+                        record.updated_at,
+                    ),
+                )
+        return record
+
+    def get(self, alias: str) -> ModelAlias | None:
+        """
+        Возвращает алиас.
+        :param alias: Алиас.
+        :return: Запись алиаса или None, если его нет.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM aliases WHERE alias = ?", (alias,)
+            ).fetchone()
+        return ModelAlias(**dict(row)) if row is not None else None
+
+    def list_aliases(self) -> list[ModelAlias]:
+        """
+        Возвращает все алиасы.
+        :return: Список записей, упорядоченных по имени.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM aliases ORDER BY alias").fetchall()
+        return [ModelAlias(**dict(row)) for row in rows]
+
+    def delete(self, alias: str) -> bool:
+        """
+        Удаляет алиас.
+        :param alias: Алиас.
+        :return: True, если алиас существовал.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                cursor = conn.execute("DELETE FROM aliases WHERE alias = ?", (alias,))
+        return cursor.rowcount > 0
+
+    def aliases_of(self, model_id: str) -> list[str]:
+        """
+        Возвращает алиасы, указывающие на модель.
+        :param model_id: ID модели.
+        :return: Список алиасов.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT alias FROM aliases WHERE model_id = ? ORDER BY alias",
+                (model_id,),
+            ).fetchall()
+        return [row["alias"] for row in rows]
+
+    def delete_unused(self, model_id: str, delete: Callable[[], None]):
+        """
+        Выполняет удаление модели, если на неё не указывает ни один алиас.
+        Проверка и удаление выполняются под блокировкой записи базы, поэтому
+        алиас не может быть направлен на модель между ними.
+        :param model_id: ID модели.
+        :param delete: Удаление модели.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                rows = conn.execute(
+                    "SELECT alias FROM aliases WHERE model_id = ? ORDER BY alias",
+                    (model_id,),
+                ).fetchall()
+                if rows:
+                    raise ModelInUseError(model_id, [row["alias"] for row in rows])
+                delete()
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ModelAliases:
+    """
+    Resolves aliases to model ids in serving process. Process switches alias
+    to new model only after loading it into model cache, so swap causes
+    neither cold loads nor failed requests
+    """
+
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        store: AliasStore,
+        refresh_s: float = 1.0,
+    ):
+        """
+        Инициализация алиасов процесса.
+        :param model_manager: Менеджер моделей, в кэш которого загружаются модели.
+        :param store: Общее хранилище алиасов.
+        :param refresh_s: Период проверки изменений алиасов, сделанных другими процессами.
+        """
+        self._model_manager = model_manager
+        self.store = store
+        self._refresh_s = refresh_s
+        # Модель, которую процесс отдает по алиасу, и модель, на которую алиас указывает
+        self._serving: dict[str, str] = {}
+        self._targets: dict[str, str] = {}
+        self._preloading: set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """
+        Загружает модели всех алиасов и запускает фоновую проверку изменений
+        """
+        targets = {
+            record.alias: record.model_id for record in self.store.list_aliases()
+        }
+        loaded = set()
+        for model_id in set(targets.values()):
+            try:
+                self._warm_up(model_id)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                LOGGER.warning(f"Skipping preload of {model_id}: {exc}")
+                continue
+            loaded.add(model_id)
+        with self._lock:
+            self._targets = targets
+            self._serving = {
+                alias: model_id
+                for alias, model_id in targets.items()
+                if model_id in loaded
+            }
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._refresh_loop, name="model-aliases", daemon=True
+            )
+            self._thread.start()
+
+    def close(self):
+        """
+        Останавливает фоновую проверку изменений
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def resolve(self, name: str) -> str:
+        """
+        Возвращает ID модели для алиаса или имя без изменений, если это не алиас.
+        Не обращается к диску и может вызываться из цикла событий.
+        :param name: Алиас или ID модели.
+        :return: ID модели.
+        """
+        with self._lock:
+            return self._serving.get(name, name)
+
+    def set(self, alias: str, model_id: str) -> ModelAlias:
+        """
+        Направляет алиас на модель. Модель загружается в этом процессе до переключения,
+        остальные процессы переключаются после загрузки в течение refresh_s.
+        :param alias: Алиас.
+        :param model_id: ID модели или другой алиас.
+        :return: Запись алиаса.
+        """
+        if not ALIAS_PATTERN.fullmatch(alias):
+            raise ValueError(
+                f"Alias '{alias}' must consist of letters, digits, '.' and '-' (up to 64)"
+            )
+        model_id = self.resolve(model_id)
+        self._warm_up(model_id)
+
+        def check():
+            if not self._model_manager.model_exists(model_id):
+                raise FileNotFoundError(f"Model {model_id} not found.")
+
+        record = self.store.set(alias, model_id, check=check)
+        with self._lock:
+            self._targets[alias] = model_id
+            self._serving[alias] = model_id
+        LOGGER.info(f"Alias {alias} switched to {model_id}")
+        return record
+
+    def get(self, alias: str) -> ModelAlias:
+        """
+        Возвращает алиас.
+        :param alias: Алиас.
+        :return: Запись алиаса.
+        """
+        record = self.store.get(alias)
+        if record is None:
+            raise KeyError(f"Alias {alias} not found")
+        return record
+
+    def delete(self, alias: str):
+        """
+        Удаляет алиас.
+        :param alias: Алиас.
+        """
+        if not self.store.delete(alias):
+            raise KeyError(f"Alias {alias} not found")
+        with self._lock:
+            self._targets.pop(alias, None)
+            self._serving.pop(alias, None)
+
+    def delete_model(self, model_id: str):
+        """
+        Удаляет модель, если на неё не указывает ни один алиас.
+        :param model_id: ID модели.
+        """
+        self.store.delete_unused(
+            model_id, lambda: self._model_manager.delete_model(model_id)
+        )
+
+    def serving(self) -> dict[str, str]:
+        """
+        Модели, которые этот процесс отдает по алиасам
+        """
+        with self._lock:
+            return dict(self._serving)
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self._refresh_s):
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-exception-caught
+                LOGGER.exception("Refreshing model aliases failed")
+
+    def refresh(self):
+        """
+        Применяет изменения алиасов из общего хранилища. Новые модели
+        загружаются в фоне, до окончания загрузки отдается прежняя модель,
+        а новый для процесса алиас до загрузки не разрешается.
+        """
+        targets = {
+            record.alias: record.model_id for record in self.store.list_aliases()
+        }
+        to_preload = []
+        with self._lock:
+            self._targets = targets
+            for alias in set(self._serving) - set(targets):
+                del self._serving[alias]
+            for alias, model_id in targets.items():
+                if self._serving.get(alias) == model_id:
+                    continue
+                if model_id not in self._preloading:
+                    self._preloading.add(model_id)
+                    to_preload.append(model_id)
+        for model_id in to_preload:
+            threading.Thread(
+                target=self._preload,
+                args=(model_id,),
+                name="alias-preload",
+                daemon=True,
+            ).start()
+
+    def _warm_up(self, model_id: str):
+        """
+        Загружает модель в кэш и строит её inference-объект, чтобы первый запрос
+        после переключения алиаса не платил за них
+        """
+        self._model_manager.load_model(model_id).get_inference()
+
+    def _preload(self, model_id: str):
+        try:
+            self._warm_up(model_id)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # Алиас отдает прежнюю модель (новый – не разрешается), загрузка повторится
+            # при следующей проверке
+            LOGGER.warning(f"Preloading {model_id} for alias switch failed: {exc}")
+            return
+        finally:
+            with self._lock:
+                self._preloading.discard(model_id)
+        with self._lock:
+            for alias, target in self._targets.items():
+                if target == model_id:
+                    self._serving[alias] = model_id
+        LOGGER.info(f"Aliases switched to preloaded model {model_id}")
+
+
+MODEL_ALIASES = ModelAliases(
+    MODEL_MANAGER,
+    AliasStore(MODEL_MANAGER.storage_dir / "aliases.sqlite3"),
+    refresh_s=float(os.getenv("ALIAS_REFRESH_S", "1")),
+)
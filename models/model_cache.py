@@ -0,0 +1,111 @@
+"""
+LRU cache for loaded models
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache of loaded models with memory budget
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024**2):
+        """
+        Инициализация кэша моделей.
+        :param max_bytes: Бюджет памяти кэша в байтах (0 отключает кэш).
+        """
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        """
+        Бюджет памяти кэша в байтах
+        """
+        return self._max_bytes
+
+    def get(self, name: str) -> Any | None:
+        """
+        Возвращает модель из кэша и отмечает её как недавно использованную.
+        :param name: Имя модели.
+        :return: Модель или None, если её нет в кэше.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, name: str, model: Any, size_bytes: int):
+        """
+        Кладёт модель в кэш, вытесняя давно не использованные модели.
+        Модели больше бюджета памяти не кэшируются.
+        :param name: Имя модели.
+        :param model: Загруженная модель.
+        :param size_bytes: Оценка занимаемой моделью памяти.
+        """
+        if size_bytes > self._max_bytes:
+            return
+        with self._lock:
+            self._pop(name)
+            while self._entries and self._size_bytes + size_bytes > self._max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self._evictions += 1
+            self._entries[name] = (model, size_bytes)
+            self._size_bytes += size_bytes
+
+    def invalidate(self, name: str):
+        """
+        Удаляет модель из кэша.
+        :param name: Имя модели.
+        """
+        with self._lock:
+            self._pop(name)
+
+    def keys(self) -> list[str]:
+        """
+        Возвращает имена моделей в кэше, начиная с недавно использованных.
+        :return: Список имен моделей.
+        """
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        """
+        Очищает кэш
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Возвращает счётчики кэша.
+        :return: Словарь со счётчиками попаданий, промахов и вытеснений.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "items": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    def _pop(self, name: str):
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            self._size_bytes -= entry[1]
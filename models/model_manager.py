@@ -3,18 +3,128 @@ Manager for models
 """
 
 import hashlib
+import json
 import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future
 from pathlib import Path
+from typing import Callable
 
 import joblib
+import numpy as np
 import pandas as pd
 
-from models.ml_models.base_model import MLModel, DataType, TargetType
-from models.ml_models.ml_models import LinRegModel, CatBoostRegModel
+from models.fingerprint import fingerprint_dataset, fingerprint_file
+from models.metrics import (
+    MODEL_CACHE_LOOKUPS,
+    PREDICTION_CACHE_ROWS,
+    ROWS_SCORED,
+    STAGE_SECONDS,
+    Sample,
+)
+from models.ml_models.base_model import (
+    DataType,
+    MLModel,
+    TargetType,
+    read_native_meta,
+)
+from models.ml_models.ml_models import CatBoostRegModel, LinRegModel
+from models.model_cache import ModelCache
+from models.model_registry import ModelRecord, ModelRegistry
+from models.out_of_core import TrainingFile
+from models.pool_cache import QuantizedPoolCache
+from models.prediction_cache import PredictionCache
 
 LOGGER = logging.getLogger(__name__)
 
+NATIVE_SUFFIX = ".model"
+JOBLIB_SUFFIX = ".joblib"
+STORAGE_FORMATS = {"native": NATIVE_SUFFIX, "joblib": JOBLIB_SUFFIX}
+# Сколько секунд завершенная, но не подключенная версия нативной модели не удаляется
+VERSION_GRACE_S = 60.0
 
+
+def _path_size(path: Path) -> int:
+    """
+    Размер файла или суммарный размер файлов директории
+    """
+    if path.is_dir():
+        return sum(file.stat().st_size for file in path.iterdir() if file.is_file())
+    return path.stat().st_size
+
+
+def _check_model_name(model_name: str):
+    """
+    Отклоняет имена моделей, из которых нельзя безопасно строить путь: joblib.load
+    исполняет pickle, поэтому путь не должен выходить за директорию хранения
+    """
+    if (
+        not model_name
+        or ".." in model_name
+        or any(sep in model_name for sep in "/\\\x00")
+    ):
+        raise FileNotFoundError(f"Model {model_name!r} not found.")
+
+
+def _switch_version(version_dir: Path, target: Path):
+    """
+    Атомарно направляет target на директорию версии модели.
+    target – относительная символическая ссылка: новая ссылка создается рядом и
+    переименовывается поверх прежней одним os.replace, поэтому путь модели
+    существует всегда. Прежняя версия остается для читателей, которые уже разрешили
+    ссылку. Более ранние завершенные версии удаляются, если они старше
+    VERSION_GRACE_S: более свежую версию мог только что записать другой процесс,
+    сохраняющий ту же модель, и она еще не подключена.
+    """
+    previous = target.resolve() if target.is_symlink() else None
+    if target.is_dir() and not target.is_symlink():
+        # Директорию, записанную до перехода на ссылки, нельзя атомарно заменить
+        # ссылкой: она переносится в сторону, и путь на мгновение отсутствует
+        previous = target.with_name(f"{target.name}.{uuid.uuid4().hex[:8]}")
+        target.rename(previous)
+    link = target.with_name(f"{version_dir.name}.link")
+    link.symlink_to(version_dir.name)
+    try:
+        os.replace(link, target)
+    finally:
+        link.unlink(missing_ok=True)
+    # Ссылку к этому моменту мог переключить и другой процесс
+    keep = {version_dir.resolve(), previous, target.resolve()}
+    expired = time.time() - VERSION_GRACE_S
+    for stale in target.parent.glob(f"{target.name}.*"):
+        if stale.is_symlink() or stale.resolve() in keep:
+            continue
+        try:
+            # Версии без meta.json еще дописываются другими процессами
+            completed_at = (stale / "meta.json").stat().st_mtime
+        except OSError:
+            continue
+        if completed_at < expired:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def _remove_path(path: Path):
+    """
+    Удаляет файл, директорию или ссылку на директорию версии вместе со всеми версиями
+    """
+    if path.is_symlink():
+        path.unlink()
+        for version in path.parent.glob(f"{path.name}.*"):
+            if version.is_dir() and not version.is_symlink():
+                shutil.rmtree(version, ignore_errors=True)
+            else:
+                version.unlink(missing_ok=True)
+    elif path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink()
+
+
+# pylint: disable-next=too-many-instance-attributes,too-many-public-methods
 class ModelManager:
     """
     Managing models: training, saving and listing
@@ -22,16 +132,75 @@ class ModelManager:
 
     model_classes = [LinRegModel, CatBoostRegModel]
 
-    def __init__(self, storage_dir: str, hash_len: int = 16):
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        storage_dir: str,
+        hash_len: int = 16,
+        cache_max_bytes: int = 512 * 1024**2,
+        legacy_data_hash: bool = False,
+        data_hash_algorithm: str = "blake2b",
+        storage_format: str = "native",
+        prediction_cache: PredictionCache | None = None,
+        pool_cache: QuantizedPoolCache | None = None,
+    ):
         """
         Инициализация ModelManager с директорией для хранения моделей.
         :param storage_dir: Путь к директории, где будут храниться модели.
         :param hash_len: Длина хэша для формирования имени модели
+        :param cache_max_bytes: Бюджет памяти кэша загруженных моделей в байтах.
+        :param legacy_data_hash: Хэшировать данные через CSV, как в старых ID моделей.
+        :param data_hash_algorithm: Алгоритм хэширования данных для fingerprint_dataset.
+        :param storage_format: Формат сохранения моделей: native (.cbm/.npy + meta.json,
+            массивы загружаются через mmap) или joblib. Читаются оба формата.
+        :param prediction_cache: Кэш предсказаний по строкам (None – без кэша).
+        :param pool_cache: Кэш квантизованных пулов CatBoost (None – без кэша).
         """
         self._storage_dir = Path(storage_dir)
         self._storage_dir.mkdir(parents=True, exist_ok=True)
         self._hash_len = hash_len
+        self._legacy_data_hash = legacy_data_hash
+        self._data_hash_algorithm = data_hash_algorithm
+        if storage_format not in STORAGE_FORMATS:
+            raise ValueError(f"Unsupported storage format '{storage_format}'")
+        self._storage_format = storage_format
         self._available_models = {model.__name__: model for model in self.model_classes}
+        self.cache = ModelCache(max_bytes=cache_max_bytes)
+        self.prediction_cache = prediction_cache
+        self.pool_cache = pool_cache
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.registry = ModelRegistry(self._storage_dir / "registry.sqlite3")
+        if self.registry.count() == 0 and any(self._iter_model_paths()):
+            self.rebuild_registry()
+
+    @property
+    def storage_dir(self) -> Path:
+        """
+        Директория хранения моделей
+        """
+        return self._storage_dir
+
+    @property
+    def worker_options(self) -> dict:
+        """
+        Настройки формирования ID и хранения моделей для создания совместимых
+        ModelManager в других процессах
+        """
+        return {
+            "hash_len": self._hash_len,
+            "legacy_data_hash": self._legacy_data_hash,
+            "data_hash_algorithm": self._data_hash_algorithm,
+            "storage_format": self._storage_format,
+            "pool_cache": self.pool_cache,
+        }
+
+    @property
+    def available_models(self) -> dict[str, type[MLModel]]:
+        """
+        Доступные для обучения классы моделей
+        """
+        return self._available_models
 
     def create_trainer(
         self,
@@ -60,28 +229,82 @@ class ModelManager:
         self,
         model_type: str,
         model_params: dict,
-        train_data: pd.DataFrame,
+        X_train: DataType,
+        y_train: TargetType,
     ) -> str:
         """
-        Генерирует хэш фиксированной длины для строки
+        Генерирует уникальное имя модели по гиперпараметрам и данным
         :param model_type: Тип модели.
         :param model_params: Параметры для модели.
-        :param train_data: Данные для обучения.
-        :return: Хэш длины self.hash_len
+        :param X_train: Данные для обучения.
+        :param y_train: Целевые значения для обучения.
+        :return: Имя вида <type>_<params_hash>_<data_hash>
         """
-        # Генерация хэша для параметров
-        params_string = "".join([str(param) for param in sorted(model_params.items())])
-        params_hash = self._hash_string(params_string)
+        params_hash = self._params_hash(model_params)
 
-        # Генерация хэша для DataFrame
-        data_string = train_data.to_csv(index=False)
-        data_hash = self._hash_string(data_string)
+        # Генерация хэша для данных
+        if self._legacy_data_hash:
+            # Совместимость с ID моделей, обученных до перехода на fingerprint_dataset
+            merged_data = pd.DataFrame(X_train).copy()
+            merged_data["target"] = list(y_train)
+            data_hash = self._hash_string(merged_data.to_csv(index=False))
+        else:
+            data_hash = fingerprint_dataset(
+                X_train, y_train, algorithm=self._data_hash_algorithm
+            )[: self._hash_len]
 
         # Генерация уникального ID
         unique_id = f"{model_type}_{params_hash}_{data_hash}"
 
         return unique_id
 
+    def _params_hash(self, model_params: dict) -> str:
+        """
+        Генерирует хэш гиперпараметров для имени модели
+        :param model_params: Параметры для модели.
+        :return: Хэш длины self.hash_len
+        """
+        params_string = "".join([str(param) for param in sorted(model_params.items())])
+        return self._hash_string(params_string)
+
+    def get_model_id(
+        self,
+        model_type: str,
+        X_train: DataType,
+        y_train: TargetType,
+        model_params: dict = None,
+    ) -> str:
+        """
+        Вычисляет ID модели по гиперпараметрам и данным без обучения.
+        :param model_type: Тип модели.
+        :param X_train: Данные для обучения модели.
+        :param y_train: Целевые значения для обучения модели.
+        :param model_params: Параметры для модели.
+        :return: ID модели
+        """
+        return self._generate_model_name(
+            model_type, model_params or {}, X_train, y_train
+        )
+
+    def get_file_model_id(
+        self,
+        model_type: str,
+        data: TrainingFile,
+        model_params: dict = None,
+    ) -> str:
+        """
+        Вычисляет ID модели, обучаемой по файлу. Данные хэшируются по байтам файла
+        потоково, поэтому ID отличается от ID модели, обученной на тех же данных в памяти.
+        :param model_type: Тип модели.
+        :param data: Файл с обучающими данными.
+        :param model_params: Параметры для модели.
+        :return: ID модели
+        """
+        data_hash = fingerprint_file(
+            data.path, extra=data.target_column, algorithm=self._data_hash_algorithm
+        )[: self._hash_len]
+        return f"{model_type}_{self._params_hash(model_params or {})}_{data_hash}"
+
     def train_and_save_model(
         self,
         model_type: str,
@@ -91,6 +314,8 @@ class ModelManager:
     ) -> str:
         """
         Создаёт, обучает и сохраняет модель.
+        Если модель с такими же гиперпараметрами и данными уже сохранена,
+        обучение пропускается. Одновременные одинаковые запросы обучаются один раз.
         :param model_type: Тип модели.
         :param X_train: Данные для обучения модели.
         :param y_train: Целевые значения для обучения модели.
@@ -98,28 +323,184 @@ class ModelManager:
         :return: ID модели
         """
         trainer = self.create_trainer(model_type, model_params)
-        trainer.fit(X_train, y_train)
+        model_name = self.get_model_id(model_type, X_train, y_train, model_params)
 
-        LOGGER.info(f"Model {model_type} trained")
+        def fit() -> MLModel:
+            # Данные уже захэшированы для ID модели, кэш пулов использует этот хэш
+            trainer.fit(
+                *trainer.prepare_train_data(
+                    X_train,
+                    y_train,
+                    trainer.hyperparams,
+                    cache=self.pool_cache,
+                    data_key=model_name.rsplit("_", 1)[-1],
+                )
+            )
+            return trainer
 
-        merged_data = X_train.copy()
-        merged_data["target"] = list(y_train)
+        return self._train_once(model_type, model_name, fit)
 
-        model_name = self._generate_model_name(model_type, model_params, merged_data)
-        self.save_model(trainer, model_name)
+    def train_from_file(
+        self,
+        model_type: str,
+        data: TrainingFile,
+        model_params: dict = None,
+    ) -> str:
+        """
+        Обучает и сохраняет модель по CSV или Parquet файлу, не загружая его в память:
+        линейная регрессия считается по чанкам через суммы произведений признаков,
+        CatBoost обучается на пуле, квантизованном при чтении файла.
+        :param model_type: Тип модели.
+        :param data: Файл с обучающими данными.
+        :param model_params: Параметры для модели.
+        :return: ID модели
+        """
+        trainer = self.create_trainer(model_type, model_params)
+        model_name = self.get_file_model_id(model_type, data, model_params)
+
+        def fit() -> MLModel:
+            trainer.fit_file(data)
+            return trainer
 
-        LOGGER.info(f"Model {model_type} saved with name: {model_name}")
+        return self._train_once(model_type, model_name, fit)
+
+    def get_update_model_id(
+        self,
+        model_name: str,
+        X_new: DataType,
+        y_new: TargetType,
+        model_params: dict = None,
+    ) -> str:
+        """
+        Вычисляет ID модели, полученной дообучением существующей на новых данных.
+        Хэш параметров строится по итоговым параметрам (параметры родителя, обновленные
+        переданными), хэш данных – по ID родителя и отпечатку новых данных.
+        :param model_name: ID родительской модели.
+        :param X_new: Новые данные.
+        :param y_new: Новые целевые значения.
+        :param model_params: Параметры, переопределяющие параметры родителя при дообучении.
+        :return: ID модели
+        """
+        parent = self.get_model_info(model_name)
+        params = {**parent.hyperparams, **(model_params or {})}
+        data_fingerprint = fingerprint_dataset(
+            X_new, y_new, algorithm=self._data_hash_algorithm
+        )
+        data_hash = self._hash_string(f"{model_name}\x00{data_fingerprint}")
+        return f"{parent.model_type}_{self._params_hash(params)}_{data_hash}"
+
+    def update_model(
+        self,
+        model_name: str,
+        X_new: DataType,
+        y_new: TargetType,
+        model_params: dict = None,
+    ) -> str:
+        """
+        Дообучает сохраненную модель только на новых данных и сохраняет результат
+        новой версией с parent_id родителя. Родительская модель не изменяется.
+        :param model_name: ID родительской модели.
+        :param X_new: Новые данные.
+        :param y_new: Новые целевые значения.
+        :param model_params: Параметры, переопределяющие параметры родителя при дообучении.
+        :return: ID новой модели
+        """
+        updated_name = self.get_update_model_id(model_name, X_new, y_new, model_params)
+
+        def fit() -> MLModel:
+            parent = self.load_model(model_name)
+            model = parent.update(X_new, y_new, model_params)
+            model.parent_id = model_name
+            model.version = parent.version + 1
+            return model
+
+        return self._train_once(self.model_type_of(model_name), updated_name, fit)
+
+    def _train_once(
+        self, model_type: str, model_name: str, fit: Callable[[], MLModel]
+    ) -> str:
+        """
+        Обучает и сохраняет модель, если её еще нет. Одновременные запросы
+        одной модели ждут первого.
+        :param model_type: Тип модели.
+        :param model_name: ID модели.
+        :param fit: Функция, возвращающая обученную модель.
+        :return: ID модели
+        """
+        if self._find_model_path(model_name) is not None:
+            LOGGER.info(f"Model {model_name} already exists, skipping training")
+            return model_name
+
+        with self._inflight_lock:
+            inflight = self._inflight.get(model_name)
+            if inflight is None:
+                inflight = self._inflight[model_name] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            LOGGER.info(f"Waiting for concurrent training of {model_name}")
+            return inflight.result()
+
+        try:
+            model = fit()
+            LOGGER.info(f"Model {model_type} trained")
+
+            self.save_model(model, model_name)
+            LOGGER.info(f"Model {model_type} saved with name: {model_name}")
+
+            inflight.set_result(model_name)
+        except Exception as exc:
+            inflight.set_exception(exc)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[model_name]
 
         return model_name
 
     def save_model(self, model: MLModel, model_name: str):
         """
         Сохраняет модель в указанной директории.
+        Модель пишется в новый путь и подменяется одним переименованием: файл joblib –
+        поверх прежнего, нативная модель – ссылкой <id>.model на директорию версии.
+        Читатели в других процессах видят прежнюю или новую модель целиком.
         :param model: Обученная модель для сохранения.
         :param model_name: Имя файла модели.
         """
-        model_path = self._storage_dir / f"{model_name}.joblib"
-        joblib.dump(model, model_path)
+        model_path = (
+            self._storage_dir / f"{model_name}{STORAGE_FORMATS[self._storage_format]}"
+        )
+        new_path = model_path.with_name(f"{model_path.name}.{uuid.uuid4().hex[:8]}")
+        try:
+            if self._storage_format == "native":
+                model.save_native(new_path)
+                _switch_version(new_path, model_path)
+            else:
+                joblib.dump(model, new_path)
+                os.replace(new_path, model_path)
+        except BaseException:
+            if new_path.is_dir():
+                shutil.rmtree(new_path, ignore_errors=True)
+            else:
+                new_path.unlink(missing_ok=True)
+            raise
+        self._remove_other_formats(model_name, keep=model_path)
+        self.cache.invalidate(model_name)
+        if self.prediction_cache is not None:
+            self.prediction_cache.invalidate(model_name)
+        self.registry.register(
+            self._make_record(
+                model_name,
+                type(model).__name__,
+                model.hyperparams,
+                model_path,
+                time.time(),
+                model.parent_id,
+                model.version,
+            )
+        )
 
     def load_model(self, model_name: str) -> MLModel:
         """
@@ -127,41 +508,416 @@ class ModelManager:
         :param model_name: Имя файла модели для загрузки.
         :return: Загруженная модель.
         """
-        model_path = self._storage_dir / f"{model_name}.joblib"
-        if not model_path.exists():
+        return self._load_versioned(model_name)[0]
+
+    def _load_versioned(self, model_name: str) -> tuple[MLModel, float]:
+        """
+        Загружает модель вместе с её версией из реестра.
+        Модель в кэше отдается, только если после её загрузки модель не пересохраняли
+        и не удаляли, в том числе в других процессах.
+        :param model_name: Имя модели.
+        :return: Модель и время её сохранения.
+        """
+        _check_model_name(model_name)
+        saved_at = self.registry.saved_at(model_name)
+        if saved_at is None:
+            # Модель могли удалить в другом процессе: копия в кэше больше не отдается
+            self.cache.invalidate(model_name)
             raise FileNotFoundError(f"Model for loading {model_name} not found.")
+        cached = self.cache.get(model_name)
+        if cached is not None and cached[0] == saved_at:
+            MODEL_CACHE_LOOKUPS.inc(result="hit")
+            return cached[1], saved_at
+        MODEL_CACHE_LOOKUPS.inc(result="miss")
+
         LOGGER.info(f"Loading model {model_name}")
-        return joblib.load(model_path)
+        with STAGE_SECONDS.time(
+            stage="load", model_type=self.model_type_of(model_name)
+        ):
+            try:
+                model, size = self._load_model_files(model_name)
+            except FileNotFoundError:
+                # Директорию версии могли удалить после переключения на новую: путь
+                # ищется заново и указывает уже на новую версию
+                model, size = self._load_model_files(model_name)
+        # Файлы прочитаны после запроса версии, поэтому они не старее неё
+        self.cache.put(model_name, (saved_at, model), size)
+        return model, saved_at
+
+    def _load_model_files(self, model_name: str) -> tuple[MLModel, int]:
+        """
+        Читает модель с диска без кэша.
+        :param model_name: Имя модели.
+        :return: Модель и размер её файлов – оценка памяти, занимаемой загруженной моделью.
+        """
+        model_path = self._find_model_path(model_name)
+        if model_path is None:
+            # Реестр не изменяется на чтении: расхождения исправляет rebuild_registry
+            raise FileNotFoundError(f"Model for loading {model_name} not found.")
+        if model_path.suffix == NATIVE_SUFFIX:
+            # Ссылка разрешается один раз, чтобы все файлы читались из одной версии
+            model_path = model_path.resolve()
+            meta = read_native_meta(model_path)
+            model_class = self._available_models[meta["model_type"]]
+            return model_class.load_native(model_path, mmap=True), _path_size(
+                model_path
+            )
+        # Несжатые массивы внутри joblib-файла тоже отображаются в память
+        return joblib.load(model_path, mmap_mode="r"), _path_size(model_path)
+
+    def preload(self, model_names: list[str]) -> list[str]:
+        """
+        Загружает модели в кэш заранее, пропуская отсутствующие.
+        :param model_names: Имена моделей.
+        :return: Имена загруженных моделей.
+        """
+        loaded = []
+        for model_name in model_names:
+            try:
+                self.load_model(model_name)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                LOGGER.warning(f"Skipping preload of {model_name}: {exc}")
+                continue
+            loaded.append(model_name)
+        return loaded
+
+    def hot_models(self, limit: int | None = None) -> list[str]:
+        """
+        Возвращает модели, использованные последними перед остановкой процессов.
+        :param limit: Максимальное число моделей (None – все).
+        :return: Имена моделей, начиная с недавно использованных.
+        """
+        try:
+            model_names = json.loads(self._hot_models_path.read_text())
+        except (OSError, ValueError):
+            return []
+        return model_names[:limit]
+
+    def record_hot_models(self, max_models: int = 64):
+        """
+        Сохраняет имена моделей из кэша, чтобы следующие процессы загрузили их при старте.
+        Несколько процессов объединяют свои списки, первыми идут модели этого процесса.
+        :param max_models: Максимальная длина сохраненного списка.
+        """
+        model_names = list(dict.fromkeys(self.cache.keys() + self.hot_models()))[
+            :max_models
+        ]
+        tmp_path = self._hot_models_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(model_names))
+        tmp_path.replace(self._hot_models_path)
+
+    @property
+    def _hot_models_path(self) -> Path:
+        return self._storage_dir / "hot_models.json"
 
     def delete_model(self, model_name: str):
         """
         Удаляет модель из хранилища.
         :param model_name: Имя файла модели для удаления.
         """
-        model_path = self._storage_dir / f"{model_name}.joblib"
-        if model_path.exists():
+        model_path = self._find_model_path(model_name)
+        self.cache.invalidate(model_name)
+        if self.prediction_cache is not None:
+            self.prediction_cache.invalidate(model_name)
+        self.registry.unregister(model_name)
+        if model_path is not None:
             LOGGER.info(f"Deleting model {model_name}")
-            model_path.unlink()
+            self._remove_other_formats(model_name, keep=None)
         else:
             raise FileNotFoundError(f"Model for deleting {model_name} not found.")
 
-    def list_models(self) -> list[str]:
+    def list_models(
+        self,
+        model_type: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[str]:
+        """
+        Возвращает список моделей из реестра.
+        :param model_type: Фильтр по типу модели.
+        :param offset: Сколько моделей пропустить.
+        :param limit: Максимальное число моделей (None – все).
+        :return: Список имен моделей.
+        """
+        return [
+            record.name
+            for record in self.registry.list_records(model_type, offset, limit)
+        ]
+
+    def model_exists(self, model_name: str) -> bool:
         """
-        Возвращает список всех моделей, сохраненных в директории.
-        :return: Список имен файлов моделей.
+        Проверяет, что модель есть в реестре.
+        :param model_name: Имя модели.
+        :return: True, если модель сохранена.
         """
-        return [Path(file).stem for file in self._storage_dir.glob("*.joblib")]
+        return self.registry.exists(model_name)
 
-    def predict(self, model_name: str, X: DataType) -> TargetType:
+    def get_model_info(self, model_name: str) -> ModelRecord:
+        """
+        Возвращает метаданные сохраненной модели.
+        :param model_name: Имя модели.
+        :return: Запись реестра.
+        """
+        record = self.registry.get(model_name)
+        if record is None:
+            raise FileNotFoundError(f"Model {model_name} not found.")
+        return record
+
+    def rebuild_registry(self) -> int:
+        """
+        Перестраивает реестр по файлам в директории хранения.
+        :return: Число найденных моделей.
+        """
+        records = []
+        for model_path in self._iter_model_paths():
+            try:
+                if model_path.suffix == NATIVE_SUFFIX:
+                    meta = read_native_meta(model_path)
+                    model_type, hyperparams = meta["model_type"], meta["hyperparams"]
+                    parent_id, version = meta.get("parent_id"), meta.get("version", 1)
+                else:
+                    model = joblib.load(model_path)
+                    model_type, hyperparams = type(model).__name__, model.hyperparams
+                    parent_id, version = model.parent_id, model.version
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                LOGGER.warning(f"Skipping unreadable model file {model_path}: {exc}")
+                continue
+            records.append(
+                self._make_record(
+                    model_path.stem,
+                    model_type,
+                    hyperparams,
+                    model_path,
+                    model_path.stat().st_mtime,
+                    parent_id,
+                    version,
+                )
+            )
+        self.registry.replace_all(records)
+        LOGGER.info(f"Model registry rebuilt with {len(records)} models")
+        return len(records)
+
+    def _find_model_path(self, model_name: str) -> Path | None:
+        """
+        Ищет сохраненную модель в любом из поддерживаемых форматов.
+        :param model_name: Имя модели.
+        :return: Путь к файлу или директории модели, None если модели нет.
+        """
+        _check_model_name(model_name)
+        native_path = self._storage_dir / f"{model_name}{NATIVE_SUFFIX}"
+        # meta.json пишется последним, директория без него не дописана
+        if (native_path / "meta.json").exists():
+            return native_path
+        joblib_path = self._storage_dir / f"{model_name}{JOBLIB_SUFFIX}"
+        return joblib_path if joblib_path.exists() else None
+
+    def _iter_model_paths(self):
+        """
+        Перебирает сохраненные модели всех форматов
+        """
+        yield from self._storage_dir.glob(f"*{JOBLIB_SUFFIX}")
+        for model_path in self._storage_dir.glob(f"*{NATIVE_SUFFIX}"):
+            if (model_path / "meta.json").exists():
+                yield model_path
+
+    def _remove_other_formats(self, model_name: str, keep: Path | None):
+        """
+        Удаляет файлы модели во всех форматах, кроме keep.
+        :param model_name: Имя модели.
+        :param keep: Путь, который нужно сохранить.
+        """
+        for suffix in STORAGE_FORMATS.values():
+            model_path = self._storage_dir / f"{model_name}{suffix}"
+            if model_path == keep or not (
+                model_path.exists() or model_path.is_symlink()
+            ):
+                continue
+            _remove_path(model_path)
+
+    @staticmethod
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def _make_record(
+        model_name: str,
+        model_type: str,
+        hyperparams: dict,
+        model_path: Path,
+        created_at: float,
+        parent_id: str | None = None,
+        version: int = 1,
+    ) -> ModelRecord:
+        """
+        Формирует запись реестра для модели.
+        :param model_name: Имя модели вида <type>_<params_hash>_<data_hash>.
+        :param model_type: Тип модели.
+        :param hyperparams: Гиперпараметры модели.
+        :param model_path: Путь к файлу или директории модели.
+        :param created_at: Время создания модели.
+        :param parent_id: ID модели, дообучением которой получена эта.
+        :param version: Номер версии в цепочке дообучений.
+        :return: Запись реестра.
+        """
+        return ModelRecord(
+            name=model_name,
+            model_type=model_type,
+            hyperparams=hyperparams,
+            data_hash=model_name.rsplit("_", 1)[-1],
+            file_size=_path_size(model_path),
+            created_at=created_at,
+            parent_id=parent_id,
+            version=version,
+        )
+
+    def predict(
+        self, model_name: str, X: DataType, use_cache: bool = True
+    ) -> TargetType:
         """
         Делает предсказание для обученной модели
         :param model_name: Имя файла модели для загрузки.
         :param X: Данные для предсказания модели
+        :param use_cache: Использовать кэш предсказаний (при пакетном скоринге
+            строки не повторяются и только вытесняли бы полезные записи).
         :return: Предсказания
         """
-        model = self.load_model(model_name)
+        model, saved_at = self._load_versioned(model_name)
         LOGGER.info(f"Getting predictions for model {model_name}")
-        return model.predict(X)
+        if self.prediction_cache is None or not use_cache:
+            return self._predict_rows(model, X)
+
+        # Считаются только строки, которых нет в кэше предсказаний
+        # Версия в ключе отсекает предсказания модели, пересохраненной другим процессом
+        keys, cached = self.prediction_cache.lookup(model_name, X, version=saved_at)
+        missing = [i for i, value in enumerate(cached) if value is None]
+        PREDICTION_CACHE_ROWS.inc(len(cached) - len(missing), result="hit")
+        PREDICTION_CACHE_ROWS.inc(len(missing), result="miss")
+        if not missing:
+            return np.asarray(cached)
+        if len(missing) == len(cached):
+            predictions = np.asarray(self._predict_rows(model, X))
+            self.prediction_cache.store(keys, predictions)
+            return predictions
+
+        X_missing = (
+            X.iloc[missing] if isinstance(X, pd.DataFrame) else np.asarray(X)[missing]
+        )
+        computed = np.asarray(self._predict_rows(model, X_missing))
+        self.prediction_cache.store([keys[i] for i in missing], computed)
+        predictions = np.empty(
+            (len(cached),) + computed.shape[1:], dtype=computed.dtype
+        )
+        for i, value in enumerate(cached):
+            if value is not None:
+                predictions[i] = value
+        predictions[missing] = computed
+        return predictions
+
+    @staticmethod
+    def _predict_rows(model: MLModel, X: DataType) -> TargetType:
+        model_type = type(model).__name__
+        with STAGE_SECONDS.time(stage="predict", model_type=model_type):
+            # Быстрый путь без валидации входа, если колонки совпадают с обучающими
+            inference = model.get_inference()
+            if inference is not None and inference.accepts(X):
+                predictions = inference.predict(X)
+            else:
+                predictions = model.predict(X)
+        ROWS_SCORED.inc(len(X), model_type=model_type)
+        return predictions
+
+    def model_type_of(self, model_name: str) -> str:
+        """
+        Определяет тип модели по её имени для меток метрик.
+        :param model_name: Имя модели вида <type>_<params_hash>_<data_hash> или тип модели.
+        :return: Тип модели или "unknown".
+        """
+        model_type = model_name.split("_", 1)[0]
+        return model_type if model_type in self._available_models else "unknown"
+
+    def collect_metrics(self) -> list[Sample]:
+        """
+        Метрики кэша и хранилища моделей для MetricsRegistry.add_collector.
+        :return: Значения метрик.
+        """
+        cache_stats = self.cache.stats()
+        lookups = cache_stats["hits"] + cache_stats["misses"]
+        samples: list[Sample] = [
+            (
+                "mlops_model_cache_hit_ratio",
+                "gauge",
+                "Share of model cache lookups served from memory in this process",
+                {},
+                cache_stats["hits"] / lookups if lookups else 0.0,
+            ),
+            (
+                "mlops_model_cache_size_bytes",
+                "gauge",
+                "Estimated memory of cached models in this process",
+                {},
+                cache_stats["size_bytes"],
+            ),
+            (
+                "mlops_model_cache_items",
+                "gauge",
+                "Number of cached models in this process",
+                {},
+                cache_stats["items"],
+            ),
+        ]
+        if self.prediction_cache is not None:
+            samples.append(
+                (
+                    "mlops_prediction_cache_rows",
+                    "gauge",
+                    "Number of cached prediction rows in this process",
+                    {},
+                    self.prediction_cache.stats()["rows"],
+                )
+            )
+        for model_type, (count, size) in self.registry.size_by_type().items():
+            labels = {"model_type": model_type}
+            samples.append(
+                (
+                    "mlops_stored_models",
+                    "gauge",
+                    "Number of stored models",
+                    labels,
+                    count,
+                )
+            )
+            samples.append(
+                (
+                    "mlops_model_storage_bytes",
+                    "gauge",
+                    "Size of stored model files",
+                    labels,
+                    size,
+                )
+            )
+        return samples
 
 
-MODEL_MANAGER = ModelManager("./models_storage")
+MODEL_MANAGER = ModelManager(
+    "./models_storage",
+    cache_max_bytes=int(os.getenv("MODEL_CACHE_MAX_BYTES", str(512 * 1024**2))),
+    legacy_data_hash=os.getenv("MODEL_ID_LEGACY_HASH", "0") == "1",
+    data_hash_algorithm=os.getenv("MODEL_ID_HASH_ALGORITHM", "blake2b"),
+    storage_format=os.getenv("MODEL_STORAGE_FORMAT", "native"),
+    prediction_cache=(
+        PredictionCache(
+            max_rows=int(os.environ["PREDICTION_CACHE_MAX_ROWS"]),
+            ttl_s=float(os.getenv("PREDICTION_CACHE_TTL_S", "300")),
+        )
+        if int(os.getenv("PREDICTION_CACHE_MAX_ROWS", "0")) > 0
+        else None
+    ),
+    pool_cache=(
+        QuantizedPoolCache(
+            max_bytes=int(os.environ["POOL_CACHE_MAX_BYTES"]),
+            storage_dir=os.getenv("POOL_CACHE_DIR") or None,
+            max_disk_bytes=int(
+                os.getenv("POOL_CACHE_MAX_DISK_BYTES", str(10 * 1024**3))
+            ),
+        )
+        if int(os.getenv("POOL_CACHE_MAX_BYTES", "0")) > 0
+        else None
+    ),
+)
@@ -0,0 +1,218 @@
+"""
+Persistent index of stored models
+"""
+
+import json
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+_COLUMNS = "(name, model_type, hyperparams, data_hash, file_size, created_at, parent_id, version)"
+
+
+@dataclass
+# pylint: disable-next=too-many-instance-attributes
+class ModelRecord:
+    """
+    Metadata of stored model
+    """
+
+    name: str
+    model_type: str
+    hyperparams: dict
+    data_hash: str
+    file_size: int
+    created_at: float
+    parent_id: str | None = None
+    version: int = 1
+
+
+class ModelRegistry:
+    """
+    SQLite-backed registry of stored models
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Инициализация реестра моделей.
+        :param db_path: Путь к файлу базы SQLite.
+        """
+        self._db_path = Path(db_path)
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS models (
+                        name TEXT PRIMARY KEY,
+                        model_type TEXT NOT NULL,
+                        hyperparams TEXT NOT NULL,
+                        data_hash TEXT NOT NULL,
+                        file_size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        parent_id TEXT,
+                        version INTEGER NOT NULL DEFAULT 1
+                    )
+                    """)
+                columns = {
+                    row["name"] for row in conn.execute("PRAGMA table_info(models)")
+                }
+                # Реестр, созданный до появления версий моделей
+                if "parent_id" not in columns:
+                    conn.execute("ALTER TABLE models ADD COLUMN parent_id TEXT")
+                if "version" not in columns:
+                    conn.execute(
+                        "ALTER TABLE models ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+                    )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS models_type_idx ON models (model_type, name)"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def register(self, record: ModelRecord):
+        """
+        Добавляет или обновляет запись о модели.
+        :param record: Метаданные модели.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO models {_COLUMNS} VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._to_row(record),
+                )
+
+    def unregister(self, name: str):
+        """
+        Удаляет запись о модели.
+        :param name: Имя модели.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM models WHERE name = ?", (name,))
+
+    def exists(self, name: str) -> bool:
+        """
+        Проверяет наличие модели в реестре.
+        :param name: Имя модели.
+        :return: True, если модель зарегистрирована.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM models WHERE name = ?", (name,)
+            ).fetchone()
+        return row is not None
+
+    def saved_at(self, name: str) -> float | None:
+        """
+        Возвращает время последнего сохранения модели – её версию для кэшей процессов.
+        :param name: Имя модели.
+        :return: Время сохранения или None, если модель не зарегистрирована.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT created_at FROM models WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def get(self, name: str) -> ModelRecord | None:
+        """
+        Возвращает метаданные модели.
+        :param name: Имя модели.
+        :return: Метаданные или None, если модель не зарегистрирована.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM models WHERE name = ?", (name,)
+            ).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def list_records(
+        self,
+        model_type: str | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> list[ModelRecord]:
+        """
+        Возвращает страницу записей, упорядоченных по имени.
+        :param model_type: Фильтр по типу модели.
+        :param offset: Сколько записей пропустить.
+        :param limit: Максимальное число записей (None – без ограничения).
+        :return: Список метаданных моделей.
+        """
+        query = "SELECT * FROM models"
+        args: list = []
+        if model_type is not None:
+            query += " WHERE model_type = ?"
+            args.append(model_type)
+        query += " ORDER BY name LIMIT ? OFFSET ?"
+        args.extend([limit if limit is not None else -1, offset])
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, args).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def count(self, model_type: str | None = None) -> int:
+        """
+        Возвращает число зарегистрированных моделей.
+        :param model_type: Фильтр по типу модели.
+        :return: Число моделей.
+        """
+        query = "SELECT COUNT(*) FROM models"
+        args: list = []
+        if model_type is not None:
+            query += " WHERE model_type = ?"
+            args.append(model_type)
+        with closing(self._connect()) as conn:
+            return conn.execute(query, args).fetchone()[0]
+
+    def size_by_type(self) -> dict[str, tuple[int, int]]:
+        """
+        Возвращает число моделей и их суммарный размер по типам.
+        :return: Словарь тип модели -> (число моделей, размер в байтах).
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT model_type, COUNT(*), SUM(file_size) FROM models GROUP BY model_type"
+            ).fetchall()
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def replace_all(self, records: list[ModelRecord]):
+        """
+        Атомарно заменяет содержимое реестра.
+        :param records: Новый набор записей.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("DELETE FROM models")
+                conn.executemany(
+                    f"INSERT INTO models {_COLUMNS} VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self._to_row(record) for record in records],
+                )
+
+    @staticmethod
+    def _to_row(record: ModelRecord) -> tuple:
+        return (
+            record.name,
+            record.model_type,
+            json.dumps(record.hyperparams, sort_keys=True, default=str),
+            record.data_hash,
+            record.file_size,
+            record.created_at,
+            record.parent_id,
+            record.version,
+        )
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> ModelRecord:
+        return ModelRecord(
+            name=row["name"],
+            model_type=row["model_type"],
+            hyperparams=json.loads(row["hyperparams"]),
+            data_hash=row["data_hash"],
+            file_size=row["file_size"],
+            created_at=row["created_at"],
+            parent_id=row["parent_id"],
+            version=row["version"],
+        )
@@ -0,0 +1,133 @@
+"""
+Out-of-core datasets: CSV or Parquet files read in chunks instead of loading them in memory
+"""
+
+import contextlib
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pq = None
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+def _parquet_file(path: Path):
+    if pq is None:
+        raise RuntimeError("Parquet input requires the pyarrow package")
+    return pq.ParquetFile(path)
+
+
+def count_rows(path: Path) -> int | None:
+    """
+    Число строк файла, если его можно узнать без чтения данных.
+    :param path: Путь к файлу.
+    :return: Число строк или None для CSV.
+    """
+    if path.suffix in PARQUET_SUFFIXES and pq is not None:
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+
+def iter_chunks(
+    path: Path, chunk_rows: int, skip_rows: int = 0
+) -> Iterator[pd.DataFrame]:
+    """
+    Читает CSV или Parquet файл чанками, не загружая его целиком.
+    :param path: Путь к файлу.
+    :param chunk_rows: Число строк в чанке.
+    :param skip_rows: Сколько первых строк пропустить (продолжение задачи).
+    :return: Итератор чанков.
+    """
+    if path.suffix in PARQUET_SUFFIXES:
+        parquet = _parquet_file(path)
+        # Целиком обработанные группы строк не читаются
+        row_groups, offset = [], 0
+        for index in range(parquet.num_row_groups):
+            num_rows = parquet.metadata.row_group(index).num_rows
+            if offset + num_rows <= skip_rows:
+                offset += num_rows
+                continue
+            row_groups.append(index)
+        skip_rows -= offset
+        for batch in parquet.iter_batches(batch_size=chunk_rows, row_groups=row_groups):
+            if skip_rows:
+                dropped = min(skip_rows, batch.num_rows)
+                batch = batch.slice(dropped)
+                skip_rows -= dropped
+            if batch.num_rows:
+                yield batch.to_pandas()
+        return
+
+    skip = (lambda i: 0 < i <= skip_rows) if skip_rows else None
+    yield from pd.read_csv(path, chunksize=chunk_rows, skiprows=skip)
+
+
+@dataclass
+class TrainingFile:
+    """
+    Training dataset stored in CSV or Parquet file
+    """
+
+    path: str
+    target_column: str = "target"
+    chunk_rows: int = 100_000
+
+    def columns(self) -> list[str]:
+        """
+        Колонки файла в порядке хранения, без чтения данных.
+        :return: Имена колонок.
+        """
+        path = Path(self.path)
+        if path.suffix in PARQUET_SUFFIXES:
+            # Пустая таблица по схеме учитывает pandas-метаданные (индекс не считается колонкой)
+            frame = _parquet_file(path).schema_arrow.empty_table().to_pandas()
+        else:
+            frame = pd.read_csv(path, nrows=0)
+        return [str(column) for column in frame.columns]
+
+    def feature_columns(self) -> list[str]:
+        """
+        Колонки признаков – все колонки, кроме целевой.
+        :return: Имена колонок.
+        """
+        columns = self.columns()
+        if self.target_column not in columns:
+            raise ValueError(f"Target column '{self.target_column}' not found")
+        return [column for column in columns if column != self.target_column]
+
+    def iter_batches(self) -> Iterator[tuple[pd.DataFrame, np.ndarray]]:
+        """
+        Читает файл чанками по chunk_rows строк.
+        :return: Итератор пар (признаки, целевые значения).
+        """
+        for chunk in iter_chunks(Path(self.path), self.chunk_rows):
+            chunk.columns = [str(column) for column in chunk.columns]
+            yield chunk.drop(columns=self.target_column), chunk[
+                self.target_column
+            ].to_numpy()
+
+    @contextlib.contextmanager
+    def as_csv(self) -> Iterator[Path]:
+        """
+        CSV файл с заголовком для библиотек, читающих с диска только текстовые форматы.
+        Parquet чанками переписывается во временный файл (в TMPDIR), который удаляется
+        при выходе из контекста.
+        :return: Путь к CSV файлу.
+        """
+        path = Path(self.path)
+        if path.suffix not in PARQUET_SUFFIXES:
+            yield path
+            return
+        with tempfile.TemporaryDirectory(prefix="training_file_") as tmp_dir:
+            csv_path = Path(tmp_dir) / f"{path.stem}.csv"
+            for index, chunk in enumerate(iter_chunks(path, self.chunk_rows)):
+                chunk.to_csv(csv_path, mode="a", header=index == 0, index=False)
+            yield csv_path
@@ -0,0 +1,181 @@
+"""
+Cache of quantized CatBoost pools
+"""
+
+import functools
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+from catboost import Pool
+
+from models.fingerprint import fingerprint_dataset
+from models.ml_models.base_model import DataType, TargetType
+from models.model_cache import ModelCache
+
+LOGGER = logging.getLogger(__name__)
+
+# Значения CatBoost по умолчанию для CPU
+DEFAULT_BORDER_COUNT = 254
+DEFAULT_FEATURE_BORDER_TYPE = "GreedyLogSum"
+POOL_SUFFIX = ".qpool"
+
+
+# pylint: disable-next=too-many-instance-attributes
+class QuantizedPoolCache:
+    """
+    Quantized CatBoost pools keyed by dataset fingerprint and quantization parameters,
+    kept in memory with LRU eviction and optionally saved to disk
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 1024**3,
+        storage_dir: str | None = None,
+        max_disk_bytes: int = 10 * 1024**3,
+    ):
+        """
+        Инициализация кэша квантизованных пулов.
+        :param max_bytes: Бюджет памяти кэша в байтах.
+        :param storage_dir: Директория для сохранения пулов на диск (None – только память).
+        :param max_disk_bytes: Бюджет места на диске в байтах.
+        """
+        self._max_bytes = max_bytes
+        self._storage_dir = Path(storage_dir) if storage_dir is not None else None
+        self._max_disk_bytes = max_disk_bytes
+        if self._storage_dir is not None:
+            self._storage_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = ModelCache(max_bytes=max_bytes)
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._built = 0
+        self._disk_hits = 0
+
+    def __reduce__(self):
+        # В дочерних процессах обучения восстанавливается один общий на процесс кэш
+        return shared_pool_cache, (
+            self._max_bytes,
+            str(self._storage_dir) if self._storage_dir is not None else None,
+            self._max_disk_bytes,
+        )
+
+    def get_pool(
+        self,
+        X: DataType,
+        y: TargetType,
+        border_count: int | None = None,
+        feature_border_type: str | None = None,
+        data_key: str | None = None,
+    ) -> Pool:
+        """
+        Возвращает квантизованный пул из памяти, с диска или строит новый.
+        :param X: Признаки.
+        :param y: Целевые значения.
+        :param border_count: Число границ квантизации.
+        :param feature_border_type: Способ выбора границ.
+        :param data_key: Готовый ключ данных вместо отпечатка датасета.
+        :return: Квантизованный пул.
+        """
+        border_count = border_count or DEFAULT_BORDER_COUNT
+        feature_border_type = feature_border_type or DEFAULT_FEATURE_BORDER_TYPE
+        data_key = data_key or fingerprint_dataset(X, y)[:32]
+        key = f"{data_key}_{border_count}_{feature_border_type}"
+
+        pool = self.cache.get(key)
+        if pool is not None:
+            return pool
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Одинаковые пулы, запрошенные одновременно, квантизуются один раз
+        with key_lock:
+            pool = self.cache.get(key)
+            if pool is None:
+                pool = self._load(key)
+            if pool is None:
+                pool = Pool(X, y)
+                pool.quantize(
+                    border_count=border_count, feature_border_type=feature_border_type
+                )
+                self._built += 1
+                self._save(key, pool)
+            self.cache.put(key, pool, _pool_size(pool, border_count))
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return pool
+
+    def _path(self, key: str) -> Path:
+        return self._storage_dir / f"{key}{POOL_SUFFIX}"
+
+    def _load(self, key: str) -> Pool | None:
+        if self._storage_dir is None or not self._path(key).exists():
+            return None
+        path = self._path(key)
+        try:
+            pool = Pool(f"quantized://{path}")
+        except Exception:  # pylint: disable=broad-exception-caught
+            LOGGER.warning(f"Quantized pool {path} is unreadable, rebuilding")
+            path.unlink(missing_ok=True)
+            return None
+        # mtime используется как время последнего обращения при вытеснении
+        os.utime(path)
+        self._disk_hits += 1
+        return pool
+
+    def _save(self, key: str, pool: Pool):
+        if self._storage_dir is None:
+            return
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        pool.save(str(tmp_path))
+        tmp_path.replace(path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        for path in self._storage_dir.glob(f"*{POOL_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            if total <= self._max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> dict[str, int]:
+        """
+        Возвращает счётчики кэша.
+        :return: Счётчики кэша в памяти, число построенных пулов и загрузок с диска.
+        """
+        return {
+            **self.cache.stats(),
+            "built": self._built,
+            "disk_hits": self._disk_hits,
+        }
+
+
+def _pool_size(pool: Pool, border_count: int) -> int:
+    # Квантизованное значение занимает байт при border_count < 256, иначе два
+    value_bytes = 1 if border_count < 256 else 2
+    return pool.num_row() * (
+        pool.num_col() * value_bytes + np.dtype(np.float64).itemsize
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def shared_pool_cache(
+    max_bytes: int, storage_dir: str | None, max_disk_bytes: int
+) -> QuantizedPoolCache:
+    """
+    Кэш квантизованных пулов, общий для процесса.
+    :param max_bytes: Бюджет памяти кэша в байтах.
+    :param storage_dir: Директория для сохранения пулов на диск.
+    :param max_disk_bytes: Бюджет места на диске в байтах.
+    :return: Кэш.
+    """
+    return QuantizedPoolCache(max_bytes, storage_dir, max_disk_bytes)
@@ -0,0 +1,136 @@
+"""
+Per-row cache of model predictions
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from models.ml_models.base_model import DataType
+
+
+def row_keys(X: DataType) -> list:
+    """
+    Ключи строк матрицы признаков.
+    Числовые строки представляются своими байтами float64, поэтому ключи не
+    имеют коллизий; для остальных данных используется hash_pandas_object.
+    :param X: Данные.
+    :return: Список ключей по строкам.
+    """
+    frame = X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
+    if len(frame) == 0:
+        return []
+    try:
+        values = np.ascontiguousarray(frame.to_numpy(dtype=np.float64))
+    except (TypeError, ValueError):
+        return pd.util.hash_pandas_object(frame, index=False).tolist()
+    row_dtype = np.dtype((np.void, values.shape[1] * values.itemsize))
+    return values.view(row_dtype).ravel().tolist()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of per-row predictions with TTL
+    """
+
+    def __init__(self, max_rows: int = 100_000, ttl_s: float = 300.0):
+        """
+        Инициализация кэша предсказаний.
+        :param max_rows: Максимальное число строк в кэше.
+        :param ttl_s: Время жизни предсказания в секундах.
+        """
+        self._max_rows = max_rows
+        self._ttl_s = ttl_s
+        self._entries: OrderedDict[tuple, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def lookup(
+        self, model_name: str, X: DataType, version: Any = None
+    ) -> tuple[list, list]:
+        """
+        Ищет предсказания строк X.
+        :param model_name: Имя модели.
+        :param X: Данные.
+        :param version: Версия модели; предсказания других версий не возвращаются.
+        :return: Ключи строк и предсказания (None для отсутствующих строк).
+        """
+        layout = (model_name, version, _columns(X))
+        keys = [(layout, key) for key in row_keys(X)]
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] < now:
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    values.append(None)
+                    continue
+                self._entries.move_to_end(key)
+                values.append(entry[0])
+            hits = sum(value is not None for value in values)
+            self._hits += hits
+            self._misses += len(values) - hits
+        return keys, values
+
+    def store(self, keys: list, predictions: np.ndarray):
+        """
+        Кладёт предсказания строк в кэш, вытесняя давно не использованные.
+        :param keys: Ключи строк из lookup.
+        :param predictions: Предсказания для этих строк.
+        """
+        expires_at = time.monotonic() + self._ttl_s
+        with self._lock:
+            for key, value in zip(
+                keys[-self._max_rows :], predictions[-self._max_rows :]
+            ):
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_rows:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, model_name: str):
+        """
+        Удаляет все предсказания модели в этом процессе.
+        Другие процессы перестают отдавать их по версии модели в ключе.
+        :param model_name: Имя модели.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0][0] == model_name]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Очищает кэш
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Возвращает счётчики кэша.
+        :return: Словарь со счётчиками попаданий и промахов по строкам и вытеснений.
+        """
+        with self._lock:
+            return {
+                "rows": len(self._entries),
+                "max_rows": self._max_rows,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+def _columns(X: DataType) -> tuple:
+    if isinstance(X, pd.DataFrame):
+        return tuple(X.columns)
+    return (np.shape(X)[1],) if np.ndim(X) == 2 else ()
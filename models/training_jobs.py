@@ -0,0 +1,620 @@
+"""
+Background training jobs
+"""
+
+import logging
+import multiprocessing
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from models.metrics import TRAINING_SECONDS
+from models.ml_models.base_model import DataType, TargetType
+from models.model_manager import ModelManager
+from models.out_of_core import TrainingFile
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+LOGGER = logging.getLogger(__name__)
+
+
+class JobQueueFullError(RuntimeError):
+    """
+    Raised when too many training jobs are queued
+    """
+
+
+@dataclass
+# pylint: disable-next=too-many-instance-attributes
+class TrainingJob:
+    """
+    State of training job
+    """
+
+    job_id: str
+    model_type: str
+    status: str = "pending"
+    model_id: str | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    peak_memory_bytes: int | None = None
+
+
+class PeakMemory:
+    """
+    Peak resident memory of current process within the block
+    """
+
+    def __init__(self):
+        self.peak_bytes: int | None = None
+
+    def __enter__(self) -> "PeakMemory":
+        # На Linux пик (VmHWM) сбрасывается, и процесс пула, выполнивший несколько задач,
+        # сообщает пик только этой задачи
+        try:
+            Path("/proc/self/clear_refs").write_text("5", encoding="ascii")
+        except OSError:
+            pass
+        return self
+
+    def __exit__(self, *exc_info):
+        self.peak_bytes = peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Пиковый объем резидентной памяти процесса.
+    :return: Байты или None, если платформа его не сообщает.
+    """
+    try:
+        for line in Path("/proc/self/status").read_text(encoding="ascii").splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss в байтах на macOS и в килобайтах на Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class JobStore:
+    """
+    SQLite-backed job states shared by server worker processes
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Инициализация хранилища состояний задач.
+        :param db_path: Путь к файлу базы SQLite.
+        """
+        self._db_path = Path(db_path)
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        job_id TEXT PRIMARY KEY,
+                        model_type TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        model_id TEXT,
+                        error TEXT,
+                        created_at REAL NOT NULL,
+                        finished_at REAL,
+                        peak_memory_bytes INTEGER
+                    )
+                    """)
+                columns = {
+                    row["name"] for row in conn.execute("PRAGMA table_info(jobs)")
+                }
+                if "peak_memory_bytes" not in columns:
+                    # База, созданная до появления колонки
+                    conn.execute(
+                        "ALTER TABLE jobs ADD COLUMN peak_memory_bytes INTEGER"
+                    )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def save(self, job: TrainingJob):
+        """
+        Сохраняет текущее состояние задачи.
+        :param job: Задача.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO jobs (job_id, model_type, status, model_id, error,
+                        created_at, finished_at, peak_memory_bytes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        job.job_id,
+                        job.model_type,
+                        job.status,
+                        job.model_id,
+                        job.error,
+                        job.created_at,
+                        job.finished_at,
+                        job.peak_memory_bytes,
+                    ),
+                )
+
+    def get(self, job_id: str) -> TrainingJob | None:
+        """
+        Возвращает сохраненное состояние задачи.
+        :param job_id: ID задачи.
+        :return: Задача или None, если её нет.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return TrainingJob(**dict(row)) if row is not None else None
+
+    def prune(self, max_history: int):
+        """
+        Удаляет самые старые завершенные задачи сверх max_history.
+        :param max_history: Сколько завершенных задач хранить.
+        """
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    """
+                    DELETE FROM jobs WHERE job_id IN (
+                        SELECT job_id FROM jobs WHERE finished_at IS NOT NULL
+                        ORDER BY finished_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (max_history,),
+                )
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def _train_job(
+    storage_dir: str,
+    worker_options: dict,
+    model_type: str,
+    X_train: DataType,
+    y_train: TargetType,
+    model_params: dict,
+) -> tuple[str, int | None]:
+    """
+    Обучает модель в дочернем процессе.
+    :return: ID модели и пиковая память процесса во время обучения
+    """
+    manager = ModelManager(storage_dir, cache_max_bytes=0, **worker_options)
+    with PeakMemory() as memory:
+        model_id = manager.train_and_save_model(
+            model_type, X_train, y_train, model_params
+        )
+    return model_id, memory.peak_bytes
+
+
+def _train_file_job(
+    storage_dir: str,
+    worker_options: dict,
+    model_type: str,
+    data: TrainingFile,
+    model_params: dict,
+) -> tuple[str, int | None]:
+    """
+    Обучает модель по файлу в дочернем процессе.
+    :return: ID модели и пиковая память процесса во время обучения
+    """
+    manager = ModelManager(storage_dir, cache_max_bytes=0, **worker_options)
+    with PeakMemory() as memory:
+        model_id = manager.train_from_file(model_type, data, model_params)
+    return model_id, memory.peak_bytes
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def _update_job(
+    storage_dir: str,
+    worker_options: dict,
+    model_id: str,
+    X_new: DataType,
+    y_new: TargetType,
+    model_params: dict,
+) -> tuple[str, int | None]:
+    """
+    Дообучает модель в дочернем процессе.
+    :return: ID новой модели и пиковая память процесса во время дообучения
+    """
+    manager = ModelManager(storage_dir, cache_max_bytes=0, **worker_options)
+    with PeakMemory() as memory:
+        updated_id = manager.update_model(model_id, X_new, y_new, model_params)
+    return updated_id, memory.peak_bytes
+
+
+# pylint: disable-next=too-many-instance-attributes
+class TrainingJobManager:
+    """
+    Runs training jobs in bounded process pool
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        model_manager: ModelManager,
+        max_workers: int = 2,
+        max_queued: int = 16,
+        max_history: int = 1000,
+        job_store: JobStore | None = None,
+        input_dirs: list[str] | None = None,
+    ):
+        """
+        Инициализация менеджера задач обучения.
+        :param model_manager: Менеджер моделей, в хранилище которого сохраняются модели.
+        :param max_workers: Число процессов обучения.
+        :param max_queued: Максимальное число незавершенных задач (в очереди и в работе).
+        :param max_history: Сколько завершенных задач хранить для опроса статуса.
+        :param job_store: Общее хранилище состояний задач, через которое статус задачи
+            доступен из других процессов сервера.
+        :param input_dirs: Директории, из файлов которых можно обучать модели
+            (None – без ограничений).
+        """
+        self._model_manager = model_manager
+        self._max_workers = max_workers
+        self._max_queued = max_queued
+        self._max_history = max_history
+        self._job_store = job_store
+        self._input_dirs = (
+            [Path(path).resolve() for path in input_dirs]
+            if input_dirs is not None
+            else None
+        )
+        self._executor: ProcessPoolExecutor | None = None
+        self._jobs: dict[str, TrainingJob] = {}
+        self._pending: OrderedDict[str, tuple] = OrderedDict()
+        self._running: dict[str, Future] = {}
+        self._started_at: dict[str, float] = {}
+        # Ключ объединения одинаковых задач: ID модели или, для обучения по файлу,
+        # путь, размер и время изменения файла с параметрами
+        self._active_by_model: dict[str, str] = {}
+        self._active_keys: dict[str, str] = {}
+        # RLock: колбэк завершения может вызваться сразу внутри _dispatch
+        self._lock = threading.RLock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _reset_executor(self):
+        """
+        Отбрасывает пул, чтобы следующая задача создала новый
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _submit_to_pool(self, fn, args: tuple) -> tuple[Future, ProcessPoolExecutor]:
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args), executor
+        except BrokenProcessPool:
+            # Процесс пула погиб (например, убит при нехватке памяти): пул пересоздается
+            LOGGER.warning("Training process pool is broken, recreating it")
+            self._reset_executor()
+            executor = self._get_executor()
+            return executor.submit(fn, *args), executor
+
+    def submit(
+        self,
+        model_type: str,
+        X_train: DataType,
+        y_train: TargetType,
+        model_params: dict = None,
+    ) -> TrainingJob:
+        """
+        Ставит задачу обучения в очередь.
+        :param model_type: Тип модели.
+        :param X_train: Данные для обучения модели.
+        :param y_train: Целевые значения для обучения модели.
+        :param model_params: Параметры для модели.
+        :return: Созданная задача.
+        """
+        if model_type not in self._model_manager.available_models:
+            raise ValueError(f"Unsupported model type '{model_type}'")
+
+        model_id = self._model_manager.get_model_id(
+            model_type, X_train, y_train, model_params
+        )
+        job = self._submit_model(
+            model_type,
+            model_id,
+            _train_job,
+            (
+                str(self._model_manager.storage_dir),
+                self._model_manager.worker_options,
+                model_type,
+                X_train,
+                y_train,
+                model_params or {},
+            ),
+        )
+        LOGGER.info(f"Training job {job.job_id} for {model_type} submitted")
+        return job
+
+    def submit_update(
+        self,
+        model_id: str,
+        X_new: DataType,
+        y_new: TargetType,
+        model_params: dict = None,
+    ) -> TrainingJob:
+        """
+        Ставит в очередь дообучение сохраненной модели на новых данных.
+        :param model_id: ID родительской модели.
+        :param X_new: Новые данные.
+        :param y_new: Новые целевые значения.
+        :param model_params: Параметры, переопределяющие параметры родителя при дообучении.
+        :return: Созданная задача.
+        """
+        updated_id = self._model_manager.get_update_model_id(
+            model_id, X_new, y_new, model_params
+        )
+        job = self._submit_model(
+            self._model_manager.model_type_of(model_id),
+            updated_id,
+            _update_job,
+            (
+                str(self._model_manager.storage_dir),
+                self._model_manager.worker_options,
+                model_id,
+                X_new,
+                y_new,
+                model_params or {},
+            ),
+        )
+        LOGGER.info(f"Update job {job.job_id} for {model_id} submitted")
+        return job
+
+    def _submit_model(
+        self, model_type: str, model_id: str, fn, args: tuple
+    ) -> TrainingJob:
+        with self._lock:
+            # Одинаковые задачи объединяются в одну, готовые модели не переобучаются
+            active_job_id = self._active_by_model.get(model_id)
+            if active_job_id is not None:
+                LOGGER.info(f"Training job {active_job_id} reused for {model_id}")
+                return self._jobs[active_job_id]
+
+            job = TrainingJob(job_id=uuid.uuid4().hex, model_type=model_type)
+            if self._model_manager.model_exists(model_id):
+                job.status = "succeeded"
+                job.model_id = model_id
+                job.finished_at = time.time()
+                self._jobs[job.job_id] = job
+                self._persist(job)
+                return job
+
+            if len(self._pending) + len(self._running) >= self._max_queued:
+                raise JobQueueFullError("Training queue is full, try again later")
+
+            job.model_id = model_id
+            self._enqueue(job, model_id, fn, args)
+        return job
+
+    def submit_file(
+        self,
+        model_type: str,
+        input_path: str,
+        target_column: str = "target",
+        model_params: dict = None,
+        chunk_rows: int = 100_000,
+    ) -> TrainingJob:
+        """
+        Ставит в очередь обучение по CSV или Parquet файлу без загрузки его в память.
+        ID модели вычисляется в процессе обучения и появляется в задаче после её завершения.
+        :param model_type: Тип модели.
+        :param input_path: Путь к файлу внутри разрешенных директорий.
+        :param target_column: Колонка целевых значений.
+        :param model_params: Параметры для модели.
+        :param chunk_rows: Число строк в чанке чтения.
+        :return: Созданная задача.
+        """
+        if model_type not in self._model_manager.available_models:
+            raise ValueError(f"Unsupported model type '{model_type}'")
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be positive")
+        source = Path(input_path).resolve()
+        if self._input_dirs is not None and not any(
+            source.is_relative_to(allowed) for allowed in self._input_dirs
+        ):
+            raise PermissionError(
+                f"Path {input_path} is outside of allowed input directories"
+            )
+        if not source.is_file():
+            raise FileNotFoundError(f"Input file {input_path} not found.")
+        data = TrainingFile(str(source), target_column, chunk_rows)
+        # Заголовок проверяется сразу, чтобы ошибка в запросе не ждала очереди
+        data.feature_columns()
+
+        stat = source.stat()
+        params_string = "".join(
+            str(param) for param in sorted((model_params or {}).items())
+        )
+        key = (
+            f"{model_type}:{source}:{stat.st_size}:{stat.st_mtime_ns}:"
+            f"{target_column}:{params_string}"
+        )
+
+        with self._lock:
+            active_job_id = self._active_by_model.get(key)
+            if active_job_id is not None:
+                LOGGER.info(f"Training job {active_job_id} reused for {source}")
+                return self._jobs[active_job_id]
+            if len(self._pending) + len(self._running) >= self._max_queued:
+                raise JobQueueFullError("Training queue is full, try again later")
+
+            job = TrainingJob(job_id=uuid.uuid4().hex, model_type=model_type)
+            self._enqueue(
+                job,
+                key,
+                _train_file_job,
+                (
+                    str(self._model_manager.storage_dir),
+                    self._model_manager.worker_options,
+                    model_type,
+                    data,
+                    model_params or {},
+                ),
+            )
+
+        LOGGER.info(
+            f"Training job {job.job_id} for {model_type} from {source} submitted"
+        )
+        return job
+
+    def _enqueue(self, job: TrainingJob, key: str, fn, args: tuple):
+        self._jobs[job.job_id] = job
+        self._active_by_model[key] = job.job_id
+        self._active_keys[job.job_id] = key
+        self._pending[job.job_id] = (fn, args)
+        self._persist(job)
+        self._prune_history()
+        self._dispatch()
+
+    def _dispatch(self):
+        # Задачи передаются в пул только при наличии свободного процесса,
+        # чтобы ожидающие задачи оставались отменяемыми
+        while self._pending and len(self._running) < self._max_workers:
+            job_id, (fn, args) = self._pending.popitem(last=False)
+            job = self._jobs[job_id]
+            try:
+                future, executor = self._submit_to_pool(fn, args)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                LOGGER.exception(f"Training job {job_id} could not be started")
+                self._active_by_model.pop(self._active_keys.pop(job_id, None), None)
+                job.status = "failed"
+                job.error = str(exc)
+                job.finished_at = time.time()
+                self._persist(job)
+                continue
+            job.status = "running"
+            self._started_at[job_id] = time.perf_counter()
+            self._running[job_id] = future
+            self._persist(job)
+            future.add_done_callback(
+                lambda f, job=job, executor=executor: self._on_done(job, f, executor)
+            )
+
+    def _on_done(self, job: TrainingJob, future: Future, executor: ProcessPoolExecutor):
+        with self._lock:
+            try:
+                self._running.pop(job.job_id, None)
+                started_at = self._started_at.pop(job.job_id, None)
+                job.finished_at = time.time()
+                if future.cancelled():
+                    job.status = "cancelled"
+                elif future.exception() is not None:
+                    job.status = "failed"
+                    job.error = str(future.exception())
+                    # Все задачи погибшего пула завершаются этой ошибкой, а пул
+                    # пересоздается один раз – пока он еще текущий
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        if executor is self._executor:
+                            self._reset_executor()
+                else:
+                    job.status = "succeeded"
+                    job.model_id, job.peak_memory_bytes = future.result()
+                    # Модель сохранена другим процессом, кэш этого процесса мог устареть
+                    self._model_manager.cache.invalidate(job.model_id)
+                self._persist(job)
+                if started_at is not None:
+                    TRAINING_SECONDS.observe(
+                        time.perf_counter() - started_at,
+                        model_type=job.model_type,
+                        status=job.status,
+                    )
+            finally:
+                self._active_by_model.pop(self._active_keys.pop(job.job_id, None), None)
+            self._dispatch()
+        LOGGER.info(f"Training job {job.job_id} finished with status {job.status}")
+
+    def get(self, job_id: str) -> TrainingJob:
+        """
+        Возвращает задачу по ID.
+        :param job_id: ID задачи.
+        :return: Задача.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self._job_store is not None:
+            # Задача могла быть создана другим процессом сервера
+            job = self._job_store.get(job_id)
+        if job is None:
+            raise KeyError(f"Training job {job_id} not found")
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Отменяет задачу, если она еще не начала выполняться.
+        :param job_id: ID задачи.
+        :return: True, если задача отменена.
+        """
+        job = self.get(job_id)
+        with self._lock:
+            if self._pending.pop(job_id, None) is not None:
+                self._active_by_model.pop(self._active_keys.pop(job_id, None), None)
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                self._persist(job)
+        return job.status == "cancelled"
+
+    def active_jobs(self) -> int:
+        """
+        Число незавершенных задач
+        """
+        with self._lock:
+            return len(self._pending) + len(self._running)
+
+    def _persist(self, job: TrainingJob):
+        if self._job_store is not None:
+            self._job_store.save(job)
+
+    def _prune_history(self):
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in ("succeeded", "failed", "cancelled")
+        ]
+        for job_id in finished[: max(0, len(self._jobs) - self._max_history)]:
+            del self._jobs[job_id]
+        if self._job_store is not None:
+            self._job_store.prune(self._max_history)
+
+    def shutdown(self):
+        """
+        Останавливает пул процессов, отменяя задачи в очереди
+        """
+        with self._lock:
+            for job_id in self._pending:
+                job = self._jobs[job_id]
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                self._persist(job)
+            self._pending.clear()
+            self._active_by_model.clear()
+            self._active_keys.clear()
+            self._reset_executor()
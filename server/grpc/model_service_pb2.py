@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13model_service.proto\x12\x08modelapi\"\x07\n\x05\x45mpty\"\x1f\n\rServiceStatus\x12\x0e\n\x06status\x18\x01 \x01(\t\"\x80\x01\n\tModelList\x12/\n\x06models\x18\x01 \x03(\x0b\x32\x1f.modelapi.ModelList.ModelsEntry\x1a\x42\n\x0bModelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\"\n\x05value\x18\x02 \x01(\x0b\x32\x13.modelapi.ModelSpec:\x02\x38\x01\"\x1f\n\tModelSpec\x12\x12\n\nparameters\x18\x01 \x03(\t\"s\n\nFeatureSet\x12\x34\n\x08\x66\x65\x61tures\x18\x01 \x03(\x0b\x32\".modelapi.FeatureSet.FeaturesEntry\x1a/\n\rFeaturesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"\xc4\x01\n\x0cTrainRequest\x12\x0c\n\x04type\x18\x01 \x01(\t\x12:\n\nparameters\x18\x02 \x03(\x0b\x32&.modelapi.TrainRequest.ParametersEntry\x12&\n\x08\x66\x65\x61tures\x18\x03 \x03(\x0b\x32\x14.modelapi.FeatureSet\x12\x0f\n\x07targets\x18\x04 \x03(\x01\x1a\x31\n\x0fParametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"C\n\rTrainResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\x08model_id\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\x0b\n\t_model_id\"J\n\x0ePredictRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12&\n\x08\x66\x65\x61tures\x18\x02 \x03(\x0b\x32\x14.modelapi.FeatureSet\"8\n\x0fPredictResponse\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\x13\n\x0bpredictions\x18\x02 \x03(\x01\"!\n\rDeleteRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\" \n\x0e\x44\x65leteResponse\x12\x0e\n\x06status\x18\x01 \x01(\t2\xc2\x02\n\x0cModelService\x12\x32\n\x06status\x12\x0f.modelapi.Empty\x1a\x17.modelapi.ServiceStatus\x12\x33\n\x0blist_models\x12\x0f.modelapi.Empty\x1a\x13.modelapi.ModelList\x12>\n\x0btrain_model\x12\x16.modelapi.TrainRequest\x1a\x17.modelapi.TrainResponse\x12\x46\n\x0fget_predictions\x12\x18.modelapi.PredictRequest\x1a\x19.modelapi.PredictResponse\x12\x41\n\x0c\x64\x65lete_model\x12\x17.modelapi.DeleteRequest\x1a\x18.modelapi.DeleteResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13model_service.proto\x12\x08modelapi\"\x07\n\x05\x45mpty\"\x1f\n\rServiceStatus\x12\x0e\n\x06status\x18\x01 \x01(\t\"\x80\x01\n\tModelList\x12/\n\x06models\x18\x01 \x03(\x0b\x32\x1f.modelapi.ModelList.ModelsEntry\x1a\x42\n\x0bModelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\"\n\x05value\x18\x02 \x01(\x0b\x32\x13.modelapi.ModelSpec:\x02\x38\x01\"\x1f\n\tModelSpec\x12\x12\n\nparameters\x18\x01 \x03(\t\"s\n\nFeatureSet\x12\x34\n\x08\x66\x65\x61tures\x18\x01 \x03(\x0b\x32\".modelapi.FeatureSet.FeaturesEntry\x1a/\n\rFeaturesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"1\n\x0ePackedFeatures\x12\x0f\n\x07\x63olumns\x18\x01 \x03(\t\x12\x0e\n\x06values\x18\x02 \x03(\x01\"\xf7\x01\n\x0cTrainRequest\x12\x0c\n\x04type\x18\x01 \x01(\t\x12:\n\nparameters\x18\x02 \x03(\x0b\x32&.modelapi.TrainRequest.ParametersEntry\x12&\n\x08\x66\x65\x61tures\x18\x03 \x03(\x0b\x32\x14.modelapi.FeatureSet\x12\x0f\n\x07targets\x18\x04 \x03(\x01\x12\x31\n\x0fpacked_features\x18\x05 \x01(\x0b\x32\x18.modelapi.PackedFeatures\x1a\x31\n\x0fParametersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"C\n\rTrainResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x15\n\x08model_id\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\x0b\n\t_model_id\"}\n\x0ePredictRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12&\n\x08\x66\x65\x61tures\x18\x02 \x03(\x0b\x32\x14.modelapi.FeatureSet\x12\x31\n\x0fpacked_features\x18\x03 \x01(\x0b\x32\x18.modelapi.PackedFeatures\"8\n\x0fPredictResponse\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\x13\n\x0bpredictions\x18\x02 \x03(\x01\"!\n\rDeleteRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\" \n\x0e\x44\x65leteResponse\x12\x0e\n\x06status\x18\x01 \x01(\t2\x91\x03\n\x0cModelService\x12\x32\n\x06status\x12\x0f.modelapi.Empty\x1a\x17.modelapi.ServiceStatus\x12\x33\n\x0blist_models\x12\x0f.modelapi.Empty\x1a\x13.modelapi.ModelList\x12>\n\x0btrain_model\x12\x16.modelapi.TrainRequest\x1a\x17.modelapi.TrainResponse\x12\x46\n\x0fget_predictions\x12\x18.modelapi.PredictRequest\x1a\x19.modelapi.PredictResponse\x12\x41\n\x0c\x64\x65lete_model\x12\x17.modelapi.DeleteRequest\x1a\x18.modelapi.DeleteResponse\x12M\n\x12stream_predictions\x12\x18.modelapi.PredictRequest\x1a\x19.modelapi.PredictResponse(\x01\x30\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -51,20 +51,22 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_FEATURESET']._serialized_end=354
   _globals['_FEATURESET_FEATURESENTRY']._serialized_start=307
   _globals['_FEATURESET_FEATURESENTRY']._serialized_end=354
-  _globals['_TRAINREQUEST']._serialized_start=357
-  _globals['_TRAINREQUEST']._serialized_end=553
-  _globals['_TRAINREQUEST_PARAMETERSENTRY']._serialized_start=504
-  _globals['_TRAINREQUEST_PARAMETERSENTRY']._serialized_end=553
-  _globals['_TRAINRESPONSE']._serialized_start=555
-  _globals['_TRAINRESPONSE']._serialized_end=622
-  _globals['_PREDICTREQUEST']._serialized_start=624
-  _globals['_PREDICTREQUEST']._serialized_end=698
-  _globals['_PREDICTRESPONSE']._serialized_start=700
-  _globals['_PREDICTRESPONSE']._serialized_end=756
-  _globals['_DELETEREQUEST']._serialized_start=758
-  _globals['_DELETEREQUEST']._serialized_end=791
-  _globals['_DELETERESPONSE']._serialized_start=793
-  _globals['_DELETERESPONSE']._serialized_end=825
-  _globals['_MODELSERVICE']._serialized_start=828
-  _globals['_MODELSERVICE']._serialized_end=1150
+  _globals['_PACKEDFEATURES']._serialized_start=356
+  _globals['_PACKEDFEATURES']._serialized_end=405
+  _globals['_TRAINREQUEST']._serialized_start=408
+  _globals['_TRAINREQUEST']._serialized_end=655
+  _globals['_TRAINREQUEST_PARAMETERSENTRY']._serialized_start=606
+  _globals['_TRAINREQUEST_PARAMETERSENTRY']._serialized_end=655
+  _globals['_TRAINRESPONSE']._serialized_start=657
+  _globals['_TRAINRESPONSE']._serialized_end=724
+  _globals['_PREDICTREQUEST']._serialized_start=726
+  _globals['_PREDICTREQUEST']._serialized_end=851
+  _globals['_PREDICTRESPONSE']._serialized_start=853
+  _globals['_PREDICTRESPONSE']._serialized_end=909
+  _globals['_DELETEREQUEST']._serialized_start=911
+  _globals['_DELETEREQUEST']._serialized_end=944
+  _globals['_DELETERESPONSE']._serialized_start=946
+  _globals['_DELETERESPONSE']._serialized_end=978
+  _globals['_MODELSERVICE']._serialized_start=981
+  _globals['_MODELSERVICE']._serialized_end=1382
 # @@protoc_insertion_point(module_scope)
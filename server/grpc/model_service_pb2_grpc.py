@@ -59,6 +59,11 @@ class ModelServiceStub(object):
                 request_serializer=model__service__pb2.DeleteRequest.SerializeToString,
                 response_deserializer=model__service__pb2.DeleteResponse.FromString,
                 _registered_method=True)
+        self.stream_predictions = channel.stream_stream(
+                '/modelapi.ModelService/stream_predictions',
+                request_serializer=model__service__pb2.PredictRequest.SerializeToString,
+                response_deserializer=model__service__pb2.PredictResponse.FromString,
+                _registered_method=True)
 
 
 class ModelServiceServicer(object):
@@ -94,6 +99,13 @@ class ModelServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def stream_predictions(self, request_iterator, context):
+        """model_id is required in the first chunk and may be omitted afterwards
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ModelServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -122,6 +134,11 @@ def add_ModelServiceServicer_to_server(servicer, server):
                     request_deserializer=model__service__pb2.DeleteRequest.FromString,
                     response_serializer=model__service__pb2.DeleteResponse.SerializeToString,
             ),
+            'stream_predictions': grpc.stream_stream_rpc_method_handler(
+                    servicer.stream_predictions,
+                    request_deserializer=model__service__pb2.PredictRequest.FromString,
+                    response_serializer=model__service__pb2.PredictResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'modelapi.ModelService', rpc_method_handlers)
@@ -267,3 +284,30 @@ class ModelService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def stream_predictions(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/modelapi.ModelService/stream_predictions',
+            model__service__pb2.PredictRequest.SerializeToString,
+            model__service__pb2.PredictResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
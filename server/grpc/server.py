@@ -4,13 +4,138 @@ gRPC server implementation
 
 # pylint: disable=no-member, broad-exception-caught
 
+import asyncio
+import os
+import queue
+import threading
+import time
 from concurrent import futures
+from dataclasses import dataclass
 
 import grpc
-
-from models.model_manager import MODEL_MANAGER
 import model_service_pb2
 import model_service_pb2_grpc
+import numpy as np
+import pandas as pd
+
+from models.metrics import (
+    METRICS,
+    REQUEST_SECONDS,
+    REQUESTS_TOTAL,
+    STAGE_SECONDS,
+    TRAINING_SECONDS,
+    start_metrics_server,
+)
+from models.micro_batching import batcher_from_env
+from models.model_aliases import MODEL_ALIASES, ModelInUseError
+from models.model_manager import MODEL_MANAGER
+
+# Сколько входящих чанков потока может ждать скоринга; ограничивает память
+STREAM_PREFETCH_CHUNKS = int(os.getenv("GRPC_STREAM_PREFETCH_CHUNKS", "2"))
+
+LIST_MODELS_RESPONSE = model_service_pb2.ModelList(
+    models={
+        "linear": model_service_pb2.ModelSpec(
+            parameters=["coef_", "intercept_"],
+        ),
+        "boosting": model_service_pb2.ModelSpec(
+            parameters=["learning_rate", "depth", "iterations"],
+        ),
+    }
+)
+
+_END_OF_STREAM = object()
+
+PREDICTION_BATCHER = batcher_from_env(MODEL_MANAGER)
+
+METRICS.add_collector(MODEL_MANAGER.collect_metrics)
+
+
+def decode_features(request) -> pd.DataFrame:
+    """
+    Build DataFrame from packed matrix or from per-row feature maps
+    """
+    if request.HasField("packed_features"):
+        packed = request.packed_features
+        columns = list(packed.columns)
+        if not columns or len(packed.values) % len(columns) != 0:
+            raise ValueError(
+                f"{len(packed.values)} values do not form rows of {len(columns)} columns"
+            )
+        values = np.fromiter(packed.values, dtype=np.float64, count=len(packed.values))
+        return pd.DataFrame(
+            values.reshape(-1, len(columns)), columns=columns, copy=False
+        )
+    return pd.DataFrame([dict(f.features) for f in request.features])
+
+
+def train(request) -> model_service_pb2.TrainResponse:
+    """
+    Train model, errors are reported in response status
+    """
+    start = time.perf_counter()
+    try:
+        model_id = MODEL_MANAGER.train_and_save_model(
+            model_type=request.type,
+            X_train=decode_features(request),
+            y_train=list(request.targets),
+            model_params=dict(request.parameters),
+        )
+        status = "succeeded"
+        return model_service_pb2.TrainResponse(status="success", model_id=model_id)
+    except Exception as exc:
+        status = "failed"
+        return model_service_pb2.TrainResponse(status=str(exc), model_id=None)
+    finally:
+        TRAINING_SECONDS.observe(
+            time.perf_counter() - start,
+            model_type=MODEL_MANAGER.model_type_of(request.type),
+            status=status,
+        )
+
+
+def encode_predictions(model_id: str, predictions) -> model_service_pb2.PredictResponse:
+    """
+    Build PredictResponse from array of predictions
+    """
+    return model_service_pb2.PredictResponse(
+        model_id=model_id,
+        predictions=np.asarray(predictions, dtype=np.float64).ravel().tolist(),
+    )
+
+
+def predict(model_id: str, request) -> model_service_pb2.PredictResponse:
+    """
+    Score request features, raises FileNotFoundError for unknown model
+    """
+    model_id = MODEL_ALIASES.resolve(model_id)
+    model_type = MODEL_MANAGER.model_type_of(model_id)
+    with STAGE_SECONDS.time(stage="decode", model_type=model_type):
+        features = decode_features(request)
+    if PREDICTION_BATCHER is not None:
+        predictions = PREDICTION_BATCHER.predict(model_id, features)
+    else:
+        predictions = MODEL_MANAGER.predict(model_id, features)
+    with STAGE_SECONDS.time(stage="encode", model_type=model_type):
+        return encode_predictions(model_id, predictions)
+
+
+def predict_status(exc: Exception) -> tuple[grpc.StatusCode, str]:
+    """
+    Map prediction error to gRPC status
+    """
+    if isinstance(exc, FileNotFoundError):
+        return grpc.StatusCode.NOT_FOUND, "Not found model ID"
+    return grpc.StatusCode.INVALID_ARGUMENT, str(exc)
+
+
+def delete_status(exc: Exception) -> grpc.StatusCode:
+    """
+    Map model deletion error to gRPC status
+    """
+    if isinstance(exc, ModelInUseError):
+        return grpc.StatusCode.FAILED_PRECONDITION
+    return grpc.StatusCode.NOT_FOUND
 
 
 class ModelService(model_service_pb2_grpc.ModelServiceServicer):
@@ -18,53 +143,455 @@ class ModelService(model_service_pb2_grpc.ModelServiceServicer):
     Service methods
     """
 
+    def status(self, request, context):
+        """
+        status method implementation
+        """
+        return model_service_pb2.ServiceStatus(status="online")
+
     def list_models(self, request, context):
         """
         list_models method implementation
         """
-        return model_service_pb2.ModelList(
-            models={
-                "linear": model_service_pb2.ModelSpec(
-                    parameters=["coef_", "intercept_"],
-                ),
-                "boosting": model_service_pb2.ModelSpec(
-                    parameters=["learning_rate", "depth", "iterations"],
-                ),
-            }
-        )
+        return LIST_MODELS_RESPONSE
 
     def train_model(self, request, context):
         """
         train_model method implementation
         """
-        model_type = request.type
-        params = request.parameters
-        features = [dict(f.features) for f in request.features]
-        targets = list(request.targets)
+        return train(request)
 
+    def get_predictions(self, request, context):
+        """
+        get_predictions method implementation
+        """
         try:
-            model_id = MODEL_MANAGER.train_and_save_model(
-                model_type=model_type,
-                X_train=features,
-                y_train=targets,
-                model_params=params,
+            return predict(request.model_id, request)
+        except Exception as exc:
+            context.abort(*predict_status(exc))
+
+    def stream_predictions(self, request_iterator, context):
+        """
+        stream_predictions method implementation
+
+        Incoming chunks are read by a separate thread into a bounded queue, so
+        the next chunk is received while the current one is scored. When the
+        queue is full the reader stops pulling and gRPC flow control pushes
+        back on the client.
+        """
+        chunks = queue.Queue(maxsize=STREAM_PREFETCH_CHUNKS)
+
+        def put(item):
+            while context.is_active():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read():
+            try:
+                for chunk in request_iterator:
+                    if not put(chunk):
+                        return
+            except Exception as exc:
+                put(exc)
+            put(_END_OF_STREAM)
+
+        def get():
+            # Отмена клиентом завершает поток даже без _END_OF_STREAM: читатель
+            # при неактивном контексте выходит, ничего не кладя в очередь
+            while context.is_active():
+                try:
+                    return chunks.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _END_OF_STREAM
+
+        threading.Thread(target=read, daemon=True).start()
+
+        model_id = None
+        while (chunk := get()) is not _END_OF_STREAM:
+            if isinstance(chunk, Exception):
+                context.abort(grpc.StatusCode.CANCELLED, str(chunk))
+            model_id = chunk.model_id or model_id
+            if model_id is None:
+                context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    "First chunk must contain model_id",
+                )
+            try:
+                response = predict(model_id, chunk)
+            except Exception as exc:
+                context.abort(*predict_status(exc))
+            yield response
+
+    def delete_model(self, request, context):
+        """
+        delete_model method implementation
+        """
+        try:
+            MODEL_ALIASES.delete_model(request.model_id)
+            return model_service_pb2.DeleteResponse(status="success")
+        except Exception as exc:
+            context.set_code(delete_status(exc))
+            return model_service_pb2.DeleteResponse(status=str(exc))
+
+
+class AsyncModelService(model_service_pb2_grpc.ModelServiceServicer):
+    """
+    Service methods for grpc.aio server
+
+    Handlers run on the event loop; blocking model work is offloaded to
+    separate inference and training executors.
+    """
+
+    def __init__(
+        self,
+        inference_executor: futures.Executor,
+        training_executor: futures.Executor,
+    ):
+        self._inference_executor = inference_executor
+        self._training_executor = training_executor
+
+    async def status(self, request, context):
+        """
+        status method implementation
+        """
+        return model_service_pb2.ServiceStatus(status="online")
+
+    async def list_models(self, request, context):
+        """
+        list_models method implementation
+        """
+        return LIST_MODELS_RESPONSE
+
+    async def train_model(self, request, context):
+        """
+        train_model method implementation
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._training_executor, train, request)
+
+    async def get_predictions(self, request, context):
+        """
+        get_predictions method implementation
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            if PREDICTION_BATCHER is not None:
+                # Ожидание батча не занимает поток исполнителя
+                model_id = MODEL_ALIASES.resolve(request.model_id)
+                model_type = MODEL_MANAGER.model_type_of(model_id)
+                with STAGE_SECONDS.time(stage="decode", model_type=model_type):
+                    features = decode_features(request)
+                predictions = await asyncio.wrap_future(
+                    PREDICTION_BATCHER.submit(model_id, features)
+                )
+                with STAGE_SECONDS.time(stage="encode", model_type=model_type):
+                    return encode_predictions(model_id, predictions)
+            return await loop.run_in_executor(
+                self._inference_executor, predict, request.model_id, request
             )
-            return model_service_pb2.TrainResponse(status="success", model_id=model_id)
         except Exception as exc:
-            return model_service_pb2.TrainResponse(status=str(exc), model_id=None)
+            await context.abort(*predict_status(exc))
+
+    async def stream_predictions(self, request_iterator, context):
+        """
+        stream_predictions method implementation
+
+        A reader task prefetches incoming chunks into a bounded queue while
+        the current chunk is scored in the inference executor.
+        """
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue(maxsize=STREAM_PREFETCH_CHUNKS)
+
+        async def read():
+            try:
+                async for chunk in request_iterator:
+                    await chunks.put(chunk)
+            except Exception as exc:
+                await chunks.put(exc)
+            await chunks.put(_END_OF_STREAM)
+
+        reader = asyncio.create_task(read())
+        try:
+            model_id = None
+            while (chunk := await chunks.get()) is not _END_OF_STREAM:
+                if isinstance(chunk, Exception):
+                    await context.abort(grpc.StatusCode.CANCELLED, str(chunk))
+                model_id = chunk.model_id or model_id
+                if model_id is None:
+                    await context.abort(
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        "First chunk must contain model_id",
+                    )
+                try:
+                    response = await loop.run_in_executor(
+                        self._inference_executor, predict, model_id, chunk
+                    )
+                except Exception as exc:
+                    await context.abort(*predict_status(exc))
+                yield response
+        finally:
+            reader.cancel()
+
+    async def delete_model(self, request, context):
+        """
+        delete_model method implementation
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                self._inference_executor, MODEL_ALIASES.delete_model, request.model_id
+            )
+            return model_service_pb2.DeleteResponse(status="success")
+        except Exception as exc:
+            context.set_code(delete_status(exc))
+            return model_service_pb2.DeleteResponse(status=str(exc))
+
+
+def _request_model_type(request) -> str:
+    """
+    Model type label for request with model_id or model type field
+    """
+    name = getattr(request, "model_id", None) or getattr(request, "type", None)
+    return MODEL_MANAGER.model_type_of(name) if name else "none"
+
+
+def _observe_rpc(method: str, model_type: str, code, failed: bool, start: float):
+    """
+    Record RPC latency and status code
+    """
+    if code is None:
+        code = grpc.StatusCode.UNKNOWN if failed else grpc.StatusCode.OK
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        server="grpc",
+        endpoint=method,
+        model_type=model_type,
+    )
+    REQUESTS_TOTAL.inc(server="grpc", endpoint=method, status=code.name)
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """
+    Records latency and status of unary and streaming RPCs
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+
+        if handler.unary_unary is not None:
+            behavior = handler.unary_unary
 
+            def unary_unary(request, context):
+                start, failed = time.perf_counter(), True
+                try:
+                    response = behavior(request, context)
+                    failed = False
+                    return response
+                finally:
+                    _observe_rpc(
+                        method,
+                        _request_model_type(request),
+                        context.code(),
+                        failed,
+                        start,
+                    )
 
-def serve():
+            return handler._replace(unary_unary=unary_unary)
+
+        if handler.stream_stream is not None:
+            behavior = handler.stream_stream
+
+            def stream_stream(request_iterator, context):
+                start, failed = time.perf_counter(), True
+                try:
+                    yield from behavior(request_iterator, context)
+                    failed = False
+                finally:
+                    _observe_rpc(method, "none", context.code(), failed, start)
+
+            return handler._replace(stream_stream=stream_stream)
+        return handler
+
+
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """
+    Records latency and status of RPCs served by grpc.aio
+    """
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+
+        if handler.unary_unary is not None:
+            behavior = handler.unary_unary
+
+            async def unary_unary(request, context):
+                start, failed = time.perf_counter(), True
+                try:
+                    response = await behavior(request, context)
+                    failed = False
+                    return response
+                finally:
+                    _observe_rpc(
+                        method,
+                        _request_model_type(request),
+                        context.code(),
+                        failed,
+                        start,
+                    )
+
+            return handler._replace(unary_unary=unary_unary)
+
+        if handler.stream_stream is not None:
+            behavior = handler.stream_stream
+
+            async def stream_stream(request_iterator, context):
+                start, failed = time.perf_counter(), True
+                try:
+                    async for response in behavior(request_iterator, context):
+                        yield response
+                    failed = False
+                finally:
+                    _observe_rpc(method, "none", context.code(), failed, start)
+
+            return handler._replace(stream_stream=stream_stream)
+        return handler
+
+
+@dataclass
+class ServerConfig:
+    """
+    gRPC server settings
+    """
+
+    port: int = 8080
+    mode: str = "aio"
+    inference_workers: int = 10
+    training_workers: int = 2
+    max_concurrent_rpcs: int | None = None
+    max_message_bytes: int = 64 * 1024**2
+    gzip: bool = False
+    keepalive_time_ms: int = 30_000
+    keepalive_timeout_ms: int = 10_000
+    metrics_port: int = 9090
+
+    @classmethod
+    def from_env(cls) -> "ServerConfig":
+        """
+        Read settings from GRPC_* environment variables
+        """
+        max_concurrent_rpcs = os.getenv("GRPC_MAX_CONCURRENT_RPCS")
+        return cls(
+            port=int(os.getenv("GRPC_PORT", "8080")),
+            mode=os.getenv("GRPC_SERVER_MODE", "aio"),
+            inference_workers=int(os.getenv("GRPC_INFERENCE_WORKERS", "10")),
+            training_workers=int(os.getenv("GRPC_TRAINING_WORKERS", "2")),
+            max_concurrent_rpcs=(
+                int(max_concurrent_rpcs) if max_concurrent_rpcs else None
+            ),
+            max_message_bytes=int(
+                os.getenv("GRPC_MAX_MESSAGE_BYTES", str(64 * 1024**2))
+            ),
+            gzip=os.getenv("GRPC_GZIP", "0") == "1",
+            keepalive_time_ms=int(os.getenv("GRPC_KEEPALIVE_TIME_MS", "30000")),
+            keepalive_timeout_ms=int(os.getenv("GRPC_KEEPALIVE_TIMEOUT_MS", "10000")),
+            metrics_port=int(os.getenv("GRPC_METRICS_PORT", "9090")),
+        )
+
+    @property
+    def options(self) -> list[tuple[str, int]]:
+        """
+        Channel arguments for grpc server
+        """
+        return [
+            ("grpc.max_send_message_length", self.max_message_bytes),
+            ("grpc.max_receive_message_length", self.max_message_bytes),
+            ("grpc.keepalive_time_ms", self.keepalive_time_ms),
+            ("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms),
+            ("grpc.keepalive_permit_without_calls", 1),
+        ]
+
+    @property
+    def compression(self) -> grpc.Compression:
+        """
+        Default response compression
+        """
+        return grpc.Compression.Gzip if self.gzip else grpc.Compression.NoCompression
+
+
+def serve(config: ServerConfig = None):
     """
     Run gRPC server
     """
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    config = config or ServerConfig(mode="sync")
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=config.inference_workers),
+        options=config.options,
+        maximum_concurrent_rpcs=config.max_concurrent_rpcs,
+        compression=config.compression,
+        interceptors=[MetricsInterceptor()],
+    )
     model_service_pb2_grpc.add_ModelServiceServicer_to_server(ModelService(), server)
-    server.add_insecure_port("[::]:8080")
+    if config.metrics_port:
+        start_metrics_server(METRICS, config.metrics_port)
+    MODEL_ALIASES.start()
+    server.add_insecure_port(f"[::]:{config.port}")
     server.start()
     print("gRPC server started")
-    server.wait_for_termination()
+    try:
+        server.wait_for_termination()
+    finally:
+        MODEL_ALIASES.close()
+
+
+async def serve_async(config: ServerConfig = None):
+    """
+    Run grpc.aio server
+    """
+    config = config or ServerConfig()
+    inference_executor = futures.ThreadPoolExecutor(
+        max_workers=config.inference_workers, thread_name_prefix="inference"
+    )
+    training_executor = futures.ThreadPoolExecutor(
+        max_workers=config.training_workers, thread_name_prefix="training"
+    )
+    server = grpc.aio.server(
+        options=config.options,
+        maximum_concurrent_rpcs=config.max_concurrent_rpcs,
+        compression=config.compression,
+        interceptors=[AsyncMetricsInterceptor()],
+    )
+    if config.metrics_port:
+        start_metrics_server(METRICS, config.metrics_port)
+    model_service_pb2_grpc.add_ModelServiceServicer_to_server(
+        AsyncModelService(inference_executor, training_executor), server
+    )
+    await asyncio.to_thread(MODEL_ALIASES.start)
+    server.add_insecure_port(f"[::]:{config.port}")
+    await server.start()
+    print("gRPC aio server started")
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(grace=5)
+        MODEL_ALIASES.close()
+        inference_executor.shutdown(wait=False, cancel_futures=True)
+        training_executor.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
-    serve()
+    server_config = ServerConfig.from_env()
+    if server_config.mode == "aio":
+        asyncio.run(serve_async(server_config))
+    else:
+        serve(server_config)
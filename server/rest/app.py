@@ -2,40 +2,309 @@
 REST server implementation
 """
 
+import asyncio
 import logging
-from typing import Any
-
-from fastapi import FastAPI, HTTPException
-from pandas import DataFrame
-from pydantic import BaseModel
-
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from models.batch_scoring import ScoringJobManager, ScoringJobStore
+from models.dataset_registry import DATASET_REGISTRY
+from models.hyperparameter_search import (
+    HyperparameterSearchManager,
+    SearchSpec,
+    SearchStore,
+)
+from models.metrics import (
+    CONTENT_TYPE,
+    METRICS,
+    REQUEST_SECONDS,
+    REQUESTS_TOTAL,
+    STAGE_SECONDS,
+)
+from models.micro_batching import batcher_from_env
+from models.model_aliases import MODEL_ALIASES, ModelInUseError
 from models.model_manager import MODEL_MANAGER
+from models.training_jobs import JobQueueFullError, JobStore, TrainingJobManager
+from server.rest.executors import ExecutorOverloadedError, executor_from_env
+from server.rest.payloads import (
+    AliasRequest,
+    PayloadError,
+    PredictPayload,
+    ScoringJobRequest,
+    SearchRequest,
+    TrainPayload,
+    UnsupportedPayloadError,
+    UpdateRequest,
+    parse_dataset_payload,
+    parse_predict_payload,
+    parse_train_payload,
+)
+from server.rest.responses import (
+    JSON_ARRAY_TAIL,
+    NDJSON_CONTENT_TYPE,
+    STREAM_FORMATS,
+    json_array_head,
+    json_array_items,
+    ndjson_error,
+    ndjson_line,
+    predictions_body,
+)
 
 LOGGER = logging.getLogger(__name__)
 
-app = FastAPI()
+
+def _per_rest_worker(total: int) -> int:
+    """
+    Доля общего лимита на один процесс uvicorn: каждый процесс сервера создает
+    свой пул обучения, поэтому TRAIN_* задают лимиты на весь сервер
+    """
+    return max(1, total // max(1, int(os.getenv("REST_WORKERS", "1"))))
+
+
+TRAINING_JOBS = TrainingJobManager(
+    MODEL_MANAGER,
+    max_workers=_per_rest_worker(int(os.getenv("TRAIN_WORKERS", "2"))),
+    max_queued=_per_rest_worker(int(os.getenv("TRAIN_QUEUE_SIZE", "16"))),
+    job_store=JobStore(MODEL_MANAGER.storage_dir / "jobs.sqlite3"),
+    input_dirs=os.getenv("DATASET_ALLOWED_DIRS", "./datasets").split(","),
+)
+
+SCORING_JOBS = ScoringJobManager(
+    MODEL_MANAGER,
+    ScoringJobStore(MODEL_MANAGER.storage_dir / "scoring_jobs.sqlite3"),
+    max_jobs=int(os.getenv("SCORING_JOBS", "1")),
+    workers=int(os.getenv("SCORING_WORKERS", "2")),
+    input_dirs=os.getenv("DATASET_ALLOWED_DIRS", "./datasets").split(","),
+    output_dir=os.getenv("SCORING_OUTPUT_DIR", "./scoring_output"),
+)
+
+SEARCHES = HyperparameterSearchManager(
+    MODEL_MANAGER,
+    SearchStore(MODEL_MANAGER.storage_dir / "searches.sqlite3"),
+    max_workers=int(os.getenv("SEARCH_MAX_WORKERS", str(os.cpu_count() or 1))),
+    pool_cache_bytes=int(os.getenv("SEARCH_POOL_CACHE_BYTES", str(512 * 1024**2))),
+)
+
+PREDICTION_BATCHER = batcher_from_env(MODEL_MANAGER)
+STREAM_SLICE_ROWS = int(os.getenv("PREDICT_STREAM_ROWS", "10000"))
+
+# Диск и SQLite обслуживает I/O-пул, декодирование запросов и модели – пул инференса,
+# обучение идет в пуле процессов TRAINING_JOBS
+IO_EXECUTOR = executor_from_env("io", default_workers=8, default_queued=64)
+INFERENCE_EXECUTOR = executor_from_env(
+    "inference", default_workers=os.cpu_count() or 4, default_queued=64
+)
+
+
+def _preload_model_names() -> list[str]:
+    """
+    Models to load before serving: PRELOAD_MODELS list and the
+    PRELOAD_HOT_MODELS most recently used models of previous workers
+    """
+    explicit = [name for name in os.getenv("PRELOAD_MODELS", "").split(",") if name]
+    hot = MODEL_MANAGER.hot_models(int(os.getenv("PRELOAD_HOT_MODELS", "8")))
+    return list(dict.fromkeys(explicit + hot))
 
 
-class ModelSpec(BaseModel):
-    """ModelSpec model"""
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """
+    Startup and shutdown of background resources.
+    Worker starts accepting requests only after preloading models
+    """
+    preloaded = await asyncio.to_thread(MODEL_MANAGER.preload, _preload_model_names())
+    LOGGER.info(f"Preloaded {len(preloaded)} models")
+    await asyncio.to_thread(MODEL_ALIASES.start)
+    resumed = await asyncio.to_thread(SCORING_JOBS.resume_interrupted)
+    if resumed:
+        LOGGER.info(f"Resumed scoring jobs {resumed}")
+    yield
+    # К этому моменту uvicorn дождался завершения запросов в обработке
+    MODEL_MANAGER.record_hot_models()
+    MODEL_ALIASES.close()
+    TRAINING_JOBS.shutdown()
+    # Задачи скоринга останавливаются после текущего чанка и продолжатся при следующем запуске
+    await asyncio.to_thread(SCORING_JOBS.shutdown)
+    if PREDICTION_BATCHER is not None:
+        PREDICTION_BATCHER.close()
+    INFERENCE_EXECUTOR.shutdown()
+    IO_EXECUTOR.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+METRICS.add_collector(MODEL_MANAGER.collect_metrics)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Record latency and status of every request
+    """
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        route = request.scope.get("route")
+        endpoint = (
+            f"{request.method} {route.path if route is not None else 'unmatched'}"
+        )
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            server="rest",
+            endpoint=endpoint,
+            model_type=getattr(request.state, "model_type", "none"),
+        )
+        REQUESTS_TOTAL.inc(server="rest", endpoint=endpoint, status=status)
 
-    type: str
-    parameters: dict[str, Any]
 
+@app.exception_handler(ExecutorOverloadedError)
+async def overloaded_handler(_: Request, exc: ExecutorOverloadedError):
+    """
+    Respond 503 when worker pool queue is full
+    """
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"}
+    )
 
-class TrainRequest(BaseModel):
-    """TrainRequest model"""
 
-    model_spec: ModelSpec
-    features: list[dict[str, float]]
-    targets: list[float]
+def _payload_error(exc: PayloadError) -> HTTPException:
+    """
+    Convert payload decoding error to HTTP error
+    """
+    status_code = 415 if isinstance(exc, UnsupportedPayloadError) else 422
+    return HTTPException(status_code=status_code, detail=str(exc))
+
+
+def _decode_train(content_type: str | None, body: bytes, query) -> TrainPayload:
+    start = time.perf_counter()
+    payload = parse_train_payload(content_type, body, query)
+    if payload.dataset_id is not None:
+        frame = DATASET_REGISTRY.load(payload.dataset_id)
+        if payload.target_column not in frame.columns:
+            raise PayloadError(f"Target column '{payload.target_column}' not found")
+        payload.features = frame.drop(columns=payload.target_column)
+        payload.targets = frame[payload.target_column].to_numpy()
+    STAGE_SECONDS.observe(
+        time.perf_counter() - start,
+        stage="decode",
+        model_type=MODEL_MANAGER.model_type_of(payload.model_type),
+    )
+    return payload
+
+
+def _decode_update(request: UpdateRequest) -> tuple[pd.DataFrame, np.ndarray]:
+    if request.dataset_id is not None:
+        frame = DATASET_REGISTRY.load(request.dataset_id)
+        if request.target_column not in frame.columns:
+            raise PayloadError(f"Target column '{request.target_column}' not found")
+        return (
+            frame.drop(columns=request.target_column),
+            frame[request.target_column].to_numpy(),
+        )
+    if request.features is None or request.targets is None:
+        raise PayloadError(
+            "Either 'dataset_id' or 'features' and 'targets' are required"
+        )
+    if len(request.targets) != len(request.features):
+        raise PayloadError("Number of targets does not match number of rows")
+    return pd.DataFrame(request.features), np.asarray(request.targets, dtype=np.float64)
+
+
+def _decode_predict(content_type: str | None, body: bytes, query) -> PredictPayload:
+    start = time.perf_counter()
+    payload = parse_predict_payload(content_type, body, query)
+    # Алиас (prod, canary, ...) заменяется моделью, загруженной в этом процессе
+    payload.model_id = MODEL_ALIASES.resolve(payload.model_id)
+    if payload.dataset_id is not None:
+        frame = DATASET_REGISTRY.load(payload.dataset_id)
+        payload.features = frame.drop(columns=payload.drop_columns, errors="ignore")
+    STAGE_SECONDS.observe(
+        time.perf_counter() - start,
+        stage="decode",
+        model_type=MODEL_MANAGER.model_type_of(payload.model_id),
+    )
+    return payload
+
+
+def _encode_predictions(model_id: str, predictions, model_type: str) -> Response:
+    with STAGE_SECONDS.time(stage="encode", model_type=model_type):
+        return Response(
+            predictions_body(model_id, predictions), media_type="application/json"
+        )
 
 
-class PredictRequest(BaseModel):
-    """PredictRequest model"""
+def _stream_format(request: Request) -> str | None:
+    """
+    Streaming mode requested with ?stream=ndjson|json or Accept: application/x-ndjson
+    """
+    stream_format = request.query_params.get("stream")
+    if stream_format is None and NDJSON_CONTENT_TYPE in request.headers.get(
+        "accept", ""
+    ):
+        stream_format = "ndjson"
+    if stream_format is not None and stream_format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=422, detail=f"Unsupported stream format '{stream_format}'"
+        )
+    return stream_format
 
-    model_id: str
-    features: list[dict[str, float]]
+
+def _score_slice(
+    model_id: str, features, offset: int, stream_format: str, model_type: str
+) -> bytes:
+    """
+    Score one slice of streamed request and encode it
+    """
+    predictions = MODEL_MANAGER.predict(model_id, features)
+    with STAGE_SECONDS.time(stage="encode", model_type=model_type):
+        if stream_format == "ndjson":
+            return ndjson_line(offset, predictions)
+        return json_array_items(predictions, first=offset == 0)
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+async def _prediction_stream(
+    model_id: str,
+    features,
+    first_slice: bytes,
+    slice_rows: int,
+    stream_format: str,
+    model_type: str,
+):
+    if stream_format == "json":
+        yield json_array_head(model_id)
+    yield first_slice
+    for offset in range(slice_rows, len(features), slice_rows):
+        try:
+            yield await INFERENCE_EXECUTOR.run(
+                _score_slice,
+                model_id,
+                features.iloc[offset : offset + slice_rows],
+                offset,
+                stream_format,
+                model_type,
+            )
+        except Exception as exc:
+            # Заголовки уже отправлены: в NDJSON ошибка передается строкой потока,
+            # потоковый JSON обрывается и не будет валидным документом
+            LOGGER.exception(f"Streaming predictions for {model_id} failed")
+            if stream_format == "ndjson":
+                yield ndjson_error(offset, str(exc))
+                return
+            raise
+    if stream_format == "json":
+        yield JSON_ARRAY_TAIL
 
 
 @app.get("/status")
@@ -59,59 +328,584 @@ async def list_models():
 
 
 @app.get("/trained_models")
-async def list_trained_models():
+async def list_trained_models(
+    model_type: str | None = None,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+):
     """
     list_trained_models method implementation
     """
     LOGGER.info("list_trained_models called")
-    return {"trained_models": MODEL_MANAGER.list_models()}
+    return await IO_EXECUTOR.run(_list_trained_models, model_type, offset, limit)
+
+
+def _list_trained_models(
+    model_type: str | None, offset: int, limit: int | None
+) -> dict:
+    return {
+        "trained_models": MODEL_MANAGER.list_models(model_type, offset, limit),
+        "total": MODEL_MANAGER.registry.count(model_type),
+    }
+
+
+@app.get("/trained_models/{model_id}")
+async def get_trained_model(model_id: str):
+    """
+    get_trained_model method implementation
+    """
+    LOGGER.info("get_trained_model called")
+
+    try:
+        return asdict(await IO_EXECUTOR.run(MODEL_MANAGER.get_model_info, model_id))
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@app.post("/trained_models/rebuild")
+async def rebuild_trained_models():
+    """
+    rebuild_trained_models method implementation
+    """
+    LOGGER.info("rebuild_trained_models called")
+    return {
+        "status": "success",
+        "total": await IO_EXECUTOR.run(MODEL_MANAGER.rebuild_registry),
+    }
 
 
 @app.post("/train")
-async def train_model(train_request: TrainRequest):
+async def train_model(request: Request):
     """
     train_model method implementation
     """
     LOGGER.info("train_model called")
 
-    model_type = train_request.model_spec.type
-    params = train_request.model_spec.parameters
-    features = DataFrame(train_request.features)
-    targets = train_request.targets
+    try:
+        payload = await INFERENCE_EXECUTOR.run(
+            _decode_train,
+            request.headers.get("content-type"),
+            await request.body(),
+            request.query_params,
+        )
+    except PayloadError as exc:
+        raise _payload_error(exc) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found dataset ID") from exc
+    request.state.model_type = MODEL_MANAGER.model_type_of(payload.model_type)
+
+    if payload.input_path is not None:
+        try:
+            job = await IO_EXECUTOR.run(
+                TRAINING_JOBS.submit_file,
+                payload.model_type,
+                payload.input_path,
+                payload.target_column,
+                payload.parameters,
+                payload.chunk_rows,
+            )
+        except JobQueueFullError as exc:
+            raise HTTPException(status_code=429, detail=str(exc)) from exc
+        except PermissionError as exc:
+            raise HTTPException(status_code=403, detail=str(exc)) from exc
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        except ExecutorOverloadedError:
+            raise
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return {"status": "accepted", "job_id": job.job_id}
 
     try:
-        model_id = MODEL_MANAGER.train_and_save_model(
-            model_type=model_type,
-            X_train=features,
-            y_train=targets,
-            model_params=params,
+        # Отпечаток данных считается до постановки в очередь, это CPU-работа
+        job = await INFERENCE_EXECUTOR.run(
+            TRAINING_JOBS.submit,
+            payload.model_type,
+            payload.features,
+            payload.targets,
+            payload.parameters,
         )
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    except ExecutorOverloadedError:
+        raise
     except Exception as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return {"status": "success", "model_id": model_id}
+    return {"status": "accepted", "job_id": job.job_id}
+
+
+@app.post("/trained_models/{model_id}/update")
+async def update_trained_model(model_id: str, request: UpdateRequest):
+    """
+    update_trained_model method implementation
+    """
+    LOGGER.info("update_trained_model called")
+
+    try:
+        X_new, y_new = await INFERENCE_EXECUTOR.run(_decode_update, request)
+    except PayloadError as exc:
+        raise _payload_error(exc) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found dataset ID") from exc
+
+    try:
+        job = await INFERENCE_EXECUTOR.run(
+            TRAINING_JOBS.submit_update,
+            MODEL_ALIASES.resolve(model_id),
+            X_new,
+            y_new,
+            request.parameters,
+        )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found model ID") from exc
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    except ExecutorOverloadedError:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return {"status": "accepted", "job_id": job.job_id}
+
+
+@app.put("/aliases/{alias}")
+async def set_alias(alias: str, request: AliasRequest):
+    """
+    set_alias method implementation
+    """
+    LOGGER.info("set_alias called")
+
+    try:
+        # Модель загружается до переключения, запросы по алиасу не ждут холодной загрузки
+        record = await IO_EXECUTOR.run(MODEL_ALIASES.set, alias, request.model_id)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found model ID") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return asdict(record)
+
+
+@app.get("/aliases")
+async def list_aliases():
+    """
+    list_aliases method implementation
+    """
+    LOGGER.info("list_aliases called")
+    records = await IO_EXECUTOR.run(MODEL_ALIASES.store.list_aliases)
+    return {"aliases": [asdict(record) for record in records]}
+
+
+@app.get("/aliases/{alias}")
+async def get_alias(alias: str):
+    """
+    get_alias method implementation
+    """
+    LOGGER.info("get_alias called")
+
+    try:
+        record = await IO_EXECUTOR.run(MODEL_ALIASES.get, alias)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found alias") from exc
+    # serving_model_id отличается от model_id, пока процесс загружает новую модель
+    return {**asdict(record), "serving_model_id": MODEL_ALIASES.resolve(alias)}
+
+
+@app.delete("/aliases/{alias}")
+async def delete_alias(alias: str):
+    """
+    delete_alias method implementation
+    """
+    LOGGER.info("delete_alias called")
+
+    try:
+        await IO_EXECUTOR.run(MODEL_ALIASES.delete, alias)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found alias") from exc
+    return {"status": "success", "detail": "Alias deleted"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    get_job method implementation
+    """
+    LOGGER.info("get_job called")
+
+    try:
+        return asdict(await IO_EXECUTOR.run(TRAINING_JOBS.get, job_id))
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found job ID") from exc
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    get_job_result method implementation
+    """
+    LOGGER.info("get_job_result called")
+
+    try:
+        job = await IO_EXECUTOR.run(TRAINING_JOBS.get, job_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found job ID") from exc
+
+    if job.status == "failed":
+        raise HTTPException(status_code=400, detail=job.error)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return {"status": "success", "model_id": job.model_id}
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    cancel_job method implementation
+    """
+    LOGGER.info("cancel_job called")
+
+    try:
+        cancelled = await IO_EXECUTOR.run(TRAINING_JOBS.cancel, job_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found job ID") from exc
+
+    if not cancelled:
+        raise HTTPException(status_code=409, detail="Job can not be cancelled")
+    return {"status": "success", "detail": "Job cancelled"}
+
+
+@app.post("/search")
+async def submit_search(request: SearchRequest):
+    """
+    submit_search method implementation
+    """
+    LOGGER.info("submit_search called")
+    spec = SearchSpec(**request.model_dump(exclude={"dataset_id", "target_column"}))
+
+    try:
+        frame = await IO_EXECUTOR.run(DATASET_REGISTRY.load, request.dataset_id)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found dataset ID") from exc
+    if request.target_column not in frame.columns:
+        raise HTTPException(
+            status_code=422, detail=f"Target column '{request.target_column}' not found"
+        )
+
+    try:
+        job = await INFERENCE_EXECUTOR.run(
+            SEARCHES.submit,
+            spec,
+            frame.drop(columns=request.target_column),
+            frame[request.target_column].to_numpy(),
+        )
+    except (ValueError, TypeError, KeyError) as exc:
+        # Ошибки проверки настроек поиска и пространства гиперпараметров
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return {"status": "accepted", "search_id": job.search_id}
+
+
+@app.get("/search/{search_id}")
+async def get_search(search_id: str):
+    """
+    get_search method implementation
+    """
+    LOGGER.info("get_search called")
+
+    try:
+        job = await IO_EXECUTOR.run(SEARCHES.get, search_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found search ID") from exc
+    state = asdict(job)
+    del state["trials"]
+    return {**state, "trials": len(job.trials), "leaderboard": job.leaderboard()}
+
+
+@app.delete("/search/{search_id}")
+async def cancel_search(search_id: str):
+    """
+    cancel_search method implementation
+    """
+    LOGGER.info("cancel_search called")
+
+    try:
+        cancelled = await IO_EXECUTOR.run(SEARCHES.cancel, search_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found search ID") from exc
+
+    if not cancelled:
+        raise HTTPException(
+            status_code=409, detail="Search is not running in this worker"
+        )
+    return {"status": "success", "detail": "Search cancelled"}
+
+
+@app.post("/scoring_jobs")
+async def submit_scoring_job(request: ScoringJobRequest):
+    """
+    submit_scoring_job method implementation
+    """
+    LOGGER.info("submit_scoring_job called")
+
+    try:
+        job = await IO_EXECUTOR.run(
+            SCORING_JOBS.submit,
+            MODEL_ALIASES.resolve(request.model_id),
+            request.input_path,
+            request.output_path,
+            request.chunk_rows,
+            request.feature_columns,
+            request.passthrough_columns,
+        )
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return {"status": "accepted", "job_id": job.job_id}
+
+
+@app.get("/scoring_jobs")
+async def list_scoring_jobs():
+    """
+    list_scoring_jobs method implementation
+    """
+    LOGGER.info("list_scoring_jobs called")
+    jobs = await IO_EXECUTOR.run(SCORING_JOBS.list_jobs)
+    return {"scoring_jobs": [asdict(job) for job in jobs]}
+
+
+@app.get("/scoring_jobs/{job_id}")
+async def get_scoring_job(job_id: str):
+    """
+    get_scoring_job method implementation
+    """
+    LOGGER.info("get_scoring_job called")
+
+    try:
+        return asdict(await IO_EXECUTOR.run(SCORING_JOBS.get, job_id))
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found job ID") from exc
+
+
+@app.post("/scoring_jobs/{job_id}/resume")
+async def resume_scoring_job(job_id: str):
+    """
+    resume_scoring_job method implementation
+    """
+    LOGGER.info("resume_scoring_job called")
+
+    try:
+        job = await IO_EXECUTOR.run(SCORING_JOBS.resume, job_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found job ID") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return {"status": "accepted", "job_id": job.job_id, "rows_done": job.rows_done}
+
+
+@app.delete("/scoring_jobs/{job_id}")
+async def cancel_scoring_job(job_id: str):
+    """
+    cancel_scoring_job method implementation
+    """
+    LOGGER.info("cancel_scoring_job called")
+
+    try:
+        cancelled = await IO_EXECUTOR.run(SCORING_JOBS.cancel, job_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Not found job ID") from exc
+
+    if not cancelled:
+        raise HTTPException(status_code=409, detail="Job is not running in this worker")
+    return {"status": "success", "detail": "Job will stop after current chunk"}
 
 
 @app.post("/predict")
-async def predict(request: PredictRequest):
+async def predict(request: Request):
     """
     predict method implementation
     """
     LOGGER.info("predict called")
+    stream_format = _stream_format(request)
 
-    model_id = request.model_id
-    features = DataFrame(request.features)
+    try:
+        payload = await INFERENCE_EXECUTOR.run(
+            _decode_predict,
+            request.headers.get("content-type"),
+            await request.body(),
+            request.query_params,
+        )
+    except PayloadError as exc:
+        raise _payload_error(exc) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found dataset ID") from exc
 
-    if model_id not in MODEL_MANAGER.list_models():
-        raise HTTPException(status_code=404, detail="Not found model ID")
+    model_id = payload.model_id
+    features = payload.features
+    model_type = request.state.model_type = MODEL_MANAGER.model_type_of(model_id)
 
     try:
-        model = MODEL_MANAGER.load_model(model_id)
-        predictions = list(model.predict(features))
-        return {"model_id": model_id, "predictions": predictions}
+        if stream_format is not None:
+            # Первый срез считается до отправки заголовков, чтобы ошибки
+            # (например, неизвестная модель) возвращались обычным статусом
+            slice_rows = max(
+                1, int(request.query_params.get("stream_rows", STREAM_SLICE_ROWS))
+            )
+            first_slice = await INFERENCE_EXECUTOR.run(
+                _score_slice,
+                model_id,
+                features.iloc[:slice_rows],
+                0,
+                stream_format,
+                model_type,
+            )
+            return StreamingResponse(
+                _prediction_stream(
+                    model_id,
+                    features,
+                    first_slice,
+                    slice_rows,
+                    stream_format,
+                    model_type,
+                ),
+                media_type=(
+                    NDJSON_CONTENT_TYPE
+                    if stream_format == "ndjson"
+                    else "application/json"
+                ),
+            )
+        if PREDICTION_BATCHER is not None:
+            predictions = await asyncio.wrap_future(
+                PREDICTION_BATCHER.submit(model_id, features)
+            )
+        else:
+            predictions = await INFERENCE_EXECUTOR.run(
+                MODEL_MANAGER.predict, model_id, features
+            )
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found model ID") from exc
+    except ExecutorOverloadedError:
+        raise
     except Exception as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
+    return await INFERENCE_EXECUTOR.run(
+        _encode_predictions, model_id, predictions, model_type
+    )
+
+
+@app.post("/datasets")
+async def upload_dataset(request: Request, name: str | None = None):
+    """
+    upload_dataset method implementation
+    """
+    LOGGER.info("upload_dataset called")
+
+    try:
+        frame = await INFERENCE_EXECUTOR.run(
+            parse_dataset_payload,
+            request.headers.get("content-type"),
+            await request.body(),
+            request.query_params,
+        )
+        record = await IO_EXECUTOR.run(DATASET_REGISTRY.add, frame, name)
+    except PayloadError as exc:
+        raise _payload_error(exc) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return asdict(record)
+
+
+@app.post("/datasets/register")
+async def register_dataset(path: str, name: str | None = None):
+    """
+    register_dataset method implementation
+    """
+    LOGGER.info("register_dataset called")
+
+    try:
+        record = await IO_EXECUTOR.run(DATASET_REGISTRY.register_path, path, name)
+    except PermissionError as exc:
+        raise HTTPException(status_code=403, detail=str(exc)) from exc
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return asdict(record)
+
+
+@app.get("/datasets")
+async def list_datasets():
+    """
+    list_datasets method implementation
+    """
+    LOGGER.info("list_datasets called")
+    records = await IO_EXECUTOR.run(DATASET_REGISTRY.list_records)
+    return {"datasets": [asdict(record) for record in records]}
+
+
+@app.get("/datasets/{dataset_id}")
+async def get_dataset(dataset_id: str):
+    """
+    get_dataset method implementation
+    """
+    LOGGER.info("get_dataset called")
+
+    try:
+        return asdict(await IO_EXECUTOR.run(DATASET_REGISTRY.get, dataset_id))
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found dataset ID") from exc
+
+
+@app.delete("/datasets/{dataset_id}")
+async def delete_dataset(dataset_id: str):
+    """
+    delete_dataset method implementation
+    """
+    LOGGER.info("delete_dataset called")
+
+    try:
+        await IO_EXECUTOR.run(DATASET_REGISTRY.delete, dataset_id)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Not found dataset ID") from exc
+    return {"status": "success", "detail": "Dataset deleted successfully"}
+
+
+@app.get("/cache_stats")
+async def get_cache_stats():
+    """
+    get_cache_stats method implementation
+    """
+    LOGGER.info("get_cache_stats called")
+    stats = MODEL_MANAGER.cache.stats()
+    if MODEL_MANAGER.prediction_cache is not None:
+        stats["prediction_cache"] = MODEL_MANAGER.prediction_cache.stats()
+    stats["dataset_cache"] = DATASET_REGISTRY.cache.stats()
+    return stats
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics
+    """
+    body = await IO_EXECUTOR.run(METRICS.render)
+    return Response(content=body, media_type=CONTENT_TYPE)
+
+
+@app.get("/executor_stats")
+async def get_executor_stats():
+    """
+    get_executor_stats method implementation
+    """
+    LOGGER.info("get_executor_stats called")
+    return {
+        "io": IO_EXECUTOR.stats(),
+        "inference": INFERENCE_EXECUTOR.stats(),
+        "training": {"active_jobs": TRAINING_JOBS.active_jobs()},
+    }
+
 
 @app.delete("/models/{model_id}")
 async def delete_model(model_id: str):
@@ -121,7 +915,11 @@ async def delete_model(model_id: str):
     LOGGER.info("delete_model called")
 
     try:
-        MODEL_MANAGER.delete_model(model_id)
+        await IO_EXECUTOR.run(MODEL_ALIASES.delete_model, model_id)
+    except ModelInUseError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except ExecutorOverloadedError:
+        raise
     except Exception as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
@@ -0,0 +1,126 @@
+"""
+Bounded thread pools for blocking work of REST handlers
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from models.metrics import QUEUE_WAIT_SECONDS
+
+
+class ExecutorOverloadedError(RuntimeError):
+    """
+    Raised when executor queue is full
+    """
+
+
+# pylint: disable-next=too-many-instance-attributes
+class BoundedExecutor:
+    """
+    Thread pool with limited queue and queue wait statistics
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queued: int):
+        """
+        Инициализация пула потоков.
+        :param name: Имя пула для логов и статистики.
+        :param max_workers: Число потоков.
+        :param max_queued: Сколько задач может ждать свободного потока.
+        """
+        self.name = name
+        self._max_in_flight = max_workers + max_queued
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"rest-{name}"
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._tasks = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Выполняет блокирующую функцию в пуле, не блокируя цикл событий.
+        :param func: Функция.
+        :param args: Аргументы функции.
+        :return: Результат функции.
+        """
+        with self._lock:
+            if self._in_flight >= self._max_in_flight:
+                self._rejected += 1
+                raise ExecutorOverloadedError(
+                    f"Server is overloaded ({self.name} queue is full), try again later"
+                )
+            self._in_flight += 1
+
+        submitted = time.perf_counter()
+
+        def call() -> Any:
+            self._record_wait(time.perf_counter() - submitted)
+            return func(*args)
+
+        try:
+            future = self._executor.submit(call)
+        except BaseException:
+            self._release(None)
+            raise
+        # Счётчик уменьшается по завершении задачи, даже если клиент уже отключился
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _record_wait(self, seconds: float):
+        QUEUE_WAIT_SECONDS.observe(seconds, pool=self.name)
+        with self._lock:
+            self._tasks += 1
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def _release(self, _: Future | None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> dict[str, float]:
+        """
+        Возвращает счётчики пула.
+        :return: Число задач в работе, выполненных и отклоненных задач, время ожидания в очереди.
+        """
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "max_in_flight": self._max_in_flight,
+                "tasks": self._tasks,
+                "rejected": self._rejected,
+                "queue_wait_avg_ms": (
+                    1000 * self._wait_total / self._tasks if self._tasks else 0.0
+                ),
+                "queue_wait_max_ms": 1000 * self._wait_max,
+            }
+
+    def shutdown(self):
+        """
+        Дожидается выполнения задач и останавливает пул
+        """
+        self._executor.shutdown(wait=True)
+
+
+def executor_from_env(
+    name: str, default_workers: int, default_queued: int
+) -> BoundedExecutor:
+    """
+    Создаёт пул по переменным окружения REST_<NAME>_THREADS и REST_<NAME>_QUEUE.
+    :param name: Имя пула.
+    :param default_workers: Число потоков по умолчанию.
+    :param default_queued: Размер очереди по умолчанию.
+    :return: Пул потоков.
+    """
+    prefix = f"REST_{name.upper()}"
+    return BoundedExecutor(
+        name,
+        max_workers=int(os.getenv(f"{prefix}_THREADS", str(default_workers))),
+        max_queued=int(os.getenv(f"{prefix}_QUEUE", str(default_queued))),
+    )
@@ -0,0 +1,410 @@
+"""
+Request payload formats for REST server
+"""
+
+# Модели запросов повторяют поля внутренних настроек (SearchSpec, ScoringJob):
+# схема API описывается отдельно от них
+# pylint: disable=duplicate-code
+
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+JSON_CONTENT_TYPE = "application/json"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+BINARY_CONTENT_TYPE = "application/octet-stream"
+CSV_CONTENT_TYPE = "text/csv"
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+
+class PayloadError(ValueError):
+    """
+    Raised when request body can not be decoded
+    """
+
+
+class UnsupportedPayloadError(PayloadError):
+    """
+    Raised for unknown content types
+    """
+
+
+class ModelSpec(BaseModel):
+    """ModelSpec model"""
+
+    type: str
+    parameters: dict[str, Any]
+
+
+class TrainRequest(BaseModel):
+    """TrainRequest model"""
+
+    model_spec: ModelSpec
+    features: list[dict[str, float]]
+    targets: list[float]
+
+
+class PredictRequest(BaseModel):
+    """PredictRequest model"""
+
+    model_id: str
+    features: list[dict[str, float]]
+
+
+class ScoringJobRequest(BaseModel):
+    """ScoringJobRequest model"""
+
+    model_id: str
+    input_path: str
+    output_path: str
+    chunk_rows: int = 100_000
+    feature_columns: list[str] | None = None
+    passthrough_columns: list[str] = []
+
+
+class AliasRequest(BaseModel):
+    """AliasRequest model"""
+
+    model_id: str
+
+
+class UpdateRequest(BaseModel):
+    """UpdateRequest model"""
+
+    features: list[dict[str, float]] | None = None
+    targets: list[float] | None = None
+    dataset_id: str | None = None
+    target_column: str = "target"
+    parameters: dict[str, Any] = {}
+
+
+class SearchRequest(BaseModel):
+    """SearchRequest model"""
+
+    model_type: str
+    space: dict[str, Any]
+    dataset_id: str
+    target_column: str = "target"
+    strategy: str = "grid"
+    n_trials: int = 20
+    metric: str = "mse"
+    validation_fraction: float = 0.2
+    seed: int = 0
+    workers: int | None = None
+    threads_per_trial: int = 1
+    resource: str | None = None
+    min_resource: int | None = None
+    max_resource: int | None = None
+    eta: int = 3
+
+
+@dataclass
+# pylint: disable-next=too-many-instance-attributes
+class TrainPayload:
+    """
+    Decoded train request
+    """
+
+    model_type: str
+    parameters: dict[str, Any]
+    features: pd.DataFrame | None
+    targets: np.ndarray | list[float] | None
+    dataset_id: str | None = None
+    target_column: str = "target"
+    input_path: str | None = None
+    chunk_rows: int = 100_000
+
+
+@dataclass
+class PredictPayload:
+    """
+    Decoded predict request
+    """
+
+    model_id: str
+    features: pd.DataFrame | None
+    dataset_id: str | None = None
+    drop_columns: list[str] = field(default_factory=list)
+
+
+def _media_type(content_type: str | None) -> str:
+    return (content_type or JSON_CONTENT_TYPE).split(";")[0].strip().lower()
+
+
+def _loads(body: bytes) -> Any:
+    try:
+        # pylint: disable-next=no-member
+        return orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError as exc:
+        raise PayloadError(f"Invalid JSON body: {exc}") from exc
+
+
+def _columnar_frame(columns: list[str], data: Any) -> pd.DataFrame:
+    """
+    Собирает DataFrame из матрицы значений одним преобразованием в NumPy.
+    """
+    if not isinstance(columns, list) or not all(isinstance(c, str) for c in columns):
+        raise PayloadError("Field 'columns' must be a list of strings")
+    try:
+        values = np.asarray(data, dtype=np.float64)
+    except (TypeError, ValueError) as exc:
+        raise PayloadError(f"Invalid feature matrix: {exc}") from exc
+    if values.size == 0:
+        values = values.reshape(0, len(columns))
+    if values.ndim != 2 or values.shape[1] != len(columns):
+        raise PayloadError(
+            f"Feature matrix of shape {values.shape} does not match "
+            f"{len(columns)} columns"
+        )
+    return pd.DataFrame(values, columns=columns, copy=False)
+
+
+def _target_vector(targets: Any) -> np.ndarray:
+    """
+    Преобразует целевые значения в одномерный массив float64.
+    """
+    try:
+        values = np.asarray(targets, dtype=np.float64)
+    except (TypeError, ValueError) as exc:
+        raise PayloadError(f"Invalid targets: {exc}") from exc
+    if values.ndim != 1:
+        raise PayloadError("Field 'targets' must be a flat list of numbers")
+    return values
+
+
+def _arrow_frame(body: bytes) -> pd.DataFrame:
+    if pa is None:
+        raise UnsupportedPayloadError("Arrow payloads require the pyarrow package")
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except pa.ArrowInvalid as exc:
+        raise PayloadError(f"Invalid Arrow stream: {exc}") from exc
+    return table.to_pandas()
+
+
+def _binary_frame(body: bytes, columns: list[str]) -> pd.DataFrame:
+    """
+    Интерпретирует тело как матрицу little-endian float64 по строкам без копирования.
+    """
+    if not columns:
+        raise PayloadError("Binary payloads require the 'columns' query parameter")
+    row_size = 8 * len(columns)
+    if len(body) % row_size != 0:
+        raise PayloadError(
+            f"Body of {len(body)} bytes is not a whole number of {len(columns)}-column rows"
+        )
+    values = np.frombuffer(body, dtype="<f8").reshape(-1, len(columns))
+    return pd.DataFrame(values, columns=columns, copy=False)
+
+
+def _frame_from_body(
+    content_type: str | None,
+    body: bytes,
+    query: Mapping[str, str],
+) -> pd.DataFrame:
+    media_type = _media_type(content_type)
+    if media_type == ARROW_CONTENT_TYPE:
+        return _arrow_frame(body)
+    if media_type == BINARY_CONTENT_TYPE:
+        columns = [name for name in query.get("columns", "").split(",") if name]
+        return _binary_frame(body, columns)
+    raise UnsupportedPayloadError(f"Unsupported content type '{media_type}'")
+
+
+def _string_list(payload: dict, name: str) -> list[str]:
+    values = payload.get(name, [])
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise PayloadError(f"Field '{name}' must be a list of strings")
+    return values
+
+
+def _query_parameters(query: Mapping[str, str]) -> dict[str, Any]:
+    parameters = _loads(query.get("parameters", "{}").encode())
+    if not isinstance(parameters, dict):
+        raise PayloadError("Query parameter 'parameters' must be a JSON object")
+    return parameters
+
+
+def _model_spec(payload: dict) -> ModelSpec:
+    try:
+        return ModelSpec.model_validate(payload.get("model_spec"))
+    except ValidationError as exc:
+        raise PayloadError(str(exc)) from exc
+
+
+def _stored_data_train_payload(payload: dict) -> TrainPayload:
+    """
+    Запрос на обучение по датасету из реестра или по файлу на сервере.
+    """
+    spec = _model_spec(payload)
+    if "dataset_id" in payload and "input_path" in payload:
+        raise PayloadError(
+            "Fields 'dataset_id' and 'input_path' are mutually exclusive"
+        )
+    for name in ("dataset_id", "input_path"):
+        if name in payload and not isinstance(payload[name], str):
+            raise PayloadError(f"Field '{name}' must be a string")
+    chunk_rows = payload.get("chunk_rows", 100_000)
+    if not isinstance(chunk_rows, int) or chunk_rows < 1:
+        raise PayloadError("Field 'chunk_rows' must be a positive integer")
+    return TrainPayload(
+        model_type=spec.type,
+        parameters=spec.parameters,
+        features=None,
+        targets=None,
+        dataset_id=payload.get("dataset_id"),
+        target_column=str(payload.get("target_column", "target")),
+        input_path=payload.get("input_path"),
+        chunk_rows=chunk_rows,
+    )
+
+
+def parse_train_payload(
+    content_type: str | None,
+    body: bytes,
+    query: Mapping[str, str],
+) -> TrainPayload:
+    """
+    Декодирует запрос на обучение.
+    JSON принимается в построчном ({"features": [{...}]}) или колоночном
+    ({"columns": [...], "data": [[...]]}) виде либо ссылается на датасет
+    из реестра ({"dataset_id": ..., "target_column": ...}) или на CSV/Parquet файл
+    на сервере, по которому модель обучается без загрузки в память
+    ({"input_path": ..., "target_column": ..., "chunk_rows": ...}). Для Arrow и сырых float64
+    тип модели и параметры передаются в query (model_type, parameters),
+    а целевые значения – колонкой target_column (по умолчанию "target").
+    :param content_type: Заголовок Content-Type.
+    :param body: Тело запроса.
+    :param query: Query-параметры запроса.
+    :return: Декодированный запрос.
+    """
+    if _media_type(content_type) == JSON_CONTENT_TYPE:
+        payload = _loads(body)
+        if isinstance(payload, dict) and (
+            "dataset_id" in payload or "input_path" in payload
+        ):
+            return _stored_data_train_payload(payload)
+        if isinstance(payload, dict) and "columns" in payload:
+            spec = _model_spec(payload)
+            features = _columnar_frame(payload["columns"], payload.get("data", []))
+            targets = _target_vector(payload.get("targets", []))
+        else:
+            try:
+                request = TrainRequest.model_validate(payload)
+            except ValidationError as exc:
+                raise PayloadError(str(exc)) from exc
+            spec = request.model_spec
+            features = pd.DataFrame(request.features)
+            targets = request.targets
+        if len(targets) != len(features):
+            raise PayloadError("Number of targets does not match number of rows")
+        return TrainPayload(spec.type, spec.parameters, features, targets)
+
+    frame = _frame_from_body(content_type, body, query)
+    if "model_type" not in query:
+        raise PayloadError("Query parameter 'model_type' is required")
+    target_column = query.get("target_column", "target")
+    if target_column not in frame.columns:
+        raise PayloadError(f"Target column '{target_column}' not found")
+    return TrainPayload(
+        model_type=query["model_type"],
+        parameters=_query_parameters(query),
+        features=frame.drop(columns=target_column),
+        targets=frame[target_column].to_numpy(),
+    )
+
+
+def parse_predict_payload(
+    content_type: str | None,
+    body: bytes,
+    query: Mapping[str, str],
+) -> PredictPayload:
+    """
+    Декодирует запрос на предсказание.
+    Вместо признаков JSON может ссылаться на датасет из реестра
+    ({"model_id": ..., "dataset_id": ..., "drop_columns": [...]}).
+    Для Arrow и сырых float64 ID модели передается в query (model_id).
+    :param content_type: Заголовок Content-Type.
+    :param body: Тело запроса.
+    :param query: Query-параметры запроса.
+    :return: Декодированный запрос.
+    """
+    if _media_type(content_type) == JSON_CONTENT_TYPE:
+        payload = _loads(body)
+        if isinstance(payload, dict) and "dataset_id" in payload:
+            if not isinstance(payload.get("model_id"), str):
+                raise PayloadError("Field 'model_id' is required")
+            if not isinstance(payload["dataset_id"], str):
+                raise PayloadError("Field 'dataset_id' must be a string")
+            return PredictPayload(
+                model_id=payload["model_id"],
+                features=None,
+                dataset_id=payload["dataset_id"],
+                drop_columns=_string_list(payload, "drop_columns"),
+            )
+        if isinstance(payload, dict) and "columns" in payload:
+            if not isinstance(payload.get("model_id"), str):
+                raise PayloadError("Field 'model_id' is required")
+            features = _columnar_frame(payload["columns"], payload.get("data", []))
+            return PredictPayload(payload["model_id"], features)
+        try:
+            request = PredictRequest.model_validate(payload)
+        except ValidationError as exc:
+            raise PayloadError(str(exc)) from exc
+        return PredictPayload(request.model_id, pd.DataFrame(request.features))
+
+    frame = _frame_from_body(content_type, body, query)
+    if "model_id" not in query:
+        raise PayloadError("Query parameter 'model_id' is required")
+    return PredictPayload(query["model_id"], frame)
+
+
+def parse_dataset_payload(
+    content_type: str | None,
+    body: bytes,
+    query: Mapping[str, str],
+) -> pd.DataFrame:
+    """
+    Декодирует загружаемый датасет.
+    Принимаются CSV, Parquet, Arrow, сырые float64 (колонки в query)
+    и JSON в построчном или колоночном виде.
+    :param content_type: Заголовок Content-Type.
+    :param body: Тело запроса.
+    :param query: Query-параметры запроса.
+    :return: Данные.
+    """
+    media_type = _media_type(content_type)
+    if media_type == JSON_CONTENT_TYPE:
+        payload = _loads(body)
+        if isinstance(payload, dict) and "columns" in payload:
+            return _columnar_frame(payload["columns"], payload.get("data", []))
+        if not isinstance(payload, list) or not all(
+            isinstance(row, dict) for row in payload
+        ):
+            raise PayloadError("JSON dataset must be a list of rows or columnar object")
+        return pd.DataFrame(payload)
+    try:
+        if media_type == CSV_CONTENT_TYPE:
+            return pd.read_csv(io.BytesIO(body))
+        if media_type == PARQUET_CONTENT_TYPE:
+            return pd.read_parquet(io.BytesIO(body))
+    except ImportError as exc:
+        raise UnsupportedPayloadError(str(exc)) from exc
+    except (ValueError, OSError) as exc:
+        raise PayloadError(f"Invalid {media_type} body: {exc}") from exc
+    return _frame_from_body(content_type, body, query)
@@ -0,0 +1,98 @@
+"""
+Response encoding for REST server
+"""
+
+import json
+from typing import Any
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+STREAM_FORMATS = {"ndjson", "json"}
+JSON_ARRAY_TAIL = b"]}"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Кодирует значение в JSON. С orjson массивы NumPy сериализуются напрямую
+    из буфера, без промежуточных списков Python.
+    :param value: Значение.
+    :return: JSON в байтах.
+    """
+    if orjson is not None:
+        # pylint: disable-next=no-member
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY, default=_default)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def _as_array(predictions) -> np.ndarray | list:
+    values = np.asarray(predictions)
+    if values.dtype.kind not in "biuf":
+        return values.tolist()
+    # orjson принимает только C-непрерывные массивы с нативным порядком байт
+    return np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("="))
+
+
+def predictions_body(model_id: str, predictions) -> bytes:
+    """
+    Тело ответа /predict одним JSON документом.
+    :param model_id: ID модели.
+    :param predictions: Предсказания.
+    :return: JSON в байтах.
+    """
+    return dumps({"model_id": model_id, "predictions": _as_array(predictions)})
+
+
+def ndjson_line(offset: int, predictions) -> bytes:
+    """
+    Строка NDJSON с предсказаниями одного среза.
+    :param offset: Номер первой строки среза во входных данных.
+    :param predictions: Предсказания среза.
+    :return: Строка JSON с переводом строки.
+    """
+    return dumps({"offset": offset, "predictions": _as_array(predictions)}) + b"\n"
+
+
+def ndjson_error(offset: int, error: str) -> bytes:
+    """
+    Строка NDJSON с ошибкой, после которой поток завершается.
+    :param offset: Номер первой строки среза, который не удалось посчитать.
+    :param error: Текст ошибки.
+    :return: Строка JSON с переводом строки.
+    """
+    return dumps({"offset": offset, "error": error}) + b"\n"
+
+
+def json_array_head(model_id: str) -> bytes:
+    """
+    Начало потокового JSON документа вида {"model_id": ..., "predictions": [...]}.
+    :param model_id: ID модели.
+    :return: Начало документа до открывающей скобки массива.
+    """
+    return b'{"model_id":' + dumps(model_id) + b',"predictions":['
+
+
+def json_array_items(predictions, first: bool) -> bytes:
+    """
+    Элементы массива предсказаний одного среза для потокового JSON документа.
+    :param predictions: Предсказания среза.
+    :param first: Срез первый в документе (без запятой перед ним).
+    :return: Элементы через запятую без скобок массива.
+    """
+    items = dumps(_as_array(predictions))[1:-1]
+    if first or not items:
+        return items
+    return b"," + items
@@ -2,20 +2,59 @@
 Serve REST
 """
 
+import os
+from dataclasses import dataclass
+
 import uvicorn
 
 
-def serve():
+@dataclass
+class RestConfig:
     """
-    Run REST server
+    REST server settings
     """
-    config = uvicorn.Config("app:app", port=8080, reload=True)
-    server = uvicorn.Server(config)
 
-    try:
-        server.run()
-    except KeyboardInterrupt:
-        server.shutdown()
+    host: str = "127.0.0.1"
+    port: int = 8080
+    workers: int = 1
+    reload: bool = False
+    graceful_timeout_s: int = 30
+    keep_alive_s: int = 5
+
+    @classmethod
+    def from_env(cls) -> "RestConfig":
+        """
+        Read settings from REST_* environment variables
+        """
+        return cls(
+            host=os.getenv("REST_HOST", "127.0.0.1"),
+            port=int(os.getenv("REST_PORT", "8080")),
+            workers=int(os.getenv("REST_WORKERS", "1")),
+            reload=os.getenv("REST_RELOAD", "0") == "1",
+            graceful_timeout_s=int(os.getenv("REST_GRACEFUL_TIMEOUT_S", "30")),
+            keep_alive_s=int(os.getenv("REST_KEEP_ALIVE_S", "5")),
+        )
+
+
+def serve(config: RestConfig = None):
+    """
+    Run REST server.
+    On SIGTERM workers wait up to graceful_timeout_s for in-flight requests.
+    SIGHUP stops each worker before starting its replacement and may drop
+    in-flight requests; restart without drops at the load balancer level
+    """
+    config = config or RestConfig.from_env()
+    if config.reload and config.workers > 1:
+        raise ValueError("Reload mode supports only one worker")
+    uvicorn.run(
+        "server.rest.app:app",
+        host=config.host,
+        port=config.port,
+        workers=config.workers,
+        reload=config.reload,
+        timeout_graceful_shutdown=config.graceful_timeout_s,
+        timeout_keep_alive=config.keep_alive_s,
+    )
 
 
 if __name__ == "__main__":
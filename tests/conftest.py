@@ -0,0 +1,45 @@
+"""
+Shared fixtures of the test suite
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def pytest_sessionstart(session):  # pylint: disable=unused-argument
+    """
+    Модули создают хранилища по умолчанию (./models_storage, ./datasets_storage) при
+    импорте: тесты запускаются во временной директории, чтобы не засорять рабочую копию
+    """
+    os.chdir(tempfile.mkdtemp(prefix="mlops-tests-"))
+
+
+@pytest.fixture
+def dataset() -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Small regression dataset with linear signal
+    """
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+    y = (
+        X.to_numpy() @ np.array([1.0, -2.0, 0.5])
+        + 3.0
+        + rng.normal(scale=0.1, size=200)
+    )
+    return X, y
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """
+    Model manager over empty temporary storage
+    """
+    from models.model_manager import (
+        ModelManager,  # pylint: disable=import-outside-toplevel
+    )
+
+    return ModelManager(str(tmp_path / "models"))
@@ -0,0 +1,63 @@
+"""
+Micro-batching of predict requests
+"""
+
+import numpy as np
+import pytest
+
+from models.micro_batching import PredictionBatcher
+
+
+@pytest.fixture
+def model_id(manager, dataset):
+    X, y = dataset
+    return manager.train_and_save_model("LinRegModel", X, y)
+
+
+def test_batch_matches_direct_predictions(manager, model_id, dataset):
+    X, _ = dataset
+    batcher = PredictionBatcher(manager, max_wait_ms=50)
+    try:
+        futures = [batcher.submit(model_id, X[i : i + 5]) for i in range(0, 20, 5)]
+        predictions = np.concatenate([future.result(timeout=10) for future in futures])
+    finally:
+        batcher.close()
+    np.testing.assert_allclose(predictions, manager.predict(model_id, X[:20]))
+    assert batcher.stats()["batches"] == 1
+
+
+def test_cancelled_request_does_not_block_batch(manager, model_id, dataset):
+    X, _ = dataset
+    batcher = PredictionBatcher(manager, max_wait_ms=200)
+    try:
+        first = batcher.submit(model_id, X[:5])
+        cancelled = batcher.submit(model_id, X[5:10])
+        last = batcher.submit(model_id, X[10:12])
+        assert cancelled.cancel()
+        assert len(first.result(timeout=10)) == 5
+        assert len(last.result(timeout=10)) == 2
+    finally:
+        batcher.close()
+    assert cancelled.cancelled()
+    assert batcher.stats()["requests"] == 2
+
+
+def test_failing_request_is_isolated(manager, model_id, dataset):
+    X, _ = dataset
+    batcher = PredictionBatcher(manager, max_wait_ms=200)
+    try:
+        good = batcher.submit(model_id, X[:3])
+        missing = batcher.submit("LinRegModel_missing_model", X[:3])
+        assert len(good.result(timeout=10)) == 3
+        with pytest.raises(FileNotFoundError):
+            missing.result(timeout=10)
+    finally:
+        batcher.close()
+
+
+def test_closed_batcher_rejects_requests(manager, model_id, dataset):
+    X, _ = dataset
+    batcher = PredictionBatcher(manager)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(model_id, X[:1])
@@ -0,0 +1,55 @@
+"""
+Incremental updates of models
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.ml_models.ml_models import CatBoostRegModel, LinRegModel
+
+
+@pytest.mark.parametrize(
+    "hyperparams",
+    [{}, {"fit_intercept": False}, {"positive": True}],
+    ids=["default", "no-intercept", "positive"],
+)
+def test_linreg_update_matches_full_refit(dataset, hyperparams):
+    X, y = dataset
+    model = LinRegModel(dict(hyperparams))
+    model.fit(X[:120], y[:120])
+    updated = model.update(X[120:], y[120:])
+
+    refit = LinRegModel(dict(hyperparams))
+    refit.fit(X, y)
+    np.testing.assert_allclose(updated.model.coef_, refit.model.coef_, atol=1e-8)
+    np.testing.assert_allclose(
+        updated.model.intercept_, refit.model.intercept_, atol=1e-8
+    )
+    np.testing.assert_allclose(updated.predict(X), refit.predict(X), atol=1e-8)
+    assert updated.moments[0] == len(X)
+
+
+def test_linreg_update_reorders_columns(dataset):
+    X, y = dataset
+    model = LinRegModel()
+    model.fit(X[:120], y[:120])
+    shuffled = model.update(X[120:][["c", "a", "b"]], y[120:])
+    ordered = model.update(X[120:], y[120:])
+    np.testing.assert_allclose(shuffled.model.coef_, ordered.model.coef_)
+
+
+def test_catboost_update_keeps_parent_learning_rate(dataset):
+    X, y = dataset
+    model = CatBoostRegModel({"iterations": 10})
+    model.model.set_params(verbose=False)
+    model.fit(X, y)
+    parent_rate = model.model.get_all_params()["learning_rate"]
+
+    X_new = pd.concat([X] * 10, ignore_index=True)
+    updated = model.update(X_new, np.tile(y, 10))
+    assert updated.model.get_all_params()["learning_rate"] == pytest.approx(parent_rate)
+    assert updated.model.tree_count_ == 20
+
+    overridden = model.update(X_new, np.tile(y, 10), {"learning_rate": 0.05})
+    assert overridden.model.get_all_params()["learning_rate"] == pytest.approx(0.05)
@@ -0,0 +1,143 @@
+"""
+Versioned model storage, cross-process caches and aliases
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+import models.model_manager as model_manager_module
+from models.ml_models.ml_models import LinRegModel
+from models.model_aliases import AliasStore, ModelAliases, ModelInUseError
+from models.model_manager import ModelManager
+from models.prediction_cache import PredictionCache
+
+
+@pytest.fixture
+def model_id(manager, dataset):
+    X, y = dataset
+    return manager.train_and_save_model("LinRegModel", X, y)
+
+
+def _negated_model(dataset) -> LinRegModel:
+    X, y = dataset
+    model = LinRegModel()
+    model.fit(X, -y)
+    return model
+
+
+def test_save_switches_version_link(manager, model_id, dataset):
+    link = manager.storage_dir / f"{model_id}.model"
+    first_version = link.resolve()
+    assert link.is_symlink()
+
+    manager.save_model(_negated_model(dataset), model_id)
+    assert link.resolve() != first_version
+    # Прежняя версия остается для читателей, уже разрешивших ссылку
+    assert first_version.exists()
+    X, y = dataset
+    assert np.corrcoef(manager.predict(model_id, X), -y)[0, 1] > 0.99
+
+
+def test_switch_keeps_recent_versions(manager, model_id, dataset, monkeypatch):
+    model = _negated_model(dataset)
+    for _ in range(3):
+        manager.save_model(model, model_id)
+    versions = list(manager.storage_dir.glob(f"{model_id}.model.*"))
+    assert len(versions) == 4
+
+    monkeypatch.setattr(model_manager_module, "VERSION_GRACE_S", 0.0)
+    time.sleep(0.01)
+    manager.save_model(model, model_id)
+    link = manager.storage_dir / f"{model_id}.model"
+    remaining = set(manager.storage_dir.glob(f"{model_id}.model.*"))
+    # Остаются только текущая и предыдущая версии
+    assert len(remaining) == 2
+    assert link.resolve() in {path.resolve() for path in remaining}
+
+
+def test_resave_in_other_manager_invalidates_caches(tmp_path, dataset):
+    X, y = dataset
+    writer = ModelManager(str(tmp_path), prediction_cache=PredictionCache())
+    reader = ModelManager(str(tmp_path), prediction_cache=PredictionCache())
+    model_id = writer.train_and_save_model("LinRegModel", X, y)
+    before = reader.predict(model_id, X[:5])
+    np.testing.assert_allclose(reader.predict(model_id, X[:5]), before)
+
+    writer.save_model(_negated_model(dataset), model_id)
+    np.testing.assert_allclose(reader.predict(model_id, X[:5]), -before, rtol=0.1)
+
+    writer.delete_model(model_id)
+    with pytest.raises(FileNotFoundError):
+        reader.predict(model_id, X[:5])
+
+
+@pytest.mark.parametrize("name", ["../evil", "a/../../evil", "..\\evil", ""])
+def test_load_rejects_path_traversal(manager, name):
+    with pytest.raises(FileNotFoundError):
+        manager.load_model(name)
+
+
+@pytest.fixture
+def aliases(manager):
+    aliases = ModelAliases(
+        manager, AliasStore(manager.storage_dir / "aliases.sqlite3"), refresh_s=0.05
+    )
+    yield aliases
+    aliases.close()
+
+
+def test_alias_swap(manager, aliases, model_id, dataset):
+    X, y = dataset
+    other_id = manager.train_and_save_model("LinRegModel", X, -y)
+    aliases.set("prod", model_id)
+    assert aliases.resolve("prod") == model_id
+
+    record = aliases.set("prod", other_id)
+    assert aliases.resolve("prod") == other_id
+    assert record.previous_model_id == model_id
+    assert manager.load_model(other_id).__dict__.get("_inference") is not None
+
+
+def test_alias_swap_reaches_other_process(manager, aliases, model_id, dataset):
+    X, y = dataset
+    other_id = manager.train_and_save_model("LinRegModel", X, -y)
+    aliases.set("prod", model_id)
+
+    other_manager = ModelManager(str(manager.storage_dir))
+    other = ModelAliases(
+        other_manager,
+        AliasStore(manager.storage_dir / "aliases.sqlite3"),
+        refresh_s=0.05,
+    )
+    other.start()
+    try:
+        assert other.resolve("prod") == model_id
+        aliases.set("prod", other_id)
+        deadline = time.monotonic() + 5
+        while other.resolve("prod") != other_id and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert other.resolve("prod") == other_id
+        assert other_id in other_manager.cache.keys()
+    finally:
+        other.close()
+
+
+def test_aliased_model_can_not_be_deleted(manager, aliases, model_id):
+    aliases.set("prod", model_id)
+    with pytest.raises(ModelInUseError):
+        aliases.delete_model(model_id)
+    assert manager.model_exists(model_id)
+
+    aliases.delete("prod")
+    aliases.delete_model(model_id)
+    assert not manager.model_exists(model_id)
+    with pytest.raises(FileNotFoundError):
+        aliases.set("prod", model_id)
+    assert aliases.store.get("prod") is None
+
+
+def test_invalid_alias_name(aliases, model_id):
+    with pytest.raises(ValueError):
+        aliases.set("bad_name", model_id)
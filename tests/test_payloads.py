@@ -0,0 +1,82 @@
+"""
+Decoding of REST request bodies
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from server.rest.payloads import (
+    PayloadError,
+    UnsupportedPayloadError,
+    parse_train_payload,
+)
+
+SPEC = {"type": "LinRegModel", "parameters": {}}
+
+
+def _train(payload, content_type="application/json", query=None):
+    return parse_train_payload(content_type, json.dumps(payload).encode(), query or {})
+
+
+def test_columnar_train_payload():
+    payload = _train(
+        {
+            "model_spec": SPEC,
+            "columns": ["a", "b"],
+            "data": [[1, 2], [3, 4]],
+            "targets": [1, 2],
+        }
+    )
+    assert list(payload.features.columns) == ["a", "b"]
+    np.testing.assert_array_equal(payload.targets, [1.0, 2.0])
+
+
+@pytest.mark.parametrize(
+    "targets",
+    [["x", 1], [[1], [2, 3]], [[1], [2]], None, [1, 2, 3]],
+    ids=["non-numeric", "ragged", "nested", "missing", "length-mismatch"],
+)
+def test_invalid_columnar_targets(targets):
+    with pytest.raises(PayloadError):
+        _train(
+            {
+                "model_spec": SPEC,
+                "columns": ["a"],
+                "data": [[1], [2]],
+                "targets": targets,
+            }
+        )
+
+
+@pytest.mark.parametrize(
+    "data",
+    [[[1, 2], [3]], [["x", 1], [2, 3]], [[1, 2, 3], [4, 5, 6]]],
+    ids=["ragged", "non-numeric", "wrong-width"],
+)
+def test_invalid_feature_matrix(data):
+    with pytest.raises(PayloadError):
+        _train(
+            {"model_spec": SPEC, "columns": ["a", "b"], "data": data, "targets": [1, 2]}
+        )
+
+
+def test_row_payload_length_mismatch():
+    with pytest.raises(PayloadError, match="Number of targets"):
+        _train({"model_spec": SPEC, "features": [{"a": 1.0}], "targets": [1.0, 2.0]})
+
+
+def test_invalid_json():
+    with pytest.raises(PayloadError, match="Invalid JSON"):
+        parse_train_payload("application/json", b"{not json", {})
+
+
+def test_dataset_and_input_path_are_exclusive():
+    with pytest.raises(PayloadError, match="mutually exclusive"):
+        _train({"model_spec": SPEC, "dataset_id": "ds", "input_path": "data.csv"})
+
+
+def test_unsupported_content_type():
+    with pytest.raises(UnsupportedPayloadError):
+        parse_train_payload("application/xml", b"<a/>", {"model_type": "LinRegModel"})